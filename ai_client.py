@@ -160,112 +160,536 @@
 
 
 
+import gzip
 import json
+import threading
 import time
 import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any
+from resilience import RetryPolicy, CircuitBreaker
+from json_stream import SectionStreamParser
+from prompt_compaction import compaction_stats, chunk_sections, estimate_tokens
+from metrics import registry, stage
+
+# HTTP statuses worth retrying; other 4xx responses will never succeed
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+LLM_CALLS = registry.counter('gemini_calls_total', "Model calls by outcome", labels=('outcome',))
+PROMPT_TOKENS = registry.histogram(
+    'gemini_prompt_tokens',
+    "Estimated tokens per prompt sent to the model",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+RESPONSE_CHARS = registry.histogram(
+    'gemini_response_chars',
+    "Characters per model response",
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+)
+
+class GeminiError(Exception):
+    """Model or proxy failure, classified as retryable or not"""
+    
+    def __init__(self, message, retryable=True, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class ProxyTransport:
+    """HTTP transport to the Gemini proxy over a pooled keep-alive session
+    
+    Unless one is passed in, the session is opened on first use in each process,
+    so a gunicorn worker never reuses sockets inherited from the master.
+    """
+    
+    def __init__(self, base_url, pool_size=10, connect_timeout=5, read_timeout=60, gzip_requests=False, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.gzip_requests = gzip_requests
+        self.pool_size = pool_size
+        self._session = self._configure(session) if session else None
+        self._owns_session = session is None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        if self._owns_session and (self._session is None or self._pid != os.getpid()):
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self._configure(requests.Session())
+                    self._pid = os.getpid()
+        return self._session
+    
+    def _configure(self, session):
+        # pool_block caps concurrent connections to the proxy at pool_size
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive'
+        })
+        return session
+    
+    def post_json(self, path, payload):
+        """POST a JSON payload and return the decoded JSON response"""
+        body = json.dumps(payload).encode('utf-8')
+        headers = {}
+        
+        if self.gzip_requests:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        
+        response = self.session.post(
+            f"{self.base_url}{path}",
+            data=body,
+            headers=headers,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def stream_text(self, path, payload):
+        """POST a JSON payload and yield the response body as text chunks"""
+        response = self.session.post(
+            f"{self.base_url}{path}",
+            data=json.dumps(dict(payload, stream=True)).encode('utf-8'),
+            timeout=self.timeout,
+            stream=True
+        )
+        
+        with response:
+            response.raise_for_status()
+            
+            # Proxies without streaming support answer with the usual JSON envelope
+            if response.headers.get('Content-Type', '').startswith('application/json'):
+                result = response.json()
+                if not result.get('success'):
+                    raise GeminiError(f"Proxy error: {result.get('error', 'Unknown error')}")
+                yield result['response']
+                return
+            
+            response.encoding = response.encoding or 'utf-8'
+            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+                if chunk:
+                    yield chunk
+    
+    def close(self):
+        if self._session is not None:
+            self._session.close()
 
 class GeminiClient:
-    def __init__(self, api_key=None):
+    # Bump whenever the prompt or the analysis schema changes so cached results are invalidated
+    PROMPT_VERSION = '2'
+    
+    def __init__(self, api_key=None, cache=None, transport=None, retry_policy=None, circuit_breaker=None, rate_limiter=None,
+                 extractor=None, compactor=None, chunk_threshold=None, chunk_tokens=3000, chunk_concurrency=4):
+        self.model_name = "gemini-2.0-flash"
+        self.cache = cache
+        self.extractor = extractor  # Optional ResumeExtractor for locally extracted fields
+        self.compactor = compactor  # Optional PromptCompactor applied before prompting
+        self.chunk_threshold = chunk_threshold  # Resume tokens above which analysis is map-reduced
+        self.chunk_tokens = chunk_tokens
+        self.chunk_concurrency = chunk_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter  # Optional TokenBucket
+        self._retries = 0
+        self._prompt_totals = {'prompts': 0, 'original_tokens': 0, 'compacted_tokens': 0, 'chunked': 0}
+        self._stats_lock = threading.Lock()
+        
         # Check if using proxy
-        self.proxy_url = os.getenv('GEMINI_PROXY_URL')
+        self.proxy_url = transport.base_url if transport else os.getenv('GEMINI_PROXY_URL')
         
         if self.proxy_url:
             # Using proxy - no need for API key here
             self.use_proxy = True
             # Remove trailing slash if present
             self.proxy_url = self.proxy_url.rstrip('/')
+            self.transport = transport or ProxyTransport(self.proxy_url)
             print(f"Using Gemini Proxy: {self.proxy_url}")
         else:
-            # Direct API access (original behavior)
+            # Direct API access (original behavior); the SDK is loaded on first use
             self.use_proxy = False
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("gemini-2.0-flash")
+            self.api_key = api_key
+            self._model = None
+            self._model_pid = None
+            self._model_lock = threading.Lock()
             print("Using direct Gemini API access")
+    
+    @property
+    def model(self):
+        """Gemini SDK model, created once per process
         
-        self.max_retries = 3
-        self.retry_delay = 2
+        google.generativeai is slow to import and its gRPC channels do not survive
+        a fork, so it is never touched before a worker needs it.
+        """
+        with self._model_lock:
+            if self._model is None or self._model_pid != os.getpid():
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+                self._model_pid = os.getpid()
+            return self._model
     
     def analyze_resume(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
         """Analyze resume and return structured data"""
-        prompt = self._build_analysis_prompt(resume_text, job_description)
+        cache_key = None
+        
+        if self.cache:
+            cache_key = self.cache.make_key(resume_text, job_description, self._prompt_version(), self.model_name)
+            with stage('cache_lookup'):
+                cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        started = time.monotonic()
+        analysis = self._generate_analysis(resume_text, job_description)
         
-        for attempt in range(self.max_retries):
+        if self.extractor and 'error' not in analysis:
+            analysis = self.extractor.merge(analysis, self.extractor.extract(resume_text))
+        
+        # Do not cache the fallback structure returned on parse failures
+        if self.cache and 'error' not in analysis:
+            self.cache.set(cache_key, analysis, time.monotonic() - started, self.model_name)
+        
+        return analysis
+    
+    def _generate_analysis(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
+        """Call the model with retries and decode its JSON response"""
+        if self._should_chunk(resume_text):
+            return self._generate_chunked_analysis(resume_text, job_description)
+        
+        prompt, prompt_tokens = self._prepare_prompt(resume_text, job_description)
+        
+        try:
+            analysis = self._request_json(prompt, self._validate_analysis)
+        except json.JSONDecodeError as e:
+            # Return basic structure if parsing fails
+            return self._fallback_analysis(resume_text, job_description, str(e))
+        
+        analysis['prompt_tokens'] = prompt_tokens
+        return analysis
+    
+    def _generate_chunked_analysis(self, resume_text: str, job_description: str = "") -> Dict[str, Any]:
+        """Extract facts from section-aligned chunks in parallel, then score the merged result in one short call"""
+        chunks = chunk_sections(resume_text, self.chunk_tokens, self.extractor)
+        prompts = [self._build_extraction_prompt(chunk) for chunk in chunks]
+        
+        def extract(prompt):
+            try:
+                return self._request_json(prompt, self._validate_extraction)
+            except json.JSONDecodeError as e:
+                # One unreadable chunk should not sink the whole analysis
+                print(f"Skipping chunk with malformed output: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.chunk_concurrency, len(prompts)))) as pool:
+            partials = [partial for partial in pool.map(extract, prompts) if partial]
+        
+        if not partials:
+            return self._fallback_analysis(resume_text, job_description, "No chunk could be analyzed")
+        
+        analysis = self._merge_partials(partials)
+        summary_prompt = self._build_summary_prompt(analysis, resume_text, job_description)
+        
+        try:
+            analysis.update(self._request_json(summary_prompt, self._validate_summary))
+        except json.JSONDecodeError as e:
+            default = self._get_default_analysis(str(e))
+            for field in ('summary', 'suggestions', 'overall_score', 'strengths', 'areas_for_improvement', 'error'):
+                analysis[field] = default[field]
+        
+        sent = prompts + [summary_prompt]
+        analysis['prompt_tokens'] = dict(
+            compaction_stats(self._build_analysis_prompt(resume_text, job_description), ''.join(sent)),
+            chunks=len(chunks),
+            largest_call_tokens=max(estimate_tokens(prompt) for prompt in sent)
+        )
+        self._record_prompt_tokens(analysis['prompt_tokens'], chunked=True)
+        return analysis
+    
+    def _request_json(self, prompt: str, validate) -> Dict[str, Any]:
+        """Call the model with retries until it returns JSON that passes validate"""
+        max_attempts = self.retry_policy.max_attempts
+        
+        for attempt in range(max_attempts):
+            last_attempt = attempt == max_attempts - 1
+            
             try:
+                response_text = self._call_model(prompt)
+                return self._decode_response(response_text, validate)
+            
+            except json.JSONDecodeError:
+                if last_attempt:
+                    raise
+                self._backoff(attempt)
+            
+            except Exception as e:
+                # Malformed output (e.g. missing fields) is worth another try;
+                # classified upstream errors decide for themselves
+                if last_attempt or not getattr(e, 'retryable', True):
+                    raise GeminiError(
+                        f"Failed to analyze resume: {str(e)}",
+                        retryable=getattr(e, 'retryable', False),
+                        status_code=getattr(e, 'status_code', None)
+                    )
+                self._backoff(attempt, getattr(e, 'retry_after', None))
+    
+    def stream_analysis(self, resume_text: str, job_description: str = ""):
+        """Yield ('section', key, value) as parts of the analysis complete, then ('result', analysis)"""
+        cache_key = None
+        
+        if self.cache:
+            cache_key = self.cache.make_key(resume_text, job_description, self._prompt_version(), self.model_name)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for key, value in cached.items():
+                    yield 'section', key, value
+                yield 'result', cached
+                return
+        
+        started = time.monotonic()
+        stream_parser = SectionStreamParser()
+        analysis = None
+        extracted = None
+        chunked = self._should_chunk(resume_text)
+        
+        if self.extractor:
+            # Locally extracted contacts and skills can be shown before the model answers
+            extracted = self.extractor.extract(resume_text)
+            yield 'section', 'personal_info', dict(extracted['personal_info'])
+            yield 'section', 'skills', list(extracted['skills'])
+        
+        try:
+            # Map-reduced analyses have no single response to stream
+            if not chunked:
+                prompt, prompt_tokens = self._prepare_prompt(resume_text, job_description)
+                
+                for chunk in self._stream_model(prompt):
+                    for key, value in stream_parser.feed(chunk):
+                        if extracted and key in ('personal_info', 'skills'):
+                            value = self.extractor.merge({key: value}, extracted)[key]
+                        yield 'section', key, value
+                
+                analysis = self._decode_response(stream_parser.buffer)
+                analysis['prompt_tokens'] = prompt_tokens
+        except Exception as e:
+            print(f"Streaming analysis failed, retrying without streaming: {e}")
+        
+        if analysis is None:
+            # Regular call (with retries, or map-reduced); send every section
+            analysis = self._generate_analysis(resume_text, job_description)
+            for key, value in analysis.items():
+                yield 'section', key, value
+        
+        if extracted and 'error' not in analysis:
+            analysis = self.extractor.merge(analysis, extracted)
+        
+        if self.cache and 'error' not in analysis:
+            self.cache.set(cache_key, analysis, time.monotonic() - started, self.model_name)
+        
+        yield 'result', analysis
+    
+    def _prompt_version(self) -> str:
+        version = self.PROMPT_VERSION
+        if self.compactor:
+            version += f"/{self.compactor.signature}"
+        if self.chunk_threshold:
+            version += f"/m{self.chunk_threshold}-{self.chunk_tokens}"
+        return version
+    
+    def _should_chunk(self, resume_text: str) -> bool:
+        return bool(self.chunk_threshold) and estimate_tokens(resume_text) > self.chunk_threshold
+    
+    def _prepare_prompt(self, resume_text: str, job_description: str = ""):
+        """Build the prompt, compacted to the token budget, and count tokens before and after"""
+        prompt = self._build_analysis_prompt(resume_text, job_description)
+        compacted = prompt
+        
+        if self.compactor:
+            compacted = self._build_analysis_prompt(*self.compactor.compact(resume_text, job_description))
+        
+        prompt_tokens = compaction_stats(prompt, compacted)
+        self._record_prompt_tokens(prompt_tokens)
+        return compacted, prompt_tokens
+    
+    def _record_prompt_tokens(self, prompt_tokens, chunked=False):
+        with self._stats_lock:
+            self._prompt_totals['prompts'] += 1
+            self._prompt_totals['original_tokens'] += prompt_tokens['original_tokens']
+            self._prompt_totals['compacted_tokens'] += prompt_tokens['compacted_tokens']
+            if chunked:
+                self._prompt_totals['chunked'] += 1
+    
+    def _decode_response(self, response_text: str, validate=None) -> Dict[str, Any]:
+        """Extract and validate the analysis JSON from the model output"""
+        # Parse JSON from response
+        result_text = response_text.strip()
+        
+        # Extract JSON if wrapped in markdown code blocks
+        if result_text.startswith('```'):
+            result_text = result_text.split('```')[1]
+            if result_text.startswith('json'):
+                result_text = result_text[4:]
+            result_text = result_text.strip()
+        
+        analysis = json.loads(result_text)
+        
+        # Validate structure
+        (validate or self._validate_analysis)(analysis)
+        
+        return analysis
+    
+    def _backoff(self, attempt, retry_after=None):
+        with self._stats_lock:
+            self._retries += 1
+        with stage('llm_retry_wait'):
+            time.sleep(self.retry_policy.delay(attempt, retry_after))
+    
+    def _call_model(self, prompt: str) -> str:
+        """Call the model through the rate limiter and circuit breaker"""
+        # Fail fast without spending a rate-limit token
+        if self.circuit_breaker.state == CircuitBreaker.OPEN:
+            self.circuit_breaker.before_call()
+        
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
+        self.circuit_breaker.before_call()
+        PROMPT_TOKENS.observe(estimate_tokens(prompt))
+        
+        try:
+            with stage('llm_call'):
                 if self.use_proxy:
                     # Use proxy server
                     response_text = self._call_proxy(prompt)
                 else:
                     # Direct API call
-                    response = self.model.generate_content(prompt)
-                    response_text = response.text
-                
-                # Parse JSON from response
-                result_text = response_text.strip()
-                
-                # Extract JSON if wrapped in markdown code blocks
-                if result_text.startswith('```'):
-                    result_text = result_text.split('```')[1]
-                    if result_text.startswith('json'):
-                        result_text = result_text[4:]
-                    result_text = result_text.strip()
-                
-                analysis = json.loads(result_text)
-                
-                # Validate structure
-                self._validate_analysis(analysis)
-                
-                return analysis
-            
-            except json.JSONDecodeError as e:
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    # Return basic structure if parsing fails
-                    return self._get_default_analysis(str(e))
-            
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    continue
-                else:
-                    raise Exception(f"Failed to analyze resume: {str(e)}")
+                    response_text = self._call_direct(prompt)
+        
+        except GeminiError as e:
+            LLM_CALLS.inc(outcome='error')
+            # Only transient failures say anything about upstream health
+            if e.retryable:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        except Exception:
+            LLM_CALLS.inc(outcome='error')
+            self.circuit_breaker.record_failure()
+            raise
+        
+        LLM_CALLS.inc(outcome='success')
+        RESPONSE_CHARS.observe(len(response_text))
+        self.circuit_breaker.record_success()
+        return response_text
+    
+    def _stream_model(self, prompt: str):
+        """Yield model output chunks through the rate limiter and circuit breaker"""
+        if self.circuit_breaker.state == CircuitBreaker.OPEN:
+            self.circuit_breaker.before_call()
+        
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
+        self.circuit_breaker.before_call()
+        PROMPT_TOKENS.observe(estimate_tokens(prompt))
+        
+        try:
+            if self.use_proxy:
+                payload = {
+                    "prompt": prompt,
+                    "model": self.model_name
+                }
+                for chunk in self.transport.stream_text('/analyze', payload):
+                    yield chunk
+            else:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    yield chunk.text
+        
+        except GeneratorExit:
+            # The client went away; that says nothing about upstream health
+            LLM_CALLS.inc(outcome='cancelled')
+            self.circuit_breaker.record_success()
+            raise
+        except Exception:
+            LLM_CALLS.inc(outcome='error')
+            self.circuit_breaker.record_failure()
+            raise
+        
+        LLM_CALLS.inc(outcome='success')
+        self.circuit_breaker.record_success()
+    
+    def _call_direct(self, prompt: str) -> str:
+        """Call the Gemini API directly"""
+        try:
+            response = self.model.generate_content(prompt)
+            return response.text
+        except Exception as e:
+            # google.api_core exceptions carry the HTTP status in .code
+            status_code = getattr(e, 'code', None)
+            if not isinstance(status_code, int):
+                status_code = None
+            retryable = status_code is None or status_code in RETRYABLE_STATUS_CODES
+            raise GeminiError(f"Gemini API error: {str(e)}", retryable=retryable, status_code=status_code)
     
     def _call_proxy(self, prompt: str) -> str:
         """Call the local proxy server"""
         try:
-            url = f"{self.proxy_url}/analyze"
-            
             payload = {
                 "prompt": prompt,
-                "model": "gemini-2.0-flash"
+                "model": self.model_name
             }
             
-            response = requests.post(
-                url,
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=60  # 60 seconds timeout
-            )
-            
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self.transport.post_json('/analyze', payload)
             
             if result.get('success'):
                 return result['response']
             else:
-                raise Exception(f"Proxy error: {result.get('error', 'Unknown error')}")
+                raise GeminiError(f"Proxy error: {result.get('error', 'Unknown error')}")
         
         except requests.exceptions.Timeout:
-            raise Exception("Proxy request timed out")
+            raise GeminiError("Proxy request timed out")
         except requests.exceptions.ConnectionError:
-            raise Exception(f"Cannot connect to proxy server at {self.proxy_url}")
+            raise GeminiError(f"Cannot connect to proxy server at {self.proxy_url}")
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code
+            retry_after = e.response.headers.get('Retry-After')
+            raise GeminiError(
+                f"Proxy request failed: {str(e)}",
+                retryable=status_code in RETRYABLE_STATUS_CODES,
+                status_code=status_code,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Proxy request failed: {str(e)}")
+            raise GeminiError(f"Proxy request failed: {str(e)}")
+    
+    def prompt_stats(self) -> Dict[str, Any]:
+        """Estimated prompt tokens before and after compaction since start"""
+        with self._stats_lock:
+            stats = dict(self._prompt_totals)
+        
+        original = stats['original_tokens']
+        stats['saved_ratio'] = round(1 - stats['compacted_tokens'] / original, 3) if original else 0.0
+        return stats
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Circuit breaker, rate limiter and retry counters"""
+        with self._stats_lock:
+            retries = self._retries
+        
+        return {
+            'circuit_breaker': self.circuit_breaker.stats(),
+            'rate_limiter': self.rate_limiter.stats() if self.rate_limiter else None,
+            'retries': retries
+        }
     
     def _build_analysis_prompt(self, resume_text: str, job_description: str = "") -> str:
         """Build prompt for Gemini API"""
@@ -311,7 +735,7 @@ Extract and return JSON with the following structure:
     "strengths": ["strength1", "strength2", "strength3"],
     "areas_for_improvement": ["area1", "area2"]
 """
-        
+
         if job_description:
             base_prompt += f"""
     ,
@@ -340,6 +764,147 @@ Calculate job match score (0-100) based on:
         
         return base_prompt
     
+    def _build_extraction_prompt(self, chunk_text: str) -> str:
+        """Prompt for the facts in one part of a long resume"""
+        return f"""
+The following text is one part of a longer resume. Extract only the information present in this part. Return ONLY valid JSON with no additional text.
+
+Resume Part:
+{chunk_text}
+
+Extract and return JSON with the following structure (use empty lists and 'Not Found' for anything absent from this part):
+{{
+    "personal_info": {{
+        "name": "Full Name (or 'Not Found')",
+        "email": "Email address (or 'Not Found')",
+        "phone": "Phone number (or 'Not Found')",
+        "location": "Location/City (or 'Not Found')"
+    }},
+    "skills": ["skill1", "skill2", ...],
+    "education": [
+        {{
+            "degree": "Degree name",
+            "institution": "University/College name",
+            "year": "Graduation year",
+            "details": "Additional details"
+        }}
+    ],
+    "experience": [
+        {{
+            "title": "Job title",
+            "company": "Company name",
+            "duration": "Time period",
+            "responsibilities": ["responsibility1", "responsibility2", ...]
+        }}
+    ],
+    "certifications": ["cert1", "cert2", ...]
+}}
+
+Return ONLY the JSON object, no explanations or markdown."""
+
+    def _build_summary_prompt(self, facts: Dict[str, Any], resume_text: str, job_description: str = "") -> str:
+        """Short prompt that scores a long resume from the facts extracted from its parts"""
+        digest = {
+            'skills': facts['skills'],
+            'experience': [
+                dict(entry, responsibilities=entry.get('responsibilities', [])[:3])
+                for entry in facts['experience']
+            ],
+            'education': facts['education'],
+            'certifications': facts['certifications']
+        }
+        
+        prompt = f"""
+Below are facts extracted from a long resume, followed by its opening text. Evaluate the candidate and return ONLY valid JSON with no additional text.
+
+Extracted Facts:
+{json.dumps(digest, separators=(',', ':'))}
+
+Resume Opening:
+{resume_text[:2000]}
+
+Return JSON with the following structure:
+{{
+    "summary": "A professional 2-3 sentence summary of the candidate's profile",
+    "suggestions": [
+        "Specific suggestion 1 to improve resume",
+        "Specific suggestion 2 to improve resume",
+        "Specific suggestion 3 to improve resume"
+    ],
+    "overall_score": 75,
+    "strengths": ["strength1", "strength2", "strength3"],
+    "areas_for_improvement": ["area1", "area2"]"""
+        
+        if job_description:
+            prompt += f""",
+    "job_match": {{
+        "score": 85,
+        "matching_skills": ["skill1", "skill2", ...],
+        "missing_skills": ["skill1", "skill2", ...],
+        "experience_match": "Brief explanation of how experience matches",
+        "recommendations": ["recommendation1", "recommendation2", ...]
+    }}
+}}
+
+Job Description:
+{job_description}
+"""
+        else:
+            prompt += "\n}"
+        
+        prompt += "\n\nReturn ONLY the JSON object, no explanations or markdown."
+        return prompt
+    
+    def _merge_partials(self, partials) -> Dict[str, Any]:
+        """Combine per-chunk extractions, dropping entries repeated across chunks"""
+        personal_info = {'name': 'Not Found', 'email': 'Not Found', 'phone': 'Not Found', 'location': 'Not Found'}
+        skills, certifications = {}, {}
+        education, experience = {}, {}
+        
+        for partial in partials:
+            for field, value in (partial.get('personal_info') or {}).items():
+                if field in personal_info and personal_info[field] == 'Not Found' and value and value != 'Not Found':
+                    personal_info[field] = value
+            
+            for skill in partial.get('skills') or []:
+                skills.setdefault(_dedupe_key(skill), skill)
+            
+            for certification in partial.get('certifications') or []:
+                certifications.setdefault(_dedupe_key(certification), certification)
+            
+            for entry in partial.get('education') or []:
+                if isinstance(entry, dict):
+                    education.setdefault(_dedupe_key(entry.get('degree'), entry.get('institution')), entry)
+            
+            for entry in partial.get('experience') or []:
+                if not isinstance(entry, dict):
+                    continue
+                key = _dedupe_key(entry.get('title'), entry.get('company'), entry.get('duration'))
+                if key in experience:
+                    # A role split across two chunks: keep one entry with both halves of its bullets
+                    merged = experience[key].setdefault('responsibilities', [])
+                    seen = {_dedupe_key(item) for item in merged}
+                    merged.extend(item for item in entry.get('responsibilities') or [] if _dedupe_key(item) not in seen)
+                else:
+                    experience[key] = entry
+        
+        return {
+            'personal_info': personal_info,
+            'skills': list(skills.values()),
+            'education': list(education.values()),
+            'experience': list(experience.values()),
+            'certifications': list(certifications.values())
+        }
+    
+    def _validate_extraction(self, partial: Dict[str, Any]):
+        if not isinstance(partial, dict) or not any(field in partial for field in ('skills', 'education', 'experience', 'personal_info')):
+            raise ValueError("Chunk extraction has none of the expected fields")
+    
+    def _validate_summary(self, summary: Dict[str, Any]):
+        for field in ('summary', 'suggestions', 'overall_score'):
+            if field not in summary:
+                raise ValueError(f"Missing required field: {field}")
+    
     def _validate_analysis(self, analysis: Dict[str, Any]):
         """Validate that analysis has required fields"""
         required_fields = ['personal_info', 'summary', 'skills', 'education', 'experience', 'suggestions']
@@ -348,6 +913,15 @@ Calculate job match score (0-100) based on:
             if field not in analysis:
                 raise ValueError(f"Missing required field: {field}")
     
+    def _fallback_analysis(self, resume_text: str, job_description: str, error_msg: str) -> Dict[str, Any]:
+        """Locally extracted analysis when available, otherwise the empty default"""
+        if self.extractor:
+            try:
+                return self.extractor.fallback_analysis(resume_text, job_description, error_msg)
+            except Exception as e:
+                print(f"Local extraction failed: {e}")
+        return self._get_default_analysis(error_msg)
+    
     def _get_default_analysis(self, error_msg: str) -> Dict[str, Any]:
         """Return default analysis structure when parsing fails"""
         return {
@@ -370,4 +944,8 @@ Calculate job match score (0-100) based on:
             "strengths": [],
             "areas_for_improvement": ["Unable to analyze due to error"],
             "error": error_msg
-        }
\ No newline at end of file
+        }
+
+def _dedupe_key(*values) -> str:
+    """Case- and punctuation-insensitive key for spotting the same entry in different chunks"""
+    return '|'.join(' '.join(str(value or '').lower().replace('.', ' ').replace(',', ' ').split()) for value in values)
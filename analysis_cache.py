@@ -0,0 +1,174 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from models import db, AnalysisCacheEntry
+
+class AnalysisCache:
+    """Two-tier (in-process LRU + database) cache of analysis results
+    
+    The database tier reads and writes in its own short-lived session, so a
+    cache lookup never commits or rolls back the caller's work. Hits on stored
+    entries are counted in memory and written every hit_flush hits, or with
+    the next store.
+    """
+    
+    def __init__(self, max_entries=256, ttl=3600, db_ttl=30 * 24 * 3600, persistent=True, hit_flush=100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_ttl = db_ttl
+        self.persistent = persistent
+        self.hit_flush = hit_flush
+        self._entries = OrderedDict()
+        self._pending_hits = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'saved_seconds': 0.0
+        }
+    
+    @staticmethod
+    def make_key(resume_text: str, job_description: str, prompt_version: str, model_name: str) -> str:
+        """Hash the normalized inputs that determine an analysis"""
+        parts = [
+            _normalize(resume_text),
+            _normalize(job_description),
+            str(prompt_version),
+            model_name or ''
+        ]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis or None"""
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, latency, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    self._stats['saved_seconds'] += latency
+                    return json.loads(payload)
+                del self._entries[key]
+        
+        if self.persistent:
+            row = self._load(key)
+            if row is not None:
+                self._remember(key, row.analysis, row.latency or 0.0)
+                with self._lock:
+                    self._stats['db_hits'] += 1
+                    self._stats['saved_seconds'] += row.latency or 0.0
+                    self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                    flush = sum(self._pending_hits.values()) >= self.hit_flush
+                if flush:
+                    self._flush_hits()
+                return json.loads(row.analysis)
+        
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+    
+    def set(self, key: str, analysis: Dict[str, Any], latency: float = 0.0, model_name: str = None):
+        """Store an analysis in both tiers"""
+        payload = json.dumps(analysis)
+        self._remember(key, payload, latency)
+        
+        with self._lock:
+            self._stats['stores'] += 1
+        
+        if self.persistent:
+            self._store(key, payload, latency, model_name)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and estimated savings"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        
+        lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+        stats['llm_calls_saved'] = stats['memory_hits'] + stats['db_hits']
+        stats['hit_ratio'] = round(stats['llm_calls_saved'] / lookups, 4) if lookups else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'], 3)
+        return stats
+    
+    def clear(self):
+        """Drop the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+    
+    def _remember(self, key, payload, latency):
+        with self._lock:
+            self._entries[key] = (payload, latency, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def _load(self, key):
+        try:
+            with Session(db.engine) as session:
+                row = session.get(AnalysisCacheEntry, key)
+            if row is None:
+                return None
+            
+            if self.db_ttl and row.created_at < datetime.utcnow() - timedelta(seconds=self.db_ttl):
+                return None
+            return row
+        except Exception as e:
+            # The cache must never break an analysis
+            print(f"Analysis cache read error: {e}")
+            return None
+    
+    def _store(self, key, payload, latency, model_name):
+        try:
+            with Session(db.engine) as session:
+                row = session.get(AnalysisCacheEntry, key)
+                if row is None:
+                    row = AnalysisCacheEntry(cache_key=key)
+                    session.add(row)
+                
+                row.analysis = payload
+                row.latency = latency
+                row.model_name = model_name
+                row.created_at = datetime.utcnow()
+                session.commit()
+        except Exception as e:
+            print(f"Analysis cache write error: {e}")
+        
+        self._flush_hits()
+    
+    def _flush_hits(self):
+        """Add the hits counted since the last flush to the stored entries"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return
+        
+        try:
+            with Session(db.engine) as session:
+                for key, hits in pending.items():
+                    session.execute(
+                        update(AnalysisCacheEntry)
+                        .where(AnalysisCacheEntry.cache_key == key)
+                        .values(hit_count=func.coalesce(AnalysisCacheEntry.hit_count, 0) + hits)
+                    )
+                session.commit()
+        except Exception as e:
+            # Hit counts are informational; losing a batch is harmless
+            print(f"Analysis cache hit count error: {e}")
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
@@ -0,0 +1,224 @@
+import json
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from models import db, Resume, ResumeAnalysis, Skill, ExperienceEntry, EducationEntry, JobMatch, analysis_skills
+from extractor import normalize_term
+from prompt_compaction import compaction_counts
+
+PERSONAL_FIELDS = ('name', 'email', 'phone', 'location')
+LIST_FIELDS = ('certifications', 'strengths', 'areas_for_improvement', 'suggestions')
+# Keys of an analysis's prompt_tokens kept in columns; saved_ratio is derived from the first two
+PROMPT_TOKEN_FIELDS = ('original_tokens', 'compacted_tokens', 'chunks', 'largest_call_tokens')
+
+class AnalysisStore:
+    """Persist analyses into normalized tables and filter resumes on them in SQL"""
+    
+    def __init__(self, archive_json=False):
+        self.archive_json = archive_json  # Also keep the raw JSON in Resume.analysis
+    
+    def save(self, resume: Resume, analysis: Dict[str, Any]):
+        """Replace the stored analysis of a resume; the caller commits"""
+        record = resume.analysis_record
+        if record is None:
+            record = ResumeAnalysis(resume_id=resume.id)
+            resume.analysis_record = record
+        
+        personal_info = analysis.get('personal_info') or {}
+        record.user_id = resume.user_id
+        record.overall_score = _score(analysis.get('overall_score'))
+        record.summary = analysis.get('summary')
+        for field in PERSONAL_FIELDS:
+            setattr(record, field, _clip(personal_info.get(field), 255))
+        for field in LIST_FIELDS:
+            setattr(record, field, json.dumps(_strings(analysis.get(field))))
+        record.source = analysis.get('source')
+        record.error = analysis.get('error')
+        
+        prompt_tokens = analysis.get('prompt_tokens')
+        if not isinstance(prompt_tokens, dict):
+            prompt_tokens = {}
+        for field in PROMPT_TOKEN_FIELDS:
+            setattr(record, f"prompt_{field}", _count(prompt_tokens.get(field)))
+        
+        record.skills = self._skills(analysis.get('skills'))
+        record.experience = [
+            ExperienceEntry(
+                position=position,
+                title=_clip(entry.get('title'), 255),
+                company=_clip(entry.get('company'), 255),
+                duration=_clip(entry.get('duration'), 100),
+                responsibilities=json.dumps(_strings(entry.get('responsibilities')))
+            )
+            for position, entry in enumerate(_entries(analysis.get('experience')))
+        ]
+        record.education = [
+            EducationEntry(
+                position=position,
+                degree=_clip(entry.get('degree'), 255),
+                institution=_clip(entry.get('institution'), 255),
+                year=_clip(entry.get('year'), 50),
+                details=entry.get('details')
+            )
+            for position, entry in enumerate(_entries(analysis.get('education')))
+        ]
+        
+        job_match = analysis.get('job_match')
+        record.job_match = JobMatch(
+            score=_score(job_match.get('score')),
+            experience_match=job_match.get('experience_match'),
+            matching_skills=json.dumps(_strings(job_match.get('matching_skills'))),
+            missing_skills=json.dumps(_strings(job_match.get('missing_skills'))),
+            recommendations=json.dumps(_strings(job_match.get('recommendations')))
+        ) if isinstance(job_match, dict) else None
+        
+        resume.analysis = json.dumps(analysis) if self.archive_json else None
+    
+    def load(self, resume: Resume) -> Optional[Dict[str, Any]]:
+        """The analysis of a resume in the shape the model returned it"""
+        record = resume.analysis_record
+        if record is None:
+            # Analyses saved before the normalized tables existed
+            return json.loads(resume.analysis) if resume.analysis else None
+        
+        analysis = {
+            'personal_info': {field: getattr(record, field) or 'Not Found' for field in PERSONAL_FIELDS},
+            'summary': record.summary or '',
+            'skills': [skill.name for skill in record.skills],
+            'education': [{
+                'degree': entry.degree,
+                'institution': entry.institution,
+                'year': entry.year,
+                'details': entry.details
+            } for entry in record.education],
+            'experience': [{
+                'title': entry.title,
+                'company': entry.company,
+                'duration': entry.duration,
+                'responsibilities': json.loads(entry.responsibilities or '[]')
+            } for entry in record.experience],
+            'overall_score': record.overall_score
+        }
+        for field in LIST_FIELDS:
+            analysis[field] = json.loads(getattr(record, field) or '[]')
+        
+        if record.job_match:
+            analysis['job_match'] = {
+                'score': record.job_match.score,
+                'matching_skills': json.loads(record.job_match.matching_skills or '[]'),
+                'missing_skills': json.loads(record.job_match.missing_skills or '[]'),
+                'experience_match': record.job_match.experience_match or '',
+                'recommendations': json.loads(record.job_match.recommendations or '[]')
+            }
+        if record.prompt_original_tokens is not None:
+            analysis['prompt_tokens'] = compaction_counts(record.prompt_original_tokens, record.prompt_compacted_tokens or 0)
+            for field in ('chunks', 'largest_call_tokens'):
+                if getattr(record, f"prompt_{field}") is not None:
+                    analysis['prompt_tokens'][field] = getattr(record, f"prompt_{field}")
+        if record.source:
+            analysis['source'] = record.source
+        if record.error:
+            analysis['error'] = record.error
+        
+        return analysis
+    
+    def search(self, user_id: int, min_score: Optional[int] = None, max_score: Optional[int] = None,
+               skills: Optional[List[str]] = None, min_match_score: Optional[int] = None,
+               title: Optional[str] = None, company: Optional[str] = None,
+               after: Optional[Tuple[int, int]] = None, limit: int = 25) -> List[ResumeAnalysis]:
+        """A user's analyzed resumes matching every given filter, best score first
+        
+        skills must all be present. after is the (overall_score, resume_id) of the
+        last result of the previous page.
+        """
+        query = (
+            ResumeAnalysis.query
+            .options(selectinload(ResumeAnalysis.resume).load_only(Resume.id, Resume.filename, Resume.uploaded_at))
+            .options(selectinload(ResumeAnalysis.job_match).load_only(JobMatch.resume_id, JobMatch.score))
+            .filter(ResumeAnalysis.user_id == user_id)
+        )
+        
+        if min_score is not None:
+            query = query.filter(ResumeAnalysis.overall_score >= min_score)
+        if max_score is not None:
+            query = query.filter(ResumeAnalysis.overall_score <= max_score)
+        
+        if skills:
+            wanted = {normalize_term(skill) for skill in skills}
+            with_skills = (
+                db.session.query(analysis_skills.c.resume_id)
+                .join(Skill, Skill.id == analysis_skills.c.skill_id)
+                .filter(Skill.normalized.in_(wanted))
+                .group_by(analysis_skills.c.resume_id)
+                .having(db.func.count() == len(wanted))
+            )
+            query = query.filter(ResumeAnalysis.resume_id.in_(with_skills))
+        
+        if min_match_score is not None:
+            query = query.join(JobMatch).filter(JobMatch.score >= min_match_score)
+        
+        if title or company:
+            entries = db.session.query(ExperienceEntry.resume_id)
+            if title:
+                entries = entries.filter(ExperienceEntry.title.ilike(f"%{title}%"))
+            if company:
+                entries = entries.filter(ExperienceEntry.company.ilike(f"%{company}%"))
+            query = query.filter(ResumeAnalysis.resume_id.in_(entries))
+        
+        if after:
+            score, resume_id = after
+            # Bounded so the (user_id, overall_score, resume_id) index seeks to the cursor
+            query = query.filter(
+                ResumeAnalysis.overall_score <= score,
+                db.or_(ResumeAnalysis.overall_score < score, ResumeAnalysis.resume_id < resume_id)
+            )
+        
+        return query.order_by(ResumeAnalysis.overall_score.desc(), ResumeAnalysis.resume_id.desc()).limit(limit).all()
+    
+    def _skills(self, names) -> List[Skill]:
+        """Skill rows for the given names, created as needed, in first-seen order"""
+        wanted = {}
+        for name in _strings(names):
+            key = normalize_term(name)[:255]
+            if key:
+                wanted.setdefault(key, _clip(name.strip(), 255))
+        
+        if not wanted:
+            return []
+        
+        found = {skill.normalized: skill for skill in Skill.query.filter(Skill.normalized.in_(wanted))}
+        
+        for key, name in wanted.items():
+            if key in found:
+                continue
+            try:
+                # Another worker may add the same skill at the same time
+                with db.session.begin_nested():
+                    skill = Skill(name=name, normalized=key)
+                    db.session.add(skill)
+                found[key] = skill
+            except IntegrityError:
+                found[key] = Skill.query.filter_by(normalized=key).one()
+        
+        return [found[key] for key in wanted]
+
+def _score(value) -> int:
+    try:
+        return max(0, min(100, int(float(value))))
+    except (TypeError, ValueError):
+        return 0
+
+def _count(value) -> Optional[int]:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _clip(value, length: int) -> Optional[str]:
+    return str(value)[:length] if value is not None else None
+
+def _strings(values) -> List[str]:
+    return [str(value) for value in values if value is not None] if isinstance(values, list) else []
+
+def _entries(values) -> List[Dict[str, Any]]:
+    return [value for value in values if isinstance(value, dict)] if isinstance(values, list) else []
@@ -1,22 +1,51 @@
+import time
+_import_started = time.perf_counter()
+
 import os
 import json
-import tempfile
+import base64
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from flask import Flask, render_template, redirect, url_for, request, jsonify, session
+from flask import Flask, Response, render_template, redirect, url_for, request, jsonify, session, stream_with_context
 from authlib.integrations.flask_client import OAuth
 from werkzeug.utils import secure_filename
-from models import db, User, Resume
-from blob_storage import BlobStorageClient
+from werkzeug.exceptions import RequestEntityTooLarge
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from sqlalchemy.orm import load_only
+from models import db, User, Resume, AnalysisJob, ParsedDocument, StoredBlob
+from blob_storage import BlobStorageClient, LocalBlobStorageClient, UploadTooLarge, content_type_for, hash_stream
+from content_store import ContentStore
+from blob_cache import BlobCache
 from parser import ResumeParser
-from ai_client import GeminiClient
+from extractor import ResumeExtractor
+from prompt_compaction import PromptCompactor
+from search_index import BM25Index
+from analysis_store import AnalysisStore
+from ai_client import GeminiClient, ProxyTransport
+from analysis_cache import AnalysisCache
+from resilience import RetryPolicy, CircuitBreaker, TokenBucket
+from jobs import JobQueue, JobQueueFull
 from utils import login_required
+from http_utils import FastJSONProvider, ResponseCompressor, not_modified, set_validators
+from metrics import registry, stage
+import metrics
 import config
-import sys
-import os
 
 
 app = Flask(__name__)
 app.config.from_object(config)
+app.json = FastJSONProvider(app)
+
+# Request and stage timings for /metrics and the Server-Timing header
+metrics.init_app(app)
+
+# Compress large JSON and HTML responses for clients that accept it
+response_compressor = ResponseCompressor(
+    app,
+    min_size=app.config['COMPRESSION_MIN_SIZE']
+) if app.config['COMPRESSION_ENABLED'] else None
 
 # Force HTTPS redirects when behind Azure proxy
 from werkzeug.middleware.proxy_fix import ProxyFix
@@ -37,33 +66,131 @@ google = oauth.register(
 )
 
 # Initialize clients
-blob_client = BlobStorageClient(
-    connection_string=app.config['AZURE_STORAGE_CONNECTION_STRING'],
-    container_name=app.config['AZURE_CONTAINER_NAME']
+if app.config['BLOB_STORAGE_BACKEND'] == 'local':
+    blob_client = LocalBlobStorageClient(
+        root_dir=app.config['LOCAL_BLOB_DIR'],
+        container_name=app.config['AZURE_CONTAINER_NAME']
+    )
+else:
+    blob_client = BlobStorageClient(
+        connection_string=app.config['AZURE_STORAGE_CONNECTION_STRING'],
+        container_name=app.config['AZURE_CONTAINER_NAME']
+    )
+blob_cache = BlobCache(
+    blob_client,
+    directory=app.config['BLOB_CACHE_DIR'],
+    max_bytes=app.config['BLOB_CACHE_MAX_BYTES']
+) if app.config['BLOB_CACHE_ENABLED'] else None
+resume_parser = ResumeParser(
+    max_pages=app.config['PARSE_MAX_PAGES'],
+    max_chars=app.config['PARSE_MAX_CHARS'],
+    parallel_min_pages=app.config['PARSE_PARALLEL_MIN_PAGES'],
+    workers=app.config['PARSE_WORKERS']
+)
+resume_extractor = ResumeExtractor(app.config['SKILLS_DICTIONARY'])
+analysis_store = AnalysisStore(archive_json=app.config['ANALYSIS_ARCHIVE_JSON'])
+content_store = ContentStore()
+search_index = BM25Index(
+    snapshot_path=app.config['SEARCH_INDEX_PATH'],
+    sync_interval=app.config['SEARCH_INDEX_SYNC_INTERVAL']
+)
+analysis_cache = AnalysisCache(
+    max_entries=app.config['ANALYSIS_CACHE_SIZE'],
+    ttl=app.config['ANALYSIS_CACHE_TTL'],
+    db_ttl=app.config['ANALYSIS_CACHE_DB_TTL']
+) if app.config['ANALYSIS_CACHE_ENABLED'] else None
+gemini_transport = ProxyTransport(
+    app.config['GEMINI_PROXY_URL'],
+    pool_size=app.config['GEMINI_POOL_SIZE'],
+    connect_timeout=app.config['GEMINI_CONNECT_TIMEOUT'],
+    read_timeout=app.config['GEMINI_READ_TIMEOUT'],
+    gzip_requests=app.config['GEMINI_GZIP_REQUESTS']
+) if app.config['GEMINI_PROXY_URL'] else None
+gemini_client = GeminiClient(
+    api_key=app.config['GOOGLE_API_KEY'],
+    cache=analysis_cache,
+    transport=gemini_transport,
+    retry_policy=RetryPolicy(
+        max_attempts=app.config['GEMINI_MAX_ATTEMPTS'],
+        base_delay=app.config['GEMINI_BACKOFF_BASE'],
+        max_delay=app.config['GEMINI_BACKOFF_MAX']
+    ),
+    circuit_breaker=CircuitBreaker(
+        failure_threshold=app.config['GEMINI_CIRCUIT_FAILURES'],
+        reset_timeout=app.config['GEMINI_CIRCUIT_RESET']
+    ),
+    rate_limiter=TokenBucket(
+        rate_per_minute=app.config['GEMINI_RATE_LIMIT_RPM'],
+        burst=app.config['GEMINI_RATE_LIMIT_BURST'],
+        max_wait=app.config['GEMINI_RATE_LIMIT_WAIT']
+    ) if app.config['GEMINI_RATE_LIMIT_RPM'] > 0 else None,
+    extractor=resume_extractor,
+    compactor=PromptCompactor(
+        resume_budget=app.config['PROMPT_RESUME_TOKEN_BUDGET'],
+        job_budget=app.config['PROMPT_JOB_TOKEN_BUDGET'],
+        extractor=resume_extractor
+    ) if app.config['PROMPT_COMPACTION_ENABLED'] else None,
+    chunk_threshold=app.config['CHUNKED_ANALYSIS_THRESHOLD'] or None,
+    chunk_tokens=app.config['ANALYSIS_CHUNK_TOKENS'],
+    chunk_concurrency=app.config['ANALYSIS_CHUNK_CONCURRENCY']
 )
-resume_parser = ResumeParser()
-gemini_client = GeminiClient(api_key=app.config['GOOGLE_API_KEY'])
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
+# Signs the blob name handed out with a direct upload URL
+upload_tokens = URLSafeTimedSerializer(app.secret_key, salt='direct-upload')
 
+def preload():
+    """Load the heavy, fork-safe parts up front: libraries and the skills dictionary
+    
+    Meant for the gunicorn master with preload_app, so workers share the pages.
+    Nothing here opens a connection or starts a thread; network clients and the
+    Gemini SDK are created lazily in each worker instead.
+    """
+    started = time.perf_counter()
+    resume_parser.preload()
+    blob_client.preload()
+    resume_extractor.matcher
+    return time.perf_counter() - started
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-from app import app
-from models import db
+def extract_text(filename, file_content):
+    """Parse uploaded file content into plain text without touching disk"""
+    return resume_parser.parse_bytes(file_content, os.path.splitext(filename)[1])
 
-def init_database():
-    """Initialize database with tables"""
-    with app.app_context():
-        # Create all tables
-        db.create_all()
-        print("Database initialized successfully!")
-        print(f"Database location: {app.config['SQLALCHEMY_DATABASE_URI']}")
+def store_parsed_text(content_hash, text):
+    """Persist extracted text once per distinct file content"""
+    parsed = db.session.get(ParsedDocument, content_hash)
+    
+    if not parsed:
+        parsed = ParsedDocument(content_hash=content_hash, text=text)
+        db.session.add(parsed)
+    
+    return parsed
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def get_resume_text(resume):
+    """Return the stored text of a resume, parsing it only if it was never extracted"""
+    if resume.parsed_document:
+        return resume.parsed_document.text
+    
+    # Resumes uploaded before text was stored at upload time
+    with stage('blob_download'):
+        if blob_cache:
+            file_content = blob_cache.download_file(resume.blob_path)
+        else:
+            file_content = blob_client.download_file(resume.blob_path)
+    with stage('parse'):
+        text = extract_text(resume.filename, file_content)
+    
+    resume.content_hash = hashlib.sha256(file_content).hexdigest()
+    store_parsed_text(resume.content_hash, text)
+    search_index.add_document(resume.id, resume.user_id, text)
+    with stage('db_commit'):
+        db.session.commit()
+    
+    return text
 
 @app.route('/')
 def index():
@@ -109,12 +236,37 @@ def callback():
         print(f"OAuth error: {e}")
         return f"Authentication failed: {str(e)}", 400
 
+if app.config['DEV_LOGIN_ENABLED']:
+    # Only registered when explicitly enabled; load tests sign in many users without OAuth
+    print("WARNING: /dev/login is enabled; never set DEV_LOGIN_ENABLED in production")
+    
+    @app.route('/dev/login', methods=['POST'])
+    def dev_login():
+        """Sign in as the given email, creating the user if needed"""
+        email = (request.get_json(silent=True) or {}).get('email')
+        if not isinstance(email, str) or '@' not in email:
+            return jsonify({'error': 'email is required'}), 400
+        
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            user = User(email=email, name=email.split('@')[0], picture='')
+            db.session.add(user)
+            db.session.commit()
+        
+        session['user_id'] = user.id
+        session['user_email'] = user.email
+        session['user_name'] = user.name
+        session['user_picture'] = user.picture
+        
+        return jsonify({'success': True, 'user_id': user.id})
+
 @app.route('/dashboard')
 @login_required
 def dashboard():
     user_id = session.get('user_id')
-    resumes = Resume.query.filter_by(user_id=user_id).order_by(Resume.uploaded_at.desc()).all()
-    return render_template('dashboard.html', resumes=resumes)
+    resumes, next_cursor = list_resumes(user_id, limit=app.config['FILES_PAGE_SIZE'])
+    return render_template('dashboard.html', resumes=resumes, next_cursor=next_cursor,
+                           direct_uploads=direct_access_enabled())
 
 @app.route('/upload', methods=['POST'])
 @login_required
@@ -134,51 +286,567 @@ def upload():
         # Secure filename
         filename = secure_filename(file.filename)
         user_id = session.get('user_id')
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        blob_name = f"user_{user_id}/{timestamp}_{filename}"
         
-        # Read file content
-        file_content = file.read()
+        try:
+            # Hash the spooled upload first: content that is already stored is not uploaded again
+            with stage('hash'):
+                content_hash, size = hash_stream(
+                    file.stream,
+                    max_size=app.config['MAX_UPLOAD_SIZE'],
+                    chunk_size=app.config['UPLOAD_CHUNK_SIZE']
+                )
+            
+            stored = content_store.acquire(content_hash)
+            duplicate = stored is not None
+            
+            if not duplicate:
+                # Stream to blob storage in chunks; werkzeug has already spooled large
+                # uploads to disk, so memory use does not grow with file size
+                blob_name = new_blob_name(filename, content_hash)
+                with stage('blob_upload'):
+                    blob_url, _, _ = blob_client.upload_stream(
+                        blob_name,
+                        file.stream,
+                        max_size=app.config['MAX_UPLOAD_SIZE'],
+                        chunk_size=app.config['UPLOAD_CHUNK_SIZE']
+                    )
+                if blob_cache:
+                    blob_cache.invalidate(blob_name)
+                
+                stored, created = content_store.register(content_hash, blob_name, blob_url, size)
+                if not created:
+                    # An identical file was registered while ours was uploading
+                    discard_blob(blob_name)
+        except UploadTooLarge as e:
+            return jsonify({'error': str(e)}), 413
+        
+        # Extract text once so later analyses skip the download and parse
+        parsed_document = db.session.get(ParsedDocument, content_hash)
+        text = parsed_document.text if parsed_document else None
+        
+        if text is None:
+            try:
+                file.stream.seek(0)
+                with stage('parse'):
+                    text = resume_parser.parse_stream(file.stream, os.path.splitext(filename)[1])
+                store_parsed_text(content_hash, text)
+            except Exception as e:
+                # Keep the upload; the text is extracted again on first analysis
+                print(f"Parse error for {stored.blob_path}: {e}")
         
-        # Upload to Azure Blob Storage
-        blob_url = blob_client.upload_file(blob_name, file_content)
+        parsed = text is not None
         
         # Save to database
         resume = Resume(
             user_id=user_id,
             filename=filename,
-            blob_path=blob_name,
-            blob_url=blob_url
+            blob_path=stored.blob_path,
+            blob_url=stored.blob_url,
+            content_hash=content_hash
         )
         db.session.add(resume)
-        db.session.commit()
+        db.session.flush()
+        
+        if parsed:
+            search_index.add_document(resume.id, user_id, text)
+            if duplicate:
+                reuse_analysis(resume)
+        
+        with stage('db_commit'):
+            db.session.commit()
         
         return jsonify({
             'success': True,
             'resume_id': resume.id,
             'filename': filename,
+            'duplicate': duplicate,
+            'analyzed': resume.is_analyzed,
             'message': 'File uploaded successfully'
         }), 201
     
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         print(f"Upload error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def reuse_analysis(resume):
+    """Copy the analysis of the same user's identical upload, if there is one; the caller commits
+    
+    Other users' analyses are never copied. Their identical files still share the
+    stored text, and the analysis cache answers repeated model calls.
+    """
+    source = (
+        Resume.query
+        .options(load_only(Resume.id, Resume.analyzed_at, Resume.is_analyzed))
+        .filter(
+            Resume.user_id == resume.user_id,
+            Resume.content_hash == resume.content_hash,
+            Resume.is_analyzed.is_(True),
+            Resume.id != resume.id
+        )
+        .order_by(Resume.analyzed_at.desc())
+        .first()
+    )
+    if source is None:
+        return
+    
+    analysis = analysis_store.load(source)
+    if analysis:
+        save_analysis(resume, analysis, source.analyzed_at)
+
+def discard_blob(blob_path):
+    """Delete a blob nothing refers to any more; a failure only leaves an orphan behind"""
+    try:
+        blob_client.delete_blob(blob_path)
+    except Exception as e:
+        print(f"Blob delete error for {blob_path}: {e}")
+    
+    if blob_cache:
+        blob_cache.invalidate(blob_path)
+
+def new_blob_name(filename, content_hash=None):
+    """A path no other upload uses, naming neither the uploader nor the file
+    
+    Stored blobs are shared between users, so a path must never be written
+    twice; the random part also keeps a re-upload from landing on a copy whose
+    last reference is being released. Direct uploads are named before their
+    content is known.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if content_hash:
+        return f"blobs/{content_hash}-{secrets.token_hex(8)}{ext}"
+    return f"uploads/{secrets.token_hex(16)}{ext}"
+
+@app.route('/upload/direct', methods=['POST'])
+@login_required
+def upload_direct():
+    """Hand out a write-only SAS URL so the browser uploads straight to the container
+    
+    The client PUTs the file to upload_url with the returned headers, then posts
+    upload_token to /upload/confirm. The file never passes through this app.
+    """
+    if not direct_access_enabled():
+        return jsonify({'error': 'Direct uploads are not enabled'}), 501
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = data.get('filename') or ''
+        size = data.get('size')
+        
+        if not isinstance(filename, str) or not allowed_file(filename):
+            return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed'}), 400
+        
+        # Checked again on confirm; the size a client declares is only a hint
+        if isinstance(size, int) and size > app.config['MAX_UPLOAD_SIZE']:
+            return jsonify({'error': f"File exceeds the maximum upload size of {app.config['MAX_UPLOAD_SIZE']} bytes"}), 413
+        
+        user_id = session.get('user_id')
+        filename = secure_filename(filename)
+        blob_name = new_blob_name(filename)
+        expires_in = app.config['UPLOAD_SAS_TTL']
+        
+        return jsonify({
+            'upload_url': blob_client.generate_upload_url(blob_name, expires_in=expires_in),
+            'method': 'PUT',
+            'headers': {
+                'x-ms-blob-type': 'BlockBlob',
+                'x-ms-blob-content-type': content_type_for(filename)
+            },
+            'upload_token': upload_tokens.dumps({'user_id': user_id, 'blob_name': blob_name, 'filename': filename}),
+            'confirm_url': url_for('confirm_upload'),
+            'expires_in': expires_in
+        })
+    
+    except Exception as e:
+        print(f"Direct upload error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload/confirm', methods=['POST'])
+@login_required
+def confirm_upload():
+    """Register a blob the browser uploaded directly and queue its text extraction"""
+    if not direct_access_enabled():
+        return jsonify({'error': 'Direct uploads are not enabled'}), 501
+    
+    user_id = session.get('user_id')
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        # Signed by /upload/direct, so a client can only register the blob it was given
+        token = upload_tokens.loads(data.get('upload_token') or '', max_age=app.config['UPLOAD_SAS_TTL'] * 2)
+    except BadSignature:
+        return jsonify({'error': 'Invalid or expired upload token'}), 400
+    
+    if token['user_id'] != user_id:
+        return jsonify({'error': 'Invalid or expired upload token'}), 400
+    
+    blob_name = token['blob_name']
+    
+    try:
+        existing = Resume.query.options(load_only(Resume.id)).filter_by(blob_path=blob_name).first()
+        if existing:
+            return jsonify({'error': 'Upload already confirmed', 'resume_id': existing.id}), 409
+        
+        properties = blob_client.get_properties(blob_name)
+        if properties is None:
+            return jsonify({'error': 'The file was not uploaded'}), 404
+        
+        if properties['size'] > app.config['MAX_UPLOAD_SIZE']:
+            blob_client.delete_blob(blob_name)
+            return jsonify({'error': f"File exceeds the maximum upload size of {app.config['MAX_UPLOAD_SIZE']} bytes"}), 413
+        
+        if blob_cache:
+            blob_cache.invalidate(blob_name)
+        
+        resume = Resume(
+            user_id=user_id,
+            filename=token['filename'],
+            blob_path=blob_name,
+            blob_url=properties['url']
+        )
+        db.session.add(resume)
+        db.session.flush()
+        
+        # Hashing and parsing need the bytes, so a job worker reads them from storage.
+        # If the queue is full the job fails and the text is extracted on first analysis.
+        job = AnalysisJob(kind=AnalysisJob.EXTRACT, resume_id=resume.id, user_id=user_id)
+        enqueue_job(job)
+        
+        return jsonify({
+            'success': True,
+            'resume_id': resume.id,
+            'filename': resume.filename,
+            'job_id': job.id,
+            'status_url': url_for('get_job', job_id=job.id),
+            'message': 'File uploaded successfully'
+        }), 201
+    
+    except Exception as e:
+        print(f"Upload confirm error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/files/<int:resume_id>/download', methods=['GET'])
+@login_required
+def download_file(resume_id):
+    """The original file: a redirect to a short-lived read SAS URL, else served by the app"""
+    user_id = session.get('user_id')
+    resume = Resume.query.options(load_only(Resume.id, Resume.filename, Resume.blob_path)).filter_by(
+        id=resume_id, user_id=user_id
+    ).first()
+    
+    if not resume:
+        return jsonify({'error': 'Resume not found'}), 404
+    
+    try:
+        if direct_access_enabled():
+            return redirect(blob_client.generate_download_url(
+                resume.blob_path,
+                expires_in=app.config['DOWNLOAD_SAS_TTL'],
+                filename=resume.filename
+            ))
+        
+        content = blob_cache.download_file(resume.blob_path) if blob_cache else blob_client.download_file(resume.blob_path)
+        response = Response(bytes(content), mimetype=content_type_for(resume.filename))
+        response.headers['Content-Disposition'] = f'attachment; filename="{resume.filename}"'
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    except Exception as e:
+        print(f"Download error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def direct_access_enabled():
+    return app.config['BLOB_DIRECT_ACCESS'] and blob_client.supports_direct_access
+
 @app.route('/files', methods=['GET'])
 @login_required
 def list_files():
     user_id = session.get('user_id')
-    resumes = Resume.query.filter_by(user_id=user_id).order_by(Resume.uploaded_at.desc()).all()
     
-    return jsonify({
+    limit = request.args.get('limit', app.config['FILES_PAGE_SIZE'], type=int)
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, app.config['FILES_MAX_PAGE_SIZE'])
+    
+    # Any upload, analysis or delete changes one of these, so a matching ETag
+    # means the page the client holds is still current
+    count, last_uploaded, last_analyzed = db.session.query(
+        db.func.count(Resume.id), db.func.max(Resume.uploaded_at), db.func.max(Resume.analyzed_at)
+    ).filter(Resume.user_id == user_id).one()
+    etag = f"files-{count}-{_version(last_uploaded)}-{_version(last_analyzed)}"
+    
+    # No Last-Modified here: a delete does not move either timestamp forward
+    if not_modified(etag):
+        return set_validators(Response(status=304), etag)
+    
+    try:
+        resumes, next_cursor = list_resumes(user_id, request.args.get('cursor'), limit)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return set_validators(jsonify({
         'files': [{
             'id': r.id,
             'filename': r.filename,
             'uploaded_at': r.uploaded_at.isoformat(),
-            'analyzed': r.analysis is not None
-        } for r in resumes]
+            'analyzed': r.is_analyzed
+        } for r in resumes],
+        'next_cursor': next_cursor
+    }), etag)
+
+def _version(timestamp):
+    return timestamp.strftime('%Y%m%d%H%M%S%f') if timestamp else '0'
+
+def list_resumes(user_id, cursor=None, limit=25):
+    """One page of a user's resumes, newest first, without loading analyses
+    
+    Pages are keyed on (uploaded_at, id) of the last row seen, so each page is
+    an index range scan however deep the user has scrolled.
+    """
+    query = (
+        Resume.query
+        .options(load_only(Resume.id, Resume.filename, Resume.uploaded_at, Resume.is_analyzed))
+        .filter(Resume.user_id == user_id)
+    )
+    
+    if cursor:
+        uploaded_at, resume_id = decode_cursor(cursor)
+        uploaded_at = datetime.fromisoformat(uploaded_at)
+        # The redundant upper bound lets the index seek to the cursor instead of
+        # walking every newer entry to evaluate the OR
+        query = query.filter(
+            Resume.uploaded_at <= uploaded_at,
+            db.or_(Resume.uploaded_at < uploaded_at, Resume.id < resume_id)
+        )
+    
+    resumes = query.order_by(Resume.uploaded_at.desc(), Resume.id.desc()).limit(limit + 1).all()
+    
+    if len(resumes) <= limit:
+        return resumes, None
+    resumes = resumes[:limit]
+    return resumes, encode_cursor(resumes[-1].uploaded_at.isoformat(), resumes[-1].id)
+
+def encode_cursor(sort_value, resume_id):
+    """Opaque cursor for the row after which the next page starts"""
+    raw = f"{sort_value}|{resume_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        sort_value, resume_id = raw.split('|')
+        return sort_value, int(resume_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+@app.route('/files/search', methods=['GET'])
+@login_required
+def search_files():
+    """Filter analyzed resumes by score, skills, job match and experience"""
+    user_id = session.get('user_id')
+    
+    try:
+        limit = min(max(request.args.get('limit', app.config['FILES_PAGE_SIZE'], type=int), 1), app.config['FILES_MAX_PAGE_SIZE'])
+        skills = [skill for skill in request.args.get('skills', '').split(',') if skill.strip()]
+        after = None
+        if request.args.get('cursor'):
+            score, resume_id = decode_cursor(request.args['cursor'])
+            after = (int(score), resume_id)
+        
+        records = analysis_store.search(
+            user_id,
+            min_score=_int_arg('min_score'),
+            max_score=_int_arg('max_score'),
+            skills=skills,
+            min_match_score=_int_arg('min_match_score'),
+            title=request.args.get('title') or None,
+            company=request.args.get('company') or None,
+            after=after,
+            limit=limit + 1
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].overall_score, records[-1].resume_id)
+    
+    return jsonify({
+        'files': [{
+            'id': record.resume_id,
+            'filename': record.resume.filename,
+            'uploaded_at': record.resume.uploaded_at.isoformat(),
+            'overall_score': record.overall_score,
+            'job_match_score': record.job_match.score if record.job_match else None
+        } for record in records],
+        'next_cursor': next_cursor
     })
 
+def _int_arg(name):
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+@app.route('/files/<int:resume_id>', methods=['DELETE'])
+@login_required
+def delete_file(resume_id):
+    try:
+        user_id = session.get('user_id')
+        resume = Resume.query.filter_by(id=resume_id, user_id=user_id).first()
+        
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        # Other resumes with the same content keep the shared blob
+        unreferenced_blob = content_store.release(resume)
+        
+        AnalysisJob.query.filter_by(resume_id=resume.id).delete()
+        search_index.remove_document(resume.id, user_id)
+        db.session.delete(resume)
+        db.session.commit()
+        
+        # Only once the record is gone; a missing blob should not keep it around
+        if unreferenced_blob:
+            discard_blob(unreferenced_blob)
+        
+        return jsonify({'success': True, 'resume_id': resume_id})
+    
+    except Exception as e:
+        print(f"Delete error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def save_analysis(resume, analysis, analyzed_at=None):
+    """Attach an analysis to a resume; the caller commits"""
+    analysis_store.save(resume, analysis)
+    resume.is_analyzed = True
+    resume.analyzed_at = analyzed_at or datetime.utcnow()
+
+def run_analysis_job(job):
+    """Analyze the stored text of the resume for a queued job"""
+    if job.kind == AnalysisJob.BATCH:
+        return run_batch_job(job)
+    if job.kind == AnalysisJob.EXTRACT:
+        return run_extract_job(job)
+    
+    resume = db.session.get(Resume, job.resume_id)
+    
+    if not resume:
+        raise ValueError('Resume not found')
+    
+    resume_text = get_resume_text(resume)
+    
+    # Analyze with Gemini
+    analysis = gemini_client.analyze_resume(resume_text, job.job_description or '')
+    
+    # Save analysis (committed by the job queue)
+    save_analysis(resume, analysis)
+
+def run_extract_job(job):
+    """Hash, parse and index a directly uploaded resume"""
+    resume = db.session.get(Resume, job.resume_id)
+    
+    if not resume:
+        raise ValueError('Resume not found')
+    
+    get_resume_text(resume)
+    
+    uploaded_path = resume.blob_path
+    if StoredBlob.query.filter_by(blob_path=uploaded_path).count():
+        # A retried job: the reference was already taken
+        return
+    
+    stored = content_store.acquire(resume.content_hash)
+    
+    if stored is None:
+        properties = blob_client.get_properties(uploaded_path)
+        stored, _ = content_store.register(resume.content_hash, uploaded_path, resume.blob_url,
+                                                 properties['size'] if properties else None)
+    
+    if stored.blob_path != uploaded_path:
+        # Point at the copy already stored and drop the one just uploaded
+        resume.blob_path = stored.blob_path
+        resume.blob_url = stored.blob_url
+    
+    reuse_analysis(resume)
+    db.session.commit()
+    
+    if stored.blob_path != uploaded_path:
+        discard_blob(uploaded_path)
+
+def run_batch_job(job):
+    """Analyze many resumes against one job description with bounded concurrency"""
+    resume_ids = json.loads(job.payload)['resume_ids']
+    job_description = job.job_description or ''
+    
+    resumes = {r.id: r for r in Resume.query.filter(
+        Resume.id.in_(resume_ids),
+        Resume.user_id == job.user_id
+    )}
+    
+    # Load all stored texts in one query
+    hashes = {r.content_hash for r in resumes.values() if r.content_hash}
+    stored_texts = {p.content_hash: p.text for p in ParsedDocument.query.filter(
+        ParsedDocument.content_hash.in_(hashes)
+    )} if hashes else {}
+    
+    results = {}
+    texts = {}
+    
+    for resume_id in resume_ids:
+        resume = resumes.get(resume_id)
+        if not resume:
+            results[resume_id] = {'status': AnalysisJob.FAILED, 'error': 'Resume not found'}
+            continue
+        
+        try:
+            texts[resume_id] = stored_texts.get(resume.content_hash) or get_resume_text(resume)
+        except Exception as e:
+            results[resume_id] = {'status': AnalysisJob.FAILED, 'error': str(e)}
+    
+    def analyze_one(resume_id):
+        # Each thread needs its own app context (and so its own DB session) for the cache
+        with app.app_context():
+            return gemini_client.analyze_resume(texts[resume_id], job_description)
+    
+    analyses = {}
+    
+    with ThreadPoolExecutor(max_workers=app.config['BATCH_CONCURRENCY']) as pool:
+        futures = {pool.submit(analyze_one, resume_id): resume_id for resume_id in texts}
+        
+        for future in as_completed(futures):
+            resume_id = futures[future]
+            try:
+                analyses[resume_id] = future.result()
+                results[resume_id] = {'status': AnalysisJob.COMPLETED}
+            except Exception as e:
+                print(f"Batch analysis error for resume {resume_id}: {e}")
+                results[resume_id] = {'status': AnalysisJob.FAILED, 'error': str(e)}
+    
+    # Save all analyses in one commit (made by the job queue)
+    analyzed_at = datetime.utcnow()
+    for resume_id, analysis in analyses.items():
+        save_analysis(resumes[resume_id], analysis, analyzed_at)
+    
+    job.result = json.dumps([
+        dict(resume_id=resume_id, **results[resume_id]) for resume_id in resume_ids
+    ])
+
+job_queue = JobQueue(
+    app,
+    run_analysis_job,
+    workers=app.config['ANALYSIS_WORKERS'],
+    max_pending=app.config['ANALYSIS_QUEUE_SIZE'],
+    stale_after=app.config['ANALYSIS_JOB_STALE_AFTER'],
+    heartbeat_interval=app.config['ANALYSIS_JOB_HEARTBEAT']
+)
+
 @app.route('/analyze/<int:resume_id>', methods=['POST'])
 @login_required
 def analyze(resume_id):
@@ -192,39 +860,181 @@ def analyze(resume_id):
         # Get job description from request (optional)
         job_description = request.json.get('job_description', '') if request.is_json else ''
         
-        # Download file from blob storage
-        file_content = blob_client.download_file(resume.blob_path)
+        # Persist the job, then hand it to the worker pool
+        job = AnalysisJob(
+            resume_id=resume.id,
+            user_id=user_id,
+            job_description=job_description
+        )
+        return enqueue_job(job)
+    
+    except Exception as e:
+        print(f"Analysis error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analyze/batch', methods=['POST'])
+@login_required
+def analyze_batch():
+    try:
+        user_id = session.get('user_id')
+        data = request.get_json(silent=True) or {}
+        resume_ids = data.get('resume_ids')
+        
+        if not isinstance(resume_ids, list) or not resume_ids:
+            return jsonify({'error': 'resume_ids must be a non-empty list'}), 400
+        
+        if not all(isinstance(resume_id, int) and not isinstance(resume_id, bool) for resume_id in resume_ids):
+            return jsonify({'error': 'resume_ids must be integers'}), 400
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(resume.filename)[1]) as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file_path = tmp_file.name
+        # Drop duplicates but keep the requested order
+        resume_ids = list(dict.fromkeys(resume_ids))
         
+        if len(resume_ids) > app.config['BATCH_MAX_RESUMES']:
+            return jsonify({'error': f"At most {app.config['BATCH_MAX_RESUMES']} resumes per batch"}), 400
+        
+        job = AnalysisJob(
+            kind=AnalysisJob.BATCH,
+            user_id=user_id,
+            job_description=data.get('job_description', ''),
+            payload=json.dumps({'resume_ids': resume_ids})
+        )
+        return enqueue_job(job)
+    
+    except Exception as e:
+        print(f"Batch analysis error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/rank', methods=['POST'])
+@login_required
+def rank():
+    """Rank the user's resumes against a job description with BM25, without calling the model"""
+    try:
+        user_id = session.get('user_id')
+        data = request.get_json(silent=True) or {}
+        job_description = data.get('job_description', '')
+        
+        if not isinstance(job_description, str) or not job_description.strip():
+            return jsonify({'error': 'job_description is required'}), 400
+        
+        top_k = data.get('top_k', 20)
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        top_k = min(top_k, app.config['RANK_MAX_RESULTS'])
+        
+        started = time.perf_counter()
+        with stage('search'):
+            ranked = search_index.search(job_description, user_id=user_id, top_k=top_k)
+        took_ms = (time.perf_counter() - started) * 1000
+        
+        resumes = {
+            r.id: r for r in Resume.query
+            .options(load_only(Resume.id, Resume.filename, Resume.uploaded_at, Resume.is_analyzed))
+            .filter(Resume.id.in_([resume_id for resume_id, _ in ranked]), Resume.user_id == user_id)
+        }
+        
+        return jsonify({
+            'results': [{
+                'resume_id': resume_id,
+                'filename': resumes[resume_id].filename,
+                'uploaded_at': resumes[resume_id].uploaded_at.isoformat(),
+                'analyzed': resumes[resume_id].is_analyzed,
+                'score': round(score, 4)
+            } for resume_id, score in ranked if resume_id in resumes],
+            'took_ms': round(took_ms, 2)
+        })
+    
+    except Exception as e:
+        print(f"Rank error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def enqueue_job(job):
+    """Persist a job, hand it to the worker pool and return the 202 response"""
+    db.session.add(job)
+    with stage('db_commit'):
+        db.session.commit()
+    
+    try:
+        job_queue.submit(job.id)
+    except JobQueueFull as e:
+        job.status = AnalysisJob.FAILED
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return jsonify({'error': str(e)}), 503
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('get_job', job_id=job.id)
+    }), 202
+
+@app.route('/analyze/<int:resume_id>/stream', methods=['GET', 'POST'])
+@login_required
+def analyze_stream(resume_id):
+    """Server-Sent Events: push analysis sections as the model produces them"""
+    user_id = session.get('user_id')
+    resume = Resume.query.filter_by(id=resume_id, user_id=user_id).first()
+    
+    if not resume:
+        return jsonify({'error': 'Resume not found'}), 404
+    
+    # POST bodies avoid URL length limits for long job descriptions
+    if request.is_json:
+        job_description = request.json.get('job_description', '')
+    else:
+        job_description = request.args.get('job_description', '')
+    
+    try:
+        resume_text = get_resume_text(resume)
+    except Exception as e:
+        print(f"Analysis error: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
         try:
-            # Parse resume
-            resume_text = resume_parser.parse(tmp_file_path)
+            analysis = None
             
-            # Analyze with Gemini
-            analysis = gemini_client.analyze_resume(resume_text, job_description)
+            for event in gemini_client.stream_analysis(resume_text, job_description):
+                if event[0] == 'section':
+                    yield sse_event('section', {'key': event[1], 'value': event[2]})
+                else:
+                    analysis = event[1]
             
-            # Save analysis to database
-            resume.analysis = json.dumps(analysis)
-            resume.analyzed_at = datetime.utcnow()
+            resume = db.session.get(Resume, resume_id)
+            save_analysis(resume, analysis)
             db.session.commit()
             
-            return jsonify({
-                'success': True,
-                'analysis': analysis
+            yield sse_event('done', {
+                'resume_id': resume_id,
+                'analyzed_at': resume.analyzed_at.isoformat()
             })
-        
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_file_path):
-                os.remove(tmp_file_path)
+        except Exception as e:
+            print(f"Streaming analysis error: {e}")
+            yield sse_event('error', {'error': str(e)})
     
-    except Exception as e:
-        print(f"Analysis error: {e}")
-        return jsonify({'error': str(e)}), 500
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    user_id = session.get('user_id')
+    job = AnalysisJob.query.filter_by(id=job_id, user_id=user_id).first()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job.to_dict())
 
 @app.route('/analysis/<int:resume_id>', methods=['GET'])
 @login_required
@@ -235,16 +1045,25 @@ def get_analysis(resume_id):
     if not resume:
         return jsonify({'error': 'Resume not found'}), 404
     
-    if not resume.analysis:
+    # Every new analysis moves analyzed_at, so it alone identifies the stored version
+    etag = f"analysis-{resume.id}-{_version(resume.analyzed_at)}"
+    last_modified = resume.analyzed_at or resume.uploaded_at
+    
+    if resume.is_analyzed and not_modified(etag, last_modified):
+        return set_validators(Response(status=304), etag, last_modified)
+    
+    analysis = analysis_store.load(resume) if resume.is_analyzed else None
+    
+    if analysis is None:
         return jsonify({'error': 'Resume not analyzed yet'}), 404
     
-    return jsonify({
+    return set_validators(jsonify({
         'resume_id': resume.id,
         'filename': resume.filename,
         'uploaded_at': resume.uploaded_at.isoformat(),
         'analyzed_at': resume.analyzed_at.isoformat() if resume.analyzed_at else None,
-        'analysis': json.loads(resume.analysis)
-    })
+        'analysis': analysis
+    }), etag, last_modified)
 
 @app.route('/analysis/view/<int:resume_id>')
 @login_required
@@ -253,6 +1072,73 @@ def view_analysis(resume_id):
     return render_template('analysis.html', resume_id=resume_id)
 
 
+# Existing stats, exported as metrics; the names listed only ever go up
+registry.register_stats(
+    'analysis_cache', "Analysis cache",
+    lambda: analysis_cache.stats() if analysis_cache else None,
+    counters=('memory_hits', 'db_hits', 'misses', 'stores', 'evictions', 'llm_calls_saved', 'saved_seconds')
+)
+registry.register_stats(
+    'gemini', "Gemini resilience",
+    lambda: dict(
+        gemini_client.resilience_stats(),
+        circuit_open=int(gemini_client.circuit_breaker.stats()['state'] != CircuitBreaker.CLOSED)
+    ),
+    counters=(
+        'circuit_breaker_opened', 'circuit_breaker_rejected', 'circuit_breaker_failures',
+        'circuit_breaker_successes', 'rate_limiter_acquired', 'rate_limiter_throttled',
+        'rate_limiter_rejected', 'rate_limiter_waited_seconds', 'retries'
+    )
+)
+registry.register_stats(
+    'prompt', "Prompt compaction",
+    gemini_client.prompt_stats,
+    counters=('prompts', 'original_tokens', 'compacted_tokens', 'chunked')
+)
+registry.register_stats(
+    'compression', "Response compression",
+    lambda: response_compressor.stats() if response_compressor else None,
+    counters=('responses', 'bytes_in', 'bytes_out')
+)
+registry.register_stats(
+    'blob_cache', "Blob download cache",
+    lambda: blob_cache.stats() if blob_cache else None,
+    counters=('hits', 'misses', 'stores', 'evictions', 'invalidations', 'bytes_downloaded', 'bytes_served')
+)
+registry.register_stats(
+    'uploads', "Upload de-duplication",
+    content_store.stats,
+    counters=('stored', 'deduplicated', 'bytes_saved', 'released', 'deleted')
+)
+registry.register_stats('search_index', "Search index", search_index.stats)
+registry.register_stats('jobs', "Analysis jobs", lambda: {'pending': job_queue.pending()})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Not found'}), 404
+    
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stats', methods=['GET'])
+@login_required
+def stats():
+    return jsonify({
+        'analysis_cache': analysis_cache.stats() if analysis_cache else None,
+        'gemini': gemini_client.resilience_stats(),
+        'prompts': gemini_client.prompt_stats(),
+        'compression': response_compressor.stats() if response_compressor else None,
+        'blob_cache': blob_cache.stats() if blob_cache else None,
+        'uploads': content_store.stats(),
+        'pending_jobs': job_queue.pending(),
+        'search_index': search_index.stats()
+    })
+
 @app.route('/logout')
 def logout():
     session.clear()
@@ -262,16 +1148,19 @@ def logout():
 def not_found(e):
     return jsonify({'error': 'Not found'}), 404
 
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({'error': f"File exceeds the maximum upload size of {app.config['MAX_UPLOAD_SIZE']} bytes"}), 413
+
 @app.errorhandler(500)
 def internal_error(e):
     return jsonify({'error': 'Internal server error'}), 500
 
-
-init_database()
-with app.app_context():
-        db.create_all()
-
+# Importing the app must stay free of side effects: the schema is created by
+# migrations/init_db.py, clients connect on first use
+IMPORT_SECONDS = time.perf_counter() - _import_started
+registry.register_stats('app', "App startup", lambda: {'import_seconds': IMPORT_SECONDS})
 
 if __name__ == '__main__':
-    
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Run migrations/init_db.py first to create or upgrade the schema
+    app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,120 @@
+"""
+Synthetic resume corpus for the benchmarks: PDF and DOCX files of a given
+page count, with section headings, bullet points, special characters and a
+skills table on every page. Generation is seeded, so the same arguments always
+produce the same documents.
+
+    python benchmarks/corpus.py --out benchmarks/corpus --pages 1 5 25 50
+"""
+import argparse
+import io
+import os
+import random
+
+import fitz  # PyMuPDF
+from docx import Document
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+LINE_HEIGHT = 14
+TABLE_ROWS, TABLE_COLUMNS = 4, 3
+
+SECTIONS = ['SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS', 'CERTIFICATIONS']
+SKILLS = [
+    'Python', 'Flask', 'Django', 'SQL', 'PostgreSQL', 'Azure', 'AWS', 'Docker', 'Kubernetes',
+    'Terraform', 'React', 'TypeScript', 'Go', 'Java', 'Spark', 'Kafka', 'Redis', 'GraphQL'
+]
+VERBS = ['Led', 'Built', 'Designed', 'Migrated', 'Optimized', 'Automated', 'Scaled', 'Owned']
+OBJECTS = [
+    'the payments API', 'a data pipeline', 'CI/CD for 40 services', 'the search platform',
+    'an internal ML toolkit', 'customer onboarding', 'the reporting warehouse'
+]
+# Bullets and symbols that ResumeParser._clean_text has to strip
+DECORATIONS = ['•', '★', '→', '—', '✓', '·']
+
+def resume_lines(page_number, rng):
+    """Lines of text for one page: a heading, bullets and a contact footer"""
+    lines = [f"{SECTIONS[page_number % len(SECTIONS)]}"]
+    for _ in range(38):
+        lines.append(
+            f"{rng.choice(DECORATIONS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} using "
+            f"{rng.choice(SKILLS)} and {rng.choice(SKILLS)}; improved throughput by {rng.randint(5, 90)}%."
+        )
+    lines.append(f"Jane Doe · jane.doe@example.com · +1 555 01{page_number % 100:02d} · Page {page_number + 1}")
+    return lines
+
+def table_cells(rng):
+    return [[rng.choice(SKILLS) for _ in range(TABLE_COLUMNS)] for _ in range(TABLE_ROWS)]
+
+def make_pdf(pages, seed=0):
+    """PDF bytes with the given number of pages"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    
+    for page_number in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = MARGIN
+        for line in resume_lines(page_number, rng):
+            page.insert_text((MARGIN, y), line, fontsize=8)
+            y += LINE_HEIGHT
+        
+        # Skills table: ruled cells with one skill each
+        cell_width = (PAGE_WIDTH - 2 * MARGIN) / TABLE_COLUMNS
+        for row, cells in enumerate(table_cells(rng)):
+            for column, cell in enumerate(cells):
+                x0 = MARGIN + column * cell_width
+                y0 = y + row * 2 * LINE_HEIGHT
+                page.draw_rect(fitz.Rect(x0, y0, x0 + cell_width, y0 + 2 * LINE_HEIGHT), width=0.5)
+                page.insert_text((x0 + 4, y0 + LINE_HEIGHT + 2), cell, fontsize=8)
+    
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def make_docx(pages, seed=0):
+    """DOCX bytes with the given number of pages, separated by page breaks"""
+    rng = random.Random(seed)
+    doc = Document()
+    
+    for page_number in range(pages):
+        lines = resume_lines(page_number, rng)
+        doc.add_heading(lines[0], level=1)
+        for line in lines[1:]:
+            doc.add_paragraph(line)
+        
+        table = doc.add_table(rows=TABLE_ROWS, cols=TABLE_COLUMNS)
+        for row, cells in zip(table.rows, table_cells(rng)):
+            for cell, text in zip(row.cells, cells):
+                cell.text = text
+        
+        if page_number < pages - 1:
+            doc.add_page_break()
+    
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def build_corpus(page_counts, seed=0):
+    """{(kind, pages): bytes} for every page count, PDF and DOCX"""
+    corpus = {}
+    for pages in page_counts:
+        corpus[('pdf', pages)] = make_pdf(pages, seed)
+        corpus[('docx', pages)] = make_docx(pages, seed)
+    return corpus
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus'))
+    arg_parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 10, 25, 50])
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    os.makedirs(args.out, exist_ok=True)
+    for (kind, pages), data in build_corpus(args.pages, args.seed).items():
+        path = os.path.join(args.out, f"resume_{pages:02d}p.{kind}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        print(f"{path}: {len(data)} bytes")
+
+if __name__ == '__main__':
+    main()
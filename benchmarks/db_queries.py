@@ -0,0 +1,199 @@
+"""
+Time of the hot database queries on a large synthetic table, with the
+migrated indexes and again without them:
+
+    python benchmarks/db_queries.py                          # 1M resumes in a temporary SQLite file
+    python benchmarks/db_queries.py --resumes 100000 --repeat 20
+    python benchmarks/db_queries.py --database-url postgresql+psycopg://bench@localhost/bench_empty
+
+The schema is built by the migrations, filled with --resumes rows spread over
+--users users (one of them owns --hot-share of all rows, so its listing is
+the deepest) and analyzed. Each query runs through the app's own code where
+there is one: the dashboard's first page, a page deep into the hot user's
+listing, the lookup of an earlier upload of the same file, the lookup of a
+direct upload by blob path and the re-queueing of pending jobs. Time is the
+median of --repeat runs. The unindexed pass drops every secondary index on
+resumes and analysis_jobs first, so only use a throwaway database.
+"""
+import argparse
+import hashlib
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, insert, text
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'migrations'))
+
+INSERT_BATCH = 50000
+EPOCH = datetime(2024, 1, 1)
+
+def configure(database_url, work_dir):
+    """Point the app at the benchmark database; must run before the app is imported"""
+    os.environ.update(
+        DATABASE_URL=database_url or f"sqlite:///{os.path.join(work_dir, 'bench.db')}",
+        BLOB_STORAGE_BACKEND='local',
+        LOCAL_BLOB_DIR=os.path.join(work_dir, 'blobs'),
+        SEARCH_INDEX_PATH=os.path.join(work_dir, 'search_index.pickle'),
+        BLOB_CACHE_DIR=os.path.join(work_dir, 'blob_cache')
+    )
+
+def populate(db, args):
+    """Insert the users, resumes and jobs; the hot user's rows are spread through the table"""
+    from models import User, Resume, AnalysisJob
+    
+    db.session.execute(insert(User.__table__), [
+        {'id': user_id, 'email': f"bench{user_id}@example.com"} for user_id in range(1, args.users + 1)
+    ])
+    
+    hot_every = max(1, round(1 / args.hot_share))
+    started = time.perf_counter()
+    for start in range(1, args.resumes + 1, INSERT_BATCH):
+        rows = []
+        for resume_id in range(start, min(start + INSERT_BATCH, args.resumes + 1)):
+            user_id = 1 if resume_id % hot_every == 0 else 2 + resume_id % max(1, args.users - 1)
+            uploaded_at = EPOCH + timedelta(seconds=resume_id * 7)
+            rows.append({
+                'id': resume_id,
+                'user_id': user_id,
+                'filename': f"resume_{resume_id}.pdf",
+                'blob_path': f"user_{user_id}/{resume_id}.pdf",
+                'is_analyzed': resume_id % 3 == 0,
+                'uploaded_at': uploaded_at,
+                'analyzed_at': uploaded_at if resume_id % 3 == 0 else None,
+                # Every tenth upload repeats the file before it
+                'content_hash': hashlib.sha256(str(resume_id - (resume_id % 10 == 0)).encode()).hexdigest()
+            })
+        db.session.execute(insert(Resume.__table__), rows)
+        db.session.commit()
+        print(f"\rInserted {rows[-1]['id']:,} of {args.resumes:,} resumes", end='', flush=True)
+    print(f" in {time.perf_counter() - started:.1f}s")
+    
+    # Almost every job has finished; workers look for the few still queued
+    jobs = args.resumes // 5
+    for start in range(1, jobs + 1, INSERT_BATCH):
+        db.session.execute(insert(AnalysisJob.__table__), [{
+            'id': job_id,
+            'kind': AnalysisJob.SINGLE,
+            'resume_id': job_id * 5,
+            'user_id': 1,
+            'status': AnalysisJob.QUEUED if job_id % 1000 == 0 else AnalysisJob.COMPLETED,
+            'created_at': EPOCH + timedelta(seconds=job_id * 35)
+        } for job_id in range(start, min(start + INSERT_BATCH, jobs + 1))])
+        db.session.commit()
+    
+    # Planner statistics, as a long-running database would have them
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+def build_queries(db, args):
+    """{name: zero-argument callable} over the populated tables"""
+    from app import list_resumes, reuse_analysis, encode_cursor, job_queue
+    from models import Resume
+    
+    hot_user = 1
+    hot_rows = db.session.query(db.func.count(Resume.id)).filter(Resume.user_id == hot_user).scalar()
+    # The cursor of a page 90% of the way down the hot user's listing
+    deep = (
+        db.session.query(Resume.uploaded_at, Resume.id)
+        .filter(Resume.user_id == hot_user)
+        .order_by(Resume.uploaded_at.desc(), Resume.id.desc())
+        .offset(int(hot_rows * 0.9))
+        .first()
+    )
+    deep_cursor = encode_cursor(deep.uploaded_at.isoformat(), deep.id)
+    
+    probe = db.session.get(Resume, args.resumes // 2)
+    duplicate = Resume(id=0, user_id=probe.user_id, content_hash=probe.content_hash)
+    
+    def reuse_lookup():
+        reuse_analysis(duplicate)
+        db.session.rollback()
+    
+    def recover_jobs():
+        # Into a scratch queue, so no workers are started
+        saved, job_queue._queue = job_queue._queue, queue.Queue()
+        try:
+            job_queue._recover_pending()
+        finally:
+            job_queue._queue = saved
+    
+    print(f"Hot user: {hot_rows:,} resumes; other users about {(args.resumes - hot_rows) // max(1, args.users - 1):,} each")
+    return {
+        'dashboard first page': lambda: list_resumes(hot_user, limit=args.page_size),
+        'dashboard page at 90%': lambda: list_resumes(hot_user, cursor=deep_cursor, limit=args.page_size),
+        'other user first page': lambda: list_resumes(probe.user_id, limit=args.page_size),
+        'same file lookup': reuse_lookup,
+        'direct upload lookup': lambda: Resume.query.filter_by(blob_path=probe.blob_path).first(),
+        'pending job recovery': recover_jobs
+    }
+
+def measure(queries, repeat):
+    """{name: median milliseconds}"""
+    results = {}
+    for name, fn in queries.items():
+        fn()  # Warm the page cache and the statement cache
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+def drop_indexes(db):
+    """Drop every secondary index on the tables the queries read"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in ('resumes', 'analysis_jobs'):
+            for index in inspector.get_indexes(table):
+                connection.execute(text(f"DROP INDEX {index['name']}"))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--resumes', type=int, default=1000000)
+    arg_parser.add_argument('--users', type=int, default=1000)
+    arg_parser.add_argument('--hot-share', type=float, default=0.1, help="fraction of all resumes owned by one user")
+    arg_parser.add_argument('--page-size', type=int, default=25)
+    arg_parser.add_argument('--repeat', type=int, default=9)
+    arg_parser.add_argument('--database-url', help="an empty database to fill (default: a temporary SQLite file)")
+    arg_parser.add_argument('--indexed-only', action='store_true', help="skip the pass without indexes")
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(prefix='resume-db-bench-') as work_dir:
+        configure(args.database_url, work_dir)
+        
+        from app import app
+        from models import db, Resume
+        from init_db import init_database
+        
+        init_database()
+        with app.app_context():
+            if db.session.query(Resume.id).first():
+                print("The database already holds resumes; use an empty one")
+                return 1
+            
+            print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+            populate(db, args)
+            queries = build_queries(db, args)
+            
+            passes = {'indexed': measure(queries, args.repeat)}
+            if not args.indexed_only:
+                drop_indexes(db)
+                db.session.execute(text('ANALYZE'))
+                db.session.commit()
+                passes['unindexed'] = measure(queries, args.repeat)
+    
+    print(f"\n{'query (median ms)':<26}" + ''.join(f"{name:>12}" for name in passes))
+    for query in passes['indexed']:
+        print(f"{query:<26}" + ''.join(f"{results[query]:>12.2f}" for results in passes.values()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
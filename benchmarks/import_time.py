@@ -0,0 +1,91 @@
+"""
+Time to import the app in a fresh interpreter, which every gunicorn worker
+(without preloading), CLI script and test run pays:
+
+    python benchmarks/import_time.py                  # fastest of 5 runs and the slowest modules
+    python benchmarks/import_time.py --budget 1.5     # exit 1 if the import takes longer
+
+The app is imported with local blob storage and a throwaway SQLite database,
+so nothing it does at import time may reach the network. Also reports which
+heavy libraries ended up imported; they should load on first use.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded on first use or by app.preload(), never by importing the app
+LAZY_MODULES = ('fitz', 'docx', 'azure.storage.blob', 'google.generativeai')
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(' '.join(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+def run_probe(env):
+    """(seconds, eager modules) for one import in a new interpreter"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE] + list(LAZY_MODULES),
+        cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    return float(output[-2]), output[-1].split()
+
+def slowest_modules(env, top):
+    """[(cumulative microseconds, module)] imported directly by app.py, slowest first"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True
+    ).stderr
+    
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only the app's own imports, one level down, so nested modules are not counted twice
+        if name.startswith('   ') and not name.startswith('     '):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--top', type=int, default=10, help="slowest top-level imports to list")
+    arg_parser.add_argument('--budget', type=float, help="fail if the fastest import takes longer, in seconds")
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(prefix='resume-import-') as work_dir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'import.db')}",
+            BLOB_STORAGE_BACKEND='local',
+            LOCAL_BLOB_DIR=os.path.join(work_dir, 'blobs'),
+            SEARCH_INDEX_PATH=os.path.join(work_dir, 'search_index.pickle')
+        )
+        
+        samples = [run_probe(env) for _ in range(args.repeat)]
+        seconds = min(elapsed for elapsed, _ in samples)
+        eager = samples[0][1]
+        
+        print(f"import app: {seconds * 1000:.0f} ms (fastest of {args.repeat})")
+        print(f"\n{'module':<40} {'cumulative ms':>14}")
+        for cumulative, name in slowest_modules(env, args.top):
+            print(f"{name:<40} {cumulative / 1000:>14.1f}")
+    
+    status = 0
+    if eager:
+        print(f"\nImported eagerly, should be lazy: {', '.join(eager)}")
+        status = 1
+    if args.budget is not None and seconds > args.budget:
+        print(f"\nOver the budget of {args.budget:.2f}s")
+        status = 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
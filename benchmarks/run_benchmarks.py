@@ -0,0 +1,197 @@
+"""
+Time and peak memory of the text pipeline stages on a synthetic corpus,
+compared against a stored baseline:
+
+    python benchmarks/run_benchmarks.py                  # compare, exit 1 on regression
+    python benchmarks/run_benchmarks.py --save-baseline  # record this machine's numbers
+    python benchmarks/run_benchmarks.py --stages parse_pdf clean_text --threshold 0.15
+
+Stages: parse_pdf / parse_docx at several page counts, clean_text,
+build_prompt, compact_prompt and decode_response. Time is the fastest of
+--repeat samples, per call, which is the least disturbed by other load on
+the machine; peak memory is what tracemalloc sees during one
+call, so allocations inside MuPDF itself are not counted. Baselines only
+mean something on the machine that recorded them.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), 'scripts'))
+
+import fitz  # PyMuPDF
+from corpus import build_corpus, make_pdf
+from parser import ResumeParser
+from ai_client import GeminiClient
+from prompt_compaction import PromptCompactor
+from fake_gemini_proxy import SAMPLE_ANALYSIS
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+PAGE_COUNTS = (1, 5, 25, 50)
+JOB_DESCRIPTION = "Senior backend engineer: Python, Flask, PostgreSQL, Azure, Docker. " * 20
+# Differences below these are noise, whatever the relative change
+MIN_TIME_DELTA_MS = 0.05
+MIN_MEMORY_DELTA_KB = 64
+
+class StubTransport:
+    """Lets GeminiClient be built without a proxy; the benchmarks never call the model"""
+    base_url = 'http://benchmark.invalid'
+
+def build_stages(workers):
+    """{stage name: zero-argument callable}"""
+    parser = ResumeParser(workers=workers)
+    client = GeminiClient(api_key='benchmark', transport=StubTransport())
+    compactor = PromptCompactor()
+    corpus = build_corpus(PAGE_COUNTS)
+    
+    stages = {}
+    for (kind, pages), data in sorted(corpus.items()):
+        stages[f"parse_{kind}/{pages}p"] = lambda data=data, kind=kind: parser.parse_bytes(data, kind)
+    
+    with fitz.open(stream=make_pdf(PAGE_COUNTS[-1]), filetype='pdf') as doc:
+        raw_text = ''.join(page.get_text() for page in doc)
+    resume_text = parser._clean_text(raw_text)
+    fenced_response = f"```json\n{json.dumps(SAMPLE_ANALYSIS, indent=2)}\n```"
+    
+    stages['clean_text'] = lambda: parser._clean_text(raw_text)
+    stages['build_prompt'] = lambda: client._build_analysis_prompt(resume_text, JOB_DESCRIPTION)
+    stages['compact_prompt'] = lambda: compactor.compact(resume_text, JOB_DESCRIPTION)
+    stages['decode_response'] = lambda: client._decode_response(fenced_response)
+    return stages
+
+def measure(fn, repeat):
+    """Milliseconds per call in the fastest sample and peak traced KB of a single call"""
+    fn()  # Warm up caches and lazy imports
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = timer.repeat(repeat=repeat, number=number)
+    time_ms = min(samples) / number * 1000
+    
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {'time_ms': round(time_ms, 4), 'peak_kb': round(peak / 1024, 1)}
+
+def calibrate(repeat):
+    """Milliseconds for a fixed pure-Python workload, to scale out machine speed changes"""
+    def workload():
+        text = ' '.join(str(number) for number in range(20000))
+        return sorted(text.split(), key=len)
+    return min(timeit.repeat(workload, repeat=repeat * 3, number=5)) / 5 * 1000
+
+def compare(results, baseline, threshold, memory_threshold, speed=1.0):
+    """Print each stage against its baseline and return the names that regressed
+    
+    Baseline times are multiplied by speed, the ratio of this run's calibration
+    time to the baseline's, so a uniformly slower or busier machine is not
+    reported as a regression.
+    """
+    regressions = []
+    print(f"{'stage':<20} {'time ms':>10} {'base':>10} {'change':>8} {'peak KB':>10} {'base':>10} {'change':>8}")
+    
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base:
+            base = dict(base, time_ms=base['time_ms'] * speed)
+        else:
+            print(f"{name:<20} {result['time_ms']:>10.3f} {'-':>10} {'new':>8} {result['peak_kb']:>10.1f} {'-':>10} {'new':>8}")
+            continue
+        
+        time_change = result['time_ms'] / base['time_ms'] - 1 if base['time_ms'] else 0.0
+        memory_change = result['peak_kb'] / base['peak_kb'] - 1 if base['peak_kb'] else 0.0
+        slower = (time_change > threshold
+                  and result['time_ms'] - base['time_ms'] > MIN_TIME_DELTA_MS)
+        bigger = (memory_change > memory_threshold
+                  and result['peak_kb'] - base['peak_kb'] > MIN_MEMORY_DELTA_KB)
+        
+        flag = '  REGRESSION' if slower or bigger else ''
+        print(f"{name:<20} {result['time_ms']:>10.3f} {base['time_ms']:>10.3f} {time_change:>+8.1%} "
+              f"{result['peak_kb']:>10.1f} {base['peak_kb']:>10.1f} {memory_change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    
+    return regressions
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pymupdf': fitz.VersionBind
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    arg_parser.add_argument('--save-baseline', action='store_true', help="write the results as the new baseline")
+    arg_parser.add_argument('--stages', nargs='+', help="only stages whose names start with one of these")
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--threshold', type=float, default=0.3, help="allowed relative slowdown")
+    arg_parser.add_argument('--memory-threshold', type=float, default=0.25, help="allowed relative peak memory growth")
+    arg_parser.add_argument('--workers', type=int, default=1, help="ResumeParser process pool size")
+    args = arg_parser.parse_args()
+    
+    stages = build_stages(args.workers)
+    if args.stages:
+        stages = {name: fn for name, fn in stages.items() if name.startswith(tuple(args.stages))}
+    
+    calibration_ms = calibrate(args.repeat)
+    results = {}
+    for name, fn in stages.items():
+        results[name] = measure(fn, args.repeat)
+    # Calibrate on both sides of the run; the slower reading reflects the load it ran under
+    calibration_ms = max(calibration_ms, calibrate(args.repeat))
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'machine': machine_info(),
+                'calibration_ms': round(calibration_ms, 4),
+                'stages': results
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline of {len(results)} stages written to {args.baseline}")
+        return 0
+    
+    baseline = {'machine': {}, 'stages': {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+    
+    if baseline['machine'] and baseline['machine'] != machine_info():
+        print(f"Warning: baseline was recorded on a different machine: {baseline['machine']}")
+    
+    speed = calibration_ms / baseline['calibration_ms'] if baseline.get('calibration_ms') else 1.0
+    print(f"Calibration: {calibration_ms:.3f} ms, {speed:.2f}x the baseline machine time")
+    
+    regressions = compare(results, baseline['stages'], args.threshold, args.memory_threshold, speed)
+    
+    if regressions:
+        # A burst of load elsewhere can slow one stage; only a repeatable slowdown fails the run
+        print(f"Re-measuring {', '.join(regressions)}...")
+        for name in regressions:
+            again = measure(stages[name], args.repeat)
+            results[name] = {key: min(results[name][key], again[key]) for key in again}
+        rechecked = {name: results[name] for name in regressions}
+        regressions = compare(rechecked, baseline['stages'], args.threshold, args.memory_threshold, speed)
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed beyond the threshold: {', '.join(regressions)}")
+        return 1
+    
+    print("No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
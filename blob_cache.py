@@ -0,0 +1,222 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+# Cross-process locking is POSIX only; elsewhere eviction is only serialized per process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+TEMP_PREFIX = '.tmp-'
+LOCK_NAME = '.lock'
+# Temp files older than this were left by a killed process
+STALE_TEMP_SECONDS = 3600
+
+class BlobCache:
+    """Read-through disk cache in front of a blob storage client's downloads
+    
+    Entries are keyed by blob path and ETag. Every read is revalidated with a
+    conditional download, so an unchanged blob costs a round trip but no transfer.
+    The directory is shared by all workers on a host: entries are written to a
+    temp file and renamed into place, and eviction runs under a lock file. Files
+    are touched on every hit and evicted least recently used first once the total
+    exceeds max_bytes. Reads are memory-mapped.
+    """
+    
+    def __init__(self, client, directory, max_bytes=512 * 1024 * 1024):
+        self.client = client
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'invalidations': 0,
+                       'bytes_downloaded': 0, 'bytes_served': 0}
+        self._lock = threading.Lock()
+    
+    def download_file(self, blob_name):
+        """Blob content as a read-only memoryview over the mapped cache file"""
+        for _ in range(2):
+            path, etag = self._lookup(blob_name)
+            fd, tmp_path = self._temp_file()
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    new_etag = self.client.download_to(blob_name, f, etag=etag)
+                
+                if new_etag is None:
+                    os.remove(tmp_path)
+                    try:
+                        content = self._map(path)
+                    except FileNotFoundError:
+                        # Evicted by another worker after the lookup; fetch it in full
+                        continue
+                    try:
+                        # Marks the entry recently used for eviction
+                        os.utime(path)
+                    except FileNotFoundError:
+                        # Evicted meanwhile; the mapping still holds the content
+                        pass
+                    self._count(hits=1, bytes_served=len(content))
+                    return content
+                
+                new_path = self._entry_path(blob_name, new_etag)
+                os.replace(tmp_path, new_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            if path and path != new_path:
+                _remove(path)
+            
+            content = self._map(new_path)
+            self._count(misses=1, stores=1, bytes_downloaded=len(content), bytes_served=len(content))
+            self._evict()
+            return content
+        
+        raise Exception(f"Failed to download from blob storage: {blob_name} kept changing")
+    
+    def invalidate(self, blob_name):
+        """Drop every cached version of a blob, e.g. after it is overwritten or deleted"""
+        removed = 0
+        for path in self._entry_paths(blob_name):
+            removed += _remove(path)
+        if removed:
+            self._count(invalidations=removed)
+    
+    def stats(self) -> Dict[str, Any]:
+        """This process's counters plus the size of the shared directory"""
+        with self._lock:
+            stats = dict(self._stats)
+        
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        
+        entries = self._scan()
+        stats['entries'] = len(entries)
+        stats['size_bytes'] = sum(size for _, size, _ in entries)
+        stats['max_bytes'] = self.max_bytes
+        return stats
+    
+    def _lookup(self, blob_name) -> Tuple[Optional[str], Optional[str]]:
+        """(path, ETag) of the cached version of a blob, or (None, None)"""
+        for path in self._entry_paths(blob_name):
+            try:
+                etag = bytes.fromhex(path.rsplit('.', 1)[1]).decode('utf-8')
+            except ValueError:
+                continue
+            return path, etag
+        return None, None
+    
+    def _entry_path(self, blob_name, etag):
+        key = _key(blob_name)
+        shard = os.path.join(self.directory, key[:2])
+        os.makedirs(shard, exist_ok=True)
+        return os.path.join(shard, f"{key}.{etag.encode('utf-8').hex()}")
+    
+    def _entry_paths(self, blob_name):
+        # Entries are spread over 256 subdirectories so a lookup lists only a few files
+        key = _key(blob_name)
+        shard = os.path.join(self.directory, key[:2])
+        try:
+            return [os.path.join(shard, name) for name in os.listdir(shard) if name.startswith(f"{key}.")]
+        except FileNotFoundError:
+            return []
+    
+    def _temp_file(self):
+        try:
+            return tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX)
+        except FileNotFoundError:
+            # Created on the first download, so importing the app touches no files
+            os.makedirs(self.directory, exist_ok=True)
+            return tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX)
+    
+    def _map(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return memoryview(b'')
+            # The mapping stays valid after the file is closed, or even unlinked by eviction
+            return memoryview(mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ))
+    
+    def _scan(self):
+        """[(path, size, mtime)] of every entry"""
+        entries = []
+        now = time.time()
+        if not os.path.isdir(self.directory):
+            return entries
+        
+        with os.scandir(self.directory) as shards:
+            for shard in shards:
+                if shard.name.startswith(TEMP_PREFIX):
+                    if now - _mtime(shard.path) > STALE_TEMP_SECONDS:
+                        _remove(shard.path)
+                    continue
+                if not shard.is_dir():
+                    continue
+                
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+    
+    def _evict(self):
+        """Remove least recently used entries until the directory fits in max_bytes"""
+        with self._exclusive():
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            
+            evicted = 0
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= self.max_bytes:
+                    break
+                if _remove(path):
+                    total -= size
+                    evicted += 1
+        
+        self._count(evictions=evicted)
+    
+    @contextmanager
+    def _exclusive(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            
+            with open(os.path.join(self.directory, LOCK_NAME), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._stats[name] += amount
+
+def _key(blob_name):
+    return hashlib.sha256(blob_name.encode('utf-8')).hexdigest()
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return time.time()
+
+def _remove(path):
+    """Delete a file another worker may already have deleted; whether this call did"""
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
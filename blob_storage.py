@@ -1,60 +1,342 @@
-from azure.storage.blob import BlobServiceClient, ContentSettings
-from azure.core.exceptions import AzureError
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+class UploadTooLarge(Exception):
+    """Raised when an upload stream exceeds the allowed size"""
+    pass
+
+def hash_stream(stream, max_size=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(sha256 hex digest, size) of a seekable stream, rewound afterwards for the upload"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _read_chunks(stream, chunk_size, max_size):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+def content_type_for(blob_name):
+    return 'application/pdf' if blob_name.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+def _read_chunks(stream, chunk_size, max_size):
+    """Yield chunks from a stream, enforcing max_size as bytes arrive"""
+    size = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise UploadTooLarge(f"File exceeds the maximum upload size of {max_size} bytes")
+        yield chunk
+
+def _file_etag(stat):
+    """Stands in for the service's ETag: changes whenever the file is replaced"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+@contextmanager
+def _azure_errors(action):
+    """Report Azure SDK errors as 'Failed to <action>'"""
+    from azure.core.exceptions import AzureError
+    try:
+        yield
+    except AzureError as e:
+        raise Exception(f"Failed to {action}: {str(e)}")
 
 class BlobStorageClient:
+    """Azure Blob Storage client
+    
+    The SDK is imported and the service client created on first use, once per
+    process: importing the app stays cheap and no HTTP session is shared across
+    a gunicorn fork. The container is created if needed before the first write.
+    """
+    
     def __init__(self, connection_string, container_name):
         self.connection_string = connection_string
         self.container_name = container_name
-        self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-        self.container_client = self.blob_service_client.get_container_client(container_name)
+        self._clients = None  # (service client, container client)
+        self._pid = None
+        self._container_created = False
+        self._lock = threading.Lock()
+    
+    @property
+    def blob_service_client(self):
+        return self._connect()[0]
+    
+    @property
+    def container_client(self):
+        return self._connect()[1]
+    
+    def _connect(self):
+        with self._lock:
+            if self._clients is None or self._pid != os.getpid():
+                from azure.storage.blob import BlobServiceClient
+                
+                service_client = BlobServiceClient.from_connection_string(self.connection_string)
+                self._clients = (service_client, service_client.get_container_client(self.container_name))
+                self._pid = os.getpid()
+            return self._clients
+    
+    def _writable_container(self):
+        """Container client, creating the container if it doesn't exist on the first write"""
+        from azure.core.exceptions import ResourceExistsError
         
-        # Create container if it doesn't exist
-        try:
-            self.container_client.create_container()
-        except Exception as e:
-            # Container already exists or other error
-            pass
+        container_client = self.container_client
+        if not self._container_created:
+            try:
+                container_client.create_container()
+            except ResourceExistsError:
+                pass
+            self._container_created = True
+        return container_client
+    
+    # Browsers can upload and download directly with SAS URLs
+    supports_direct_access = True
+    
+    def preload(self):
+        """Import the SDK without connecting; safe to call before forking"""
+        import azure.storage.blob
     
     def upload_file(self, blob_name, file_content):
         """Upload file to blob storage and return URL"""
-        try:
-            blob_client = self.container_client.get_blob_client(blob_name)
-            
-            # Determine content type
-            content_type = 'application/pdf' if blob_name.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        from azure.storage.blob import ContentSettings
+        
+        with _azure_errors('upload to blob storage'):
+            blob_client = self._writable_container().get_blob_client(blob_name)
             
             blob_client.upload_blob(
                 file_content,
                 overwrite=True,
-                content_settings=ContentSettings(content_type=content_type)
+                content_settings=ContentSettings(content_type=content_type_for(blob_name))
             )
             
             return blob_client.url
-        except AzureError as e:
-            raise Exception(f"Failed to upload to blob storage: {str(e)}")
+    
+    def upload_stream(self, blob_name, stream, max_size=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Upload a stream as staged blocks; return (URL, size, sha256 hex digest)"""
+        from azure.storage.blob import BlobBlock, ContentSettings
+        
+        with _azure_errors('upload to blob storage'):
+            blob_client = self._writable_container().get_blob_client(blob_name)
+            block_list = []
+            size = 0
+            digest = hashlib.sha256()
+            
+            for chunk in _read_chunks(stream, chunk_size, max_size):
+                block_id = base64.b64encode(f"{len(block_list):08d}".encode()).decode()
+                blob_client.stage_block(block_id, chunk, length=len(chunk))
+                block_list.append(BlobBlock(block_id=block_id))
+                size += len(chunk)
+                digest.update(chunk)
+            
+            # Nothing is visible until the block list is committed; staged blocks
+            # of a rejected upload are garbage collected by the service
+            blob_client.commit_block_list(
+                block_list,
+                content_settings=ContentSettings(content_type=content_type_for(blob_name))
+            )
+            
+            return blob_client.url, size, digest.hexdigest()
     
     def download_file(self, blob_name):
         """Download file from blob storage and return bytes"""
-        try:
+        with _azure_errors('download from blob storage'):
             blob_client = self.container_client.get_blob_client(blob_name)
             download_stream = blob_client.download_blob()
             return download_stream.readall()
-        except AzureError as e:
-            raise Exception(f"Failed to download from blob storage: {str(e)}")
+    
+    def download_to(self, blob_name, f, etag=None):
+        """Write a blob into a binary file and return its ETag, or None if it still matches etag"""
+        from azure.core import MatchConditions
+        from azure.core.exceptions import HttpResponseError
+        
+        with _azure_errors('download from blob storage'):
+            blob_client = self.container_client.get_blob_client(blob_name)
+            try:
+                if etag:
+                    downloader = blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfModified)
+                else:
+                    downloader = blob_client.download_blob()
+            except HttpResponseError as e:
+                if e.status_code == 304:
+                    return None
+                raise
+            
+            downloader.readinto(f)
+            return downloader.properties.etag
+    
+    def get_properties(self, blob_name):
+        """{'size', 'etag', 'content_type', 'url'} of a blob, or None if it does not exist"""
+        from azure.core.exceptions import ResourceNotFoundError
+        
+        with _azure_errors('read blob properties'):
+            try:
+                properties = self.container_client.get_blob_client(blob_name).get_blob_properties()
+            except ResourceNotFoundError:
+                return None
+            return {
+                'size': properties.size,
+                'etag': properties.etag,
+                'content_type': properties.content_settings.content_type,
+                'url': self.container_client.get_blob_client(blob_name).url
+            }
+    
+    def generate_upload_url(self, blob_name, expires_in=600):
+        """Short-lived SAS URL that can only create this one blob"""
+        from azure.storage.blob import BlobSasPermissions
+        
+        with _azure_errors('create container'):
+            self._writable_container()
+        return self._sas_url(blob_name, BlobSasPermissions(create=True, write=True), expires_in)
+    
+    def generate_download_url(self, blob_name, expires_in=300, filename=None):
+        """Short-lived read-only SAS URL, served as an attachment named filename"""
+        from azure.storage.blob import BlobSasPermissions
+        disposition = f'attachment; filename="{filename}"' if filename else None
+        return self._sas_url(blob_name, BlobSasPermissions(read=True), expires_in,
+                             content_disposition=disposition)
+    
+    def _sas_url(self, blob_name, permission, expires_in, **kwargs):
+        from azure.storage.blob import generate_blob_sas
+        
+        service_client = self.blob_service_client
+        account_key = getattr(service_client.credential, 'account_key', None)
+        if not account_key:
+            raise Exception("Direct access needs a connection string with an account key to sign SAS URLs")
+        
+        now = datetime.now(timezone.utc)
+        sas = generate_blob_sas(
+            account_name=service_client.account_name,
+            container_name=self.container_name,
+            blob_name=blob_name,
+            account_key=account_key,
+            permission=permission,
+            # A little slack for clock skew between us and the service
+            start=now - timedelta(minutes=5),
+            expiry=now + timedelta(seconds=expires_in),
+            **kwargs
+        )
+        return f"{self.container_client.get_blob_client(blob_name).url}?{sas}"
     
     def list_blobs(self, prefix=None):
         """List all blobs with optional prefix"""
-        try:
+        with _azure_errors('list blobs'):
             blobs = self.container_client.list_blobs(name_starts_with=prefix)
             return [blob.name for blob in blobs]
-        except AzureError as e:
-            raise Exception(f"Failed to list blobs: {str(e)}")
     
     def delete_blob(self, blob_name):
         """Delete a blob"""
-        try:
+        with _azure_errors('delete blob'):
             blob_client = self.container_client.get_blob_client(blob_name)
             blob_client.delete_blob()
             return True
-        except AzureError as e:
-            raise Exception(f"Failed to delete blob: {str(e)}")
\ No newline at end of file
+
+class LocalBlobStorageClient:
+    """Filesystem stand-in for BlobStorageClient, for local development and testing"""
+    
+    def __init__(self, root_dir, container_name='resumes'):
+        self.container_name = container_name
+        self.root_dir = os.path.abspath(os.path.join(root_dir, container_name))
+    
+    # Files on the app's disk have no URL a browser could reach
+    supports_direct_access = False
+    
+    def preload(self):
+        pass
+    
+    def _path(self, blob_name):
+        path = os.path.abspath(os.path.join(self.root_dir, blob_name))
+        if not path.startswith(self.root_dir + os.sep):
+            raise ValueError(f"Invalid blob name: {blob_name}")
+        return path
+    
+    def upload_file(self, blob_name, file_content):
+        """Write file to disk and return its URL"""
+        path = self._path(blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(file_content)
+        return f"file://{path}"
+    
+    def upload_stream(self, blob_name, stream, max_size=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream to a temp file and move it into place; return (URL, size, sha256 hex digest)"""
+        path = self._path(blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = 0
+        digest = hashlib.sha256()
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in _read_chunks(stream, chunk_size, max_size):
+                    f.write(chunk)
+                    size += len(chunk)
+                    digest.update(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        
+        return f"file://{path}", size, digest.hexdigest()
+    
+    def download_file(self, blob_name):
+        """Read file from disk and return bytes"""
+        try:
+            with open(self._path(blob_name), 'rb') as f:
+                return f.read()
+        except OSError as e:
+            raise Exception(f"Failed to download from blob storage: {str(e)}")
+    
+    def download_to(self, blob_name, f, etag=None):
+        """Copy a file into a binary file and return its ETag, or None if it still matches etag"""
+        try:
+            with open(self._path(blob_name), 'rb') as source:
+                stat = os.fstat(source.fileno())
+                current = _file_etag(stat)
+                if current == etag:
+                    return None
+                shutil.copyfileobj(source, f)
+                return current
+        except OSError as e:
+            raise Exception(f"Failed to download from blob storage: {str(e)}")
+    
+    def get_properties(self, blob_name):
+        """{'size', 'etag', 'content_type', 'url'} of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(self._path(blob_name))
+        except FileNotFoundError:
+            return None
+        return {
+            'size': stat.st_size,
+            'etag': _file_etag(stat),
+            'content_type': content_type_for(blob_name),
+            'url': f"file://{self._path(blob_name)}"
+        }
+    
+    def list_blobs(self, prefix=None):
+        """List all blobs with optional prefix"""
+        names = []
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            for filename in filenames:
+                if filename.startswith('.upload-'):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root_dir).replace(os.sep, '/')
+                if not prefix or name.startswith(prefix):
+                    names.append(name)
+        return sorted(names)
+    
+    def delete_blob(self, blob_name):
+        """Delete a blob"""
+        try:
+            os.remove(self._path(blob_name))
+            return True
+        except OSError as e:
+            raise Exception(f"Failed to delete blob: {str(e)}")
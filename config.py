@@ -11,6 +11,27 @@ DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///resumes.db')
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# SQLite runs in WAL mode (see models.py) and writers wait up to SQLITE_BUSY_TIMEOUT
+# seconds for the lock held by another worker instead of failing with "database is locked".
+# Elsewhere each gunicorn worker pools up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections,
+# so keep workers * that below the server's max_connections.
+if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'connect_args': {'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', '30'))}
+    }
+else:
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '5')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        # Replace connections before a server or load balancer idle timeout drops them
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': True
+    }
+
+# Sign-in without OAuth at POST /dev/login, for offline load tests only
+DEV_LOGIN_ENABLED = os.getenv('DEV_LOGIN_ENABLED', 'False').lower() == 'true'
+
 # Google OAuth
 GOOGLE_OAUTH_CLIENT_ID = os.getenv('GOOGLE_OAUTH_CLIENT_ID')
 GOOGLE_OAUTH_CLIENT_SECRET = os.getenv('GOOGLE_OAUTH_CLIENT_SECRET')
@@ -19,6 +40,33 @@ GOOGLE_OAUTH_REDIRECT_URI = os.getenv('GOOGLE_OAUTH_REDIRECT_URI', 'http://local
 # Google Generative AI
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
+# Gemini proxy transport (used when GEMINI_PROXY_URL is set)
+GEMINI_PROXY_URL = os.getenv('GEMINI_PROXY_URL')
+GEMINI_POOL_SIZE = int(os.getenv('GEMINI_POOL_SIZE', '10'))
+GEMINI_CONNECT_TIMEOUT = float(os.getenv('GEMINI_CONNECT_TIMEOUT', '5'))
+GEMINI_READ_TIMEOUT = float(os.getenv('GEMINI_READ_TIMEOUT', '60'))
+GEMINI_GZIP_REQUESTS = os.getenv('GEMINI_GZIP_REQUESTS', 'False').lower() == 'true'
+
+# Gemini resilience: retries, circuit breaker and rate limit (0 RPM disables the limiter)
+GEMINI_MAX_ATTEMPTS = int(os.getenv('GEMINI_MAX_ATTEMPTS', '3'))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', '1'))
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', '20'))
+GEMINI_CIRCUIT_FAILURES = int(os.getenv('GEMINI_CIRCUIT_FAILURES', '5'))
+GEMINI_CIRCUIT_RESET = float(os.getenv('GEMINI_CIRCUIT_RESET', '30'))
+GEMINI_RATE_LIMIT_RPM = int(os.getenv('GEMINI_RATE_LIMIT_RPM', '60'))
+GEMINI_RATE_LIMIT_BURST = int(os.getenv('GEMINI_RATE_LIMIT_BURST', '10'))
+GEMINI_RATE_LIMIT_WAIT = float(os.getenv('GEMINI_RATE_LIMIT_WAIT', '30'))
+
+# Prompt compaction: estimated token budgets for the resume and job description text
+PROMPT_COMPACTION_ENABLED = os.getenv('PROMPT_COMPACTION_ENABLED', 'True').lower() == 'true'
+PROMPT_RESUME_TOKEN_BUDGET = int(os.getenv('PROMPT_RESUME_TOKEN_BUDGET', '6000'))
+PROMPT_JOB_TOKEN_BUDGET = int(os.getenv('PROMPT_JOB_TOKEN_BUDGET', '1500'))
+
+# Map-reduce analysis of resumes longer than the threshold (estimated tokens, 0 disables)
+CHUNKED_ANALYSIS_THRESHOLD = int(os.getenv('CHUNKED_ANALYSIS_THRESHOLD', '8000'))
+ANALYSIS_CHUNK_TOKENS = int(os.getenv('ANALYSIS_CHUNK_TOKENS', '3000'))
+ANALYSIS_CHUNK_CONCURRENCY = int(os.getenv('ANALYSIS_CHUNK_CONCURRENCY', '4'))
+
 # Azure Storage
 AZURE_STORAGE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
 AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME', 'resumes')
@@ -26,4 +74,72 @@ AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME', 'resumes')
 # Session config
 SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
 SESSION_COOKIE_HTTPONLY = True
-SESSION_COOKIE_SAMESITE = 'Lax'
\ No newline at end of file
+SESSION_COOKIE_SAMESITE = 'Lax'
+
+# Analysis job queue
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+ANALYSIS_QUEUE_SIZE = int(os.getenv('ANALYSIS_QUEUE_SIZE', '100'))
+# Running jobs refresh a heartbeat every ANALYSIS_JOB_HEARTBEAT seconds; one
+# silent for ANALYSIS_JOB_STALE_AFTER seconds lost its process and is re-queued
+ANALYSIS_JOB_HEARTBEAT = int(os.getenv('ANALYSIS_JOB_HEARTBEAT', '30'))
+ANALYSIS_JOB_STALE_AFTER = int(os.getenv('ANALYSIS_JOB_STALE_AFTER', '300'))
+
+# Analysis result cache
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'True').lower() == 'true'
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '256'))
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', '3600'))
+ANALYSIS_CACHE_DB_TTL = int(os.getenv('ANALYSIS_CACHE_DB_TTL', str(30 * 24 * 3600)))
+
+# Uploads
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', str(10 * 1024 * 1024)))
+MAX_CONTENT_LENGTH = MAX_UPLOAD_SIZE + 64 * 1024  # Room for multipart framing
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(4 * 1024 * 1024)))
+
+# Text extraction: PDFs with at least PARSE_PARALLEL_MIN_PAGES pages are read in
+# PARSE_WORKERS processes (1 disables); longer documents are cut to the limits
+PARSE_MAX_PAGES = int(os.getenv('PARSE_MAX_PAGES', '50'))
+PARSE_MAX_CHARS = int(os.getenv('PARSE_MAX_CHARS', '200000'))
+PARSE_PARALLEL_MIN_PAGES = int(os.getenv('PARSE_PARALLEL_MIN_PAGES', '16'))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Blob storage backend: 'azure' or 'local' (filesystem, for development and testing)
+BLOB_STORAGE_BACKEND = os.getenv('BLOB_STORAGE_BACKEND', 'azure').lower()
+LOCAL_BLOB_DIR = os.getenv('LOCAL_BLOB_DIR', 'instance/blobs')
+
+# Disk cache of downloaded blobs, shared by the workers on a host and revalidated by ETag
+BLOB_CACHE_ENABLED = os.getenv('BLOB_CACHE_ENABLED', 'True').lower() == 'true'
+BLOB_CACHE_DIR = os.getenv('BLOB_CACHE_DIR', 'instance/blob_cache')
+BLOB_CACHE_MAX_BYTES = int(os.getenv('BLOB_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Browsers upload to and download from Azure directly with short-lived SAS URLs
+# (azure backend only; the storage account needs a CORS rule for the app's origin)
+BLOB_DIRECT_ACCESS = os.getenv('BLOB_DIRECT_ACCESS', 'False').lower() == 'true'
+UPLOAD_SAS_TTL = int(os.getenv('UPLOAD_SAS_TTL', '600'))
+DOWNLOAD_SAS_TTL = int(os.getenv('DOWNLOAD_SAS_TTL', '300'))
+
+# Batch analysis
+BATCH_MAX_RESUMES = int(os.getenv('BATCH_MAX_RESUMES', '200'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+
+# Local extraction: skills dictionary (one skill per line, aliases after '|')
+SKILLS_DICTIONARY = os.getenv('SKILLS_DICTIONARY', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.txt'))
+
+# Resume ranking (BM25 index over parsed text)
+RANK_MAX_RESULTS = int(os.getenv('RANK_MAX_RESULTS', '100'))
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'instance/search_index.pickle')
+SEARCH_INDEX_SYNC_INTERVAL = float(os.getenv('SEARCH_INDEX_SYNC_INTERVAL', '2'))
+
+# Analyses are stored in normalized tables; optionally also keep the raw JSON
+ANALYSIS_ARCHIVE_JSON = os.getenv('ANALYSIS_ARCHIVE_JSON', 'False').lower() == 'true'
+
+# Resume listing: keyset-paginated page sizes for /files and the dashboard
+FILES_PAGE_SIZE = int(os.getenv('FILES_PAGE_SIZE', '25'))
+FILES_MAX_PAGE_SIZE = int(os.getenv('FILES_MAX_PAGE_SIZE', '100'))
+
+# Response compression (brotli when installed, else gzip) for JSON and HTML bodies
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# Prometheus metrics at /metrics; set METRICS_TOKEN to require it as a bearer token
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
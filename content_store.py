@@ -0,0 +1,108 @@
+import threading
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from models import db, Resume, StoredBlob
+
+# Inserts retried while identical copies are being released
+REGISTER_ATTEMPTS = 3
+
+class ContentStore:
+    """Reference-counted blobs keyed by content hash, so identical uploads share one copy
+    
+    Counts change with single UPDATE statements in the caller's transaction, so
+    concurrent uploads and deletes in any worker cannot lose a reference. A blob
+    whose count reaches zero is deleted from the table; the caller removes it
+    from storage after committing.
+    """
+    
+    def __init__(self):
+        self._stats = {'stored': 0, 'deduplicated': 0, 'bytes_saved': 0, 'released': 0, 'deleted': 0}
+        self._lock = threading.Lock()
+    
+    def acquire(self, content_hash: str) -> Optional[StoredBlob]:
+        """Take a reference to the stored copy of this content, if there is one"""
+        # ref_count > 0: a blob being deleted by another request cannot be revived
+        claimed = StoredBlob.query.filter(
+            StoredBlob.content_hash == content_hash,
+            StoredBlob.ref_count > 0
+        ).update({StoredBlob.ref_count: StoredBlob.ref_count + 1}, synchronize_session=False)
+        
+        if not claimed:
+            return None
+        
+        stored = db.session.get(StoredBlob, content_hash, populate_existing=True)
+        self._count(deduplicated=1, bytes_saved=stored.size or 0)
+        return stored
+    
+    def register(self, content_hash: str, blob_path: str, blob_url: Optional[str] = None,
+                 size: Optional[int] = None) -> Tuple[StoredBlob, bool]:
+        """Record a newly uploaded blob; (stored blob, whether it was this one)
+        
+        If an identical upload registered first, a reference to that blob is
+        returned instead and the caller should delete its own copy. A path that
+        already holds other content is an error: that blob belongs to someone
+        else, so the caller must leave it alone.
+        """
+        for _ in range(REGISTER_ATTEMPTS):
+            try:
+                with db.session.begin_nested():
+                    stored = StoredBlob(content_hash=content_hash, blob_path=blob_path, blob_url=blob_url,
+                                        size=size, ref_count=1)
+                    db.session.add(stored)
+            except IntegrityError:
+                taken = StoredBlob.query.filter(
+                    StoredBlob.blob_path == blob_path,
+                    StoredBlob.content_hash != content_hash
+                ).count()
+                if taken:
+                    raise Exception(f"Blob path {blob_path} already holds another file")
+                
+                stored = self.acquire(content_hash)
+                if stored is not None:
+                    return stored, False
+                # The identical copy lost its last reference meanwhile; ours replaces it
+                continue
+            
+            self._count(stored=1)
+            return stored, True
+        
+        raise Exception("The same file is being deleted, please try again")
+    
+    def release(self, resume: Resume) -> Optional[str]:
+        """Drop a resume's reference; the blob path to delete from storage, if any
+        
+        Resumes stored before de-duplication own their blob outright.
+        """
+        if not resume.content_hash:
+            return resume.blob_path
+        
+        released = StoredBlob.query.filter_by(
+            content_hash=resume.content_hash,
+            blob_path=resume.blob_path
+        ).update({StoredBlob.ref_count: StoredBlob.ref_count - 1}, synchronize_session=False)
+        
+        if not released:
+            return resume.blob_path
+        
+        self._count(released=1)
+        deleted = StoredBlob.query.filter(
+            StoredBlob.content_hash == resume.content_hash,
+            StoredBlob.ref_count <= 0
+        ).delete(synchronize_session=False)
+        
+        if deleted:
+            self._count(deleted=1)
+            return resume.blob_path
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        uploads = stats['stored'] + stats['deduplicated']
+        stats['dedup_ratio'] = round(stats['deduplicated'] / uploads, 4) if uploads else 0.0
+        return stats
+    
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._stats[name] += amount
@@ -0,0 +1,373 @@
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.txt')
+
+NOT_FOUND = 'Not Found'
+
+# Characters ResumeParser._clean_text keeps; dictionary terms are normalized the same way
+_STRIP_CHARS = re.compile(r'[^\w\s\.,;:()\-@#+]')
+_WHITESPACE = re.compile(r'\s+')
+
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}')
+PHONE_RE = re.compile(r'(?<![\w.])\+?\(?\d[\d\s.\-()]{7,18}\d(?![\w])')
+YEAR_RE = re.compile(r'\b(?:19[5-9]\d|20\d\d)\b')
+_MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+'
+DATE_RANGE_RE = re.compile(
+    r'\b((?:' + _MONTH + r')?(?:19[5-9]\d|20\d\d))\s*(?:-|to|until)\s*'
+    r'((?:' + _MONTH + r')?(?:19[5-9]\d|20\d\d)|Present|Current|Now|present|current)\b'
+)
+LOCATION_RE = re.compile(r'\b(?:Location|Address|Based in)\s*:?\s*([A-Z][A-Za-z .\-]{1,30},\s*[A-Z][A-Za-z]{1,20}(?: [A-Z][a-z]+)?)')
+NAME_TOKEN_RE = re.compile(r"^[A-Z][a-zA-Z\-.']*$")
+DEGREE_RE = re.compile(
+    r'\b(Ph\.?\s?D\.?|Doctorate|M\.?B\.?A\.?|Master(?:s|\'s)?(?: of [A-Z][a-z]+(?: [A-Z][a-z]+)?)?|'
+    r'Bachelor(?:s|\'s)?(?: of [A-Z][a-z]+(?: [A-Z][a-z]+)?)?|B\.?\s?Tech|M\.?\s?Tech|B\.?\s?E\.|M\.?\s?E\.|'
+    r'B\.?\s?Sc\.?|M\.?\s?Sc\.?|B\.S\.|M\.S\.|B\.A\.|M\.A\.|Associate(?:\'s)? Degree|Diploma)'
+)
+INSTITUTION_RE = re.compile(
+    r'((?:[A-Z][\w.&\-]*\s+){0,5}(?:University|College|Institute|School|Academy)(?:\s+of(?:\s+[A-Z][\w.\-]*){1,4})?)'
+)
+
+# Canonical section name -> headings that introduce it
+SECTION_HEADINGS = {
+    'summary': ['Professional Summary', 'Summary', 'Profile', 'Objective', 'Career Objective', 'About Me'],
+    'experience': ['Work Experience', 'Professional Experience', 'Employment History', 'Experience', 'Work History'],
+    'education': ['Education', 'Academic Background', 'Qualifications'],
+    'skills': ['Technical Skills', 'Core Competencies', 'Skills'],
+    'projects': ['Projects', 'Personal Projects', 'Academic Projects'],
+    'certifications': ['Certifications', 'Certificates', 'Licenses'],
+    'awards': ['Awards', 'Achievements', 'Honors'],
+    'languages': ['Languages'],
+    'interests': ['Interests', 'Hobbies'],
+    'publications': ['Publications', 'Selected Publications', 'Presentations', 'Conference Presentations'],
+    'references': ['References'],
+}
+
+def normalize_term(term: str) -> str:
+    """Normalize a term the way parsed resume text is normalized, lower-cased for matching"""
+    term = _STRIP_CHARS.sub('', term)
+    return _WHITESPACE.sub(' ', term).strip().lower()
+
+def _build_heading_re():
+    # Headings are recognized in UPPER CASE anywhere, or in Title Case followed by a colon,
+    # since the parser has already flattened line breaks away
+    alternatives = []
+    for headings in SECTION_HEADINGS.values():
+        for heading in headings:
+            alternatives.append(re.escape(heading.upper()))
+            alternatives.append(re.escape(heading) + r'(?=\s*:)')
+    alternatives.sort(key=len, reverse=True)
+    return re.compile(r'(?<![\w])(' + '|'.join(alternatives) + r')(?![\w])\s*:?')
+
+HEADING_RE = _build_heading_re()
+_HEADING_LOOKUP = {
+    heading.lower(): section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+class SkillMatcher:
+    """Aho-Corasick automaton matching many dictionary terms in one pass over the text"""
+    
+    def __init__(self, terms: Dict[str, str]):
+        """terms maps a normalized pattern to the canonical skill name it reports"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+        self._canonical = []
+        self._lengths = []
+        
+        for pattern, canonical in terms.items():
+            if pattern:
+                self._add(pattern, canonical)
+        self._link()
+    
+    def __len__(self):
+        return len(self._canonical)
+    
+    def _add(self, pattern, canonical):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            node = next_node
+        
+        if self._output[node] is None:
+            self._output[node] = []
+        self._output[node].append(len(self._canonical))
+        self._canonical.append(canonical)
+        self._lengths.append(len(pattern))
+    
+    def _link(self):
+        # Breadth-first failure links; each node also inherits the outputs of its failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                
+                inherited = self._output[self._fail[child]]
+                if inherited:
+                    self._output[child] = (self._output[child] or []) + inherited
+    
+    def find(self, text: str) -> List[str]:
+        """Return canonical names of terms found as whole words in text, in order of first appearance"""
+        haystack = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        lengths = self._lengths
+        spans = []
+        node = 0
+        size = len(haystack)
+        
+        for index, char in enumerate(haystack):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            matches = output[node]
+            if not matches:
+                continue
+            
+            end = index + 1
+            after = haystack[end] if end < size else ' '
+            if after.isalnum() or after in '+#':
+                continue
+            
+            for term_id in matches:
+                start = end - lengths[term_id]
+                if start > 0 and (haystack[start - 1].isalnum() or haystack[start - 1] in '.#+'):
+                    continue
+                spans.append((start, end, term_id))
+        
+        # Prefer the longest match: "Azure" inside "Azure DevOps" is not reported on its own
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        found = {}
+        covered_until = -1
+        for start, end, term_id in spans:
+            if end <= covered_until:
+                continue
+            covered_until = end
+            found.setdefault(self._canonical[term_id], start)
+        
+        return list(found)
+
+def load_skills(path: str) -> Dict[str, str]:
+    """Read a skills dictionary: one skill per line, optional aliases after '|', '#' comments"""
+    terms = {}
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            for name in names:
+                terms.setdefault(normalize_term(name), names[0])
+    return terms
+
+class ResumeExtractor:
+    """Deterministic extraction of contacts, sections and skills from parsed resume text"""
+    
+    def __init__(self, skills_path: Optional[str] = None):
+        self.skills_path = skills_path or DEFAULT_SKILLS_PATH
+        self._matcher = None
+        self._lock = threading.Lock()
+    
+    @property
+    def matcher(self) -> SkillMatcher:
+        # Built on first use so importing the app does not pay for a large dictionary
+        if self._matcher is None:
+            with self._lock:
+                if self._matcher is None:
+                    try:
+                        terms = load_skills(self.skills_path)
+                    except OSError as e:
+                        print(f"Skills dictionary unavailable ({self.skills_path}): {e}")
+                        terms = {}
+                    self._matcher = SkillMatcher(terms)
+        return self._matcher
+    
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Extract personal info, sections, skills, education and experience hints"""
+        sections = self.split_sections(text)
+        header = text[:sections['_start']] if sections['_start'] else text[:300]
+        sections.pop('_start')
+        
+        return {
+            'personal_info': self.extract_contacts(text, header),
+            'sections': sections,
+            'skills': self.matcher.find(text),
+            'education': self._extract_education(sections.get('education', '')),
+            'experience': self._extract_experience(sections.get('experience', '')),
+            'certifications': self._split_list(sections.get('certifications', ''))
+        }
+    
+    def extract_contacts(self, text: str, header: str = '') -> Dict[str, str]:
+        email = EMAIL_RE.search(text)
+        location = LOCATION_RE.search(text)
+        
+        return {
+            'name': self._guess_name(header or text[:300]),
+            'email': email.group(0).rstrip('.') if email else NOT_FOUND,
+            'phone': self._find_phone(text),
+            'location': location.group(1).strip() if location else NOT_FOUND
+        }
+    
+    def split_sections(self, text: str) -> Dict[str, Any]:
+        """Split flattened text at known headings; the first occurrence of each section wins"""
+        sections = {}
+        boundaries = []
+        
+        for match in HEADING_RE.finditer(text):
+            section = _HEADING_LOOKUP[match.group(1).lower()]
+            if section not in sections:
+                sections[section] = None
+                boundaries.append((match.start(), match.end(), section))
+        
+        for index, (_, content_start, section) in enumerate(boundaries):
+            end = boundaries[index + 1][0] if index + 1 < len(boundaries) else len(text)
+            sections[section] = text[content_start:end].strip(' :;,')
+        
+        sections['_start'] = boundaries[0][0] if boundaries else 0
+        return sections
+    
+    def match_skills(self, text: str) -> List[str]:
+        return self.matcher.find(text)
+    
+    def job_match(self, skills: List[str], job_description: str) -> Optional[Dict[str, Any]]:
+        """Skill overlap between the resume and a job description"""
+        required = self.matcher.find(job_description)
+        if not required:
+            return None
+        
+        have = {skill.lower() for skill in skills}
+        matching = [skill for skill in required if skill.lower() in have]
+        missing = [skill for skill in required if skill.lower() not in have]
+        
+        return {
+            'score': round(100 * len(matching) / len(required)),
+            'matching_skills': matching,
+            'missing_skills': missing,
+            'experience_match': 'Estimated from skill keywords only.',
+            'recommendations': [f"Highlight experience with {skill}" for skill in missing[:3]]
+        }
+    
+    def merge(self, analysis: Dict[str, Any], extracted: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill gaps in a model-produced analysis with locally extracted facts"""
+        personal_info = analysis.get('personal_info')
+        if isinstance(personal_info, dict):
+            for field, value in extracted['personal_info'].items():
+                if value != NOT_FOUND and personal_info.get(field) in (None, '', NOT_FOUND):
+                    personal_info[field] = value
+        
+        skills = analysis.get('skills')
+        if isinstance(skills, list):
+            seen = {str(skill).lower() for skill in skills}
+            skills.extend(skill for skill in extracted['skills'] if skill.lower() not in seen)
+        
+        return analysis
+    
+    def fallback_analysis(self, text: str, job_description: str = '', error_msg: str = '') -> Dict[str, Any]:
+        """An analysis built only from local extraction, in the same shape as the model's"""
+        extracted = self.extract(text)
+        sections = extracted['sections']
+        summary = sections.get('summary')
+        suggestions = [
+            f"Add a clear {section} section"
+            for section in ('summary', 'experience', 'education', 'skills')
+            if section not in sections
+        ]
+        if extracted['personal_info']['email'] == NOT_FOUND:
+            suggestions.append("Include an email address in the header")
+        if extracted['personal_info']['phone'] == NOT_FOUND:
+            suggestions.append("Include a phone number in the header")
+        
+        analysis = {
+            "personal_info": extracted['personal_info'],
+            "summary": summary[:500] if summary else "Summary unavailable; this analysis was extracted locally.",
+            "skills": extracted['skills'],
+            "education": extracted['education'],
+            "experience": extracted['experience'],
+            "certifications": extracted['certifications'],
+            "suggestions": suggestions or ["Try analyzing the resume again for detailed AI feedback"],
+            "overall_score": 0,
+            "strengths": [],
+            "areas_for_improvement": ["Detailed AI analysis was unavailable"],
+            "source": "local",
+            "error": error_msg
+        }
+        
+        if job_description:
+            job_match = self.job_match(extracted['skills'], job_description)
+            if job_match:
+                analysis['job_match'] = job_match
+        
+        return analysis
+    
+    def _guess_name(self, header: str) -> str:
+        # Resumes usually open with the candidate's name: take the leading run of capitalized words
+        words = []
+        for token in header.split()[:6]:
+            if '@' in token or any(char.isdigit() for char in token):
+                break
+            if not NAME_TOKEN_RE.match(token) or token.lower() in _HEADING_LOOKUP:
+                break
+            words.append(token)
+        
+        if 2 <= len(words) <= 4:
+            return ' '.join(words[:4])
+        return NOT_FOUND
+    
+    def _find_phone(self, text: str) -> str:
+        for match in PHONE_RE.finditer(text):
+            candidate = match.group(0).strip()
+            digits = sum(char.isdigit() for char in candidate)
+            # Skip year ranges such as 2019 - 2021 that look like digit runs
+            if 10 <= digits <= 15 and not DATE_RANGE_RE.fullmatch(candidate):
+                return candidate
+        return NOT_FOUND
+    
+    def _extract_education(self, section: str) -> List[Dict[str, str]]:
+        entries = []
+        for match in DEGREE_RE.finditer(section):
+            window = section[match.start():match.start() + 200]
+            institution = INSTITUTION_RE.search(window)
+            years = YEAR_RE.findall(window)
+            entries.append({
+                'degree': match.group(0).strip(),
+                'institution': institution.group(1).strip() if institution else NOT_FOUND,
+                'year': years[-1] if years else NOT_FOUND,
+                'details': ''
+            })
+        return entries
+    
+    def _extract_experience(self, section: str) -> List[Dict[str, Any]]:
+        entries = []
+        for match in DATE_RANGE_RE.finditer(section):
+            # The words just before a date range usually name the role and employer
+            context = section[max(0, match.start() - 80):match.start()].strip(' ,;:-|')
+            title, _, company = context.rsplit('.', 1)[-1].partition(',')
+            entries.append({
+                'title': title.strip() or NOT_FOUND,
+                'company': company.strip() or NOT_FOUND,
+                'duration': f"{match.group(1)} - {match.group(2)}",
+                'responsibilities': []
+            })
+        return entries
+    
+    def _split_list(self, section: str) -> List[str]:
+        if not section:
+            return []
+        return [item.strip() for item in re.split(r'[;,]', section) if item.strip()][:20]
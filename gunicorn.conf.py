@@ -0,0 +1,45 @@
+"""
+Gunicorn settings, shared by the Dockerfile and scripts/load_test.py:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master and the workers are forked from it, so
+they share the imported libraries instead of each paying for the import.
+Anything that is not fork-safe (database connections, HTTP sessions, the
+Gemini SDK, worker threads) is created lazily in each worker. Each worker
+starts its job queue once it is running, so jobs left behind by a worker
+that died are picked up without waiting for new work.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+def when_ready(server):
+    if not preload_app:
+        return
+    
+    import app
+    server.log.info("App imported in %.3fs", app.IMPORT_SECONDS)
+    server.log.info("Preloaded libraries in %.3fs", app.preload())
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    
+    # Pooled connections opened in the master must not be shared by the workers
+    from app import app, db, job_queue
+    with app.app_context():
+        db.engine.dispose(close=False)
+    job_queue.start()
+
+def post_worker_init(worker):
+    if preload_app:
+        return
+    
+    import app
+    worker.log.info("App imported in %.3fs", app.IMPORT_SECONDS)
+    app.preload()
+    app.job_queue.start()
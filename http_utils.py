@@ -0,0 +1,144 @@
+import gzip
+import threading
+from datetime import timezone
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+# Optional accelerators: the app works without them, just slower or with gzip only
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson when it is installed"""
+    
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(kwargs)
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except (TypeError, orjson.JSONEncodeError):
+            # e.g. integers beyond 64 bits
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        # orjson has no decoding options; hooks and the like need the standard decoder
+        if orjson is None or any(value is not None for value in kwargs.values()):
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def _orjson_option(self, kwargs):
+        """orjson flags matching these json.dumps options, or None if orjson cannot produce them
+        
+        response() always passes compact separators, which is all orjson writes,
+        or indent=2 in debug mode.
+        """
+        if orjson is None:
+            return None
+        
+        # Datetimes pass through to Flask's default so they keep the HTTP date format
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        
+        for name, value in kwargs.items():
+            if name == 'sort_keys' or value is None:
+                continue
+            if name == 'separators' and tuple(value) == (',', ':'):
+                continue
+            if name == 'indent' and value == 2:
+                option |= orjson.OPT_INDENT_2
+                continue
+            return None
+        return option
+
+class ResponseCompressor:
+    """Compress large text responses with brotli or gzip, as the client accepts"""
+    
+    def __init__(self, app=None, min_size=1024, mimetypes=('application/json', 'text/html'),
+                 gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.mimetypes = set(mimetypes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._stats = {'responses': 0, 'bytes_in': 0, 'bytes_out': 0}
+        self._lock = threading.Lock()
+        
+        if app is not None:
+            app.after_request(self.compress)
+    
+    def compress(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        
+        encoding = self._choose_encoding()
+        if not encoding:
+            return response
+        
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        
+        with self._lock:
+            self._stats['responses'] += 1
+            self._stats['bytes_in'] += len(data)
+            self._stats['bytes_out'] += len(compressed)
+        return response
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 3) if stats['bytes_in'] else None
+        return stats
+    
+    def _choose_encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+def not_modified(etag, last_modified=None):
+    """Whether the client's cached copy is current, checked before building the response
+    
+    If-None-Match wins over If-Modified-Since when both are sent, as RFC 9110 requires.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    
+    if last_modified is not None and request.if_modified_since:
+        # HTTP dates have whole-second precision; stored times are naive UTC
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    
+    return False
+
+def set_validators(response, etag, last_modified=None):
+    """Attach the validators and make clients revalidate before reusing a private response"""
+    # Weak, since compression changes the bytes but not the meaning
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,172 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models import db, AnalysisJob
+from metrics import stage, STAGE_SECONDS
+
+class JobQueueFull(Exception):
+    """Raised when no more jobs can be accepted"""
+    pass
+
+class JobQueue:
+    """Bounded in-process worker pool that drains persisted analysis jobs
+
+    A monitor thread in each process refreshes the heartbeat of the jobs it is
+    running and sweeps for jobs a dead process left behind: running jobs whose
+    heartbeat is older than stale_after, and queued jobs that sat in its queue.
+    """
+
+    def __init__(self, app, handler, workers=2, max_pending=100, stale_after=300, heartbeat_interval=30):
+        self.app = app
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self._queue = None
+        self._pid = None
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads once per process"""
+        with self._lock:
+            # Threads do not survive a fork, so restart them in each worker process
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_pending)
+
+            self._running = set()
+
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"analysis-worker-{i}",
+                    daemon=True
+                )
+                thread.start()
+
+            threading.Thread(target=self._monitor, name="analysis-job-monitor", daemon=True).start()
+
+    def submit(self, job_id):
+        """Queue a job for processing"""
+        self.start()
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            raise JobQueueFull("Analysis queue is full, please try again later")
+
+    def pending(self):
+        """Number of jobs waiting in this process"""
+        return self._queue.qsize() if self._queue else 0
+
+    def _monitor(self):
+        orphaned_only = False
+        while True:
+            self._heartbeat()
+            self._recover_pending(orphaned_only)
+            # The first sweep also takes jobs queued before this process started
+            orphaned_only = True
+            time.sleep(self.heartbeat_interval)
+
+    def _heartbeat(self):
+        """Mark the jobs this process is running as alive"""
+        with self._lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return
+
+        try:
+            with self.app.app_context():
+                AnalysisJob.query.filter(
+                    AnalysisJob.id.in_(job_ids),
+                    AnalysisJob.status == AnalysisJob.RUNNING
+                ).update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+                db.session.commit()
+        except Exception as e:
+            print(f"Job heartbeat error: {e}")
+
+    def _recover_pending(self, orphaned_only=False):
+        """Re-queue queued jobs, and running ones whose process stopped sending heartbeats
+
+        With orphaned_only, queued jobs are taken only once they are older than
+        stale_after; newer ones are still waiting in the queue that accepted them.
+        """
+        try:
+            with self.app.app_context():
+                cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+                stale = AnalysisJob.query.filter(
+                    AnalysisJob.status == AnalysisJob.RUNNING,
+                    func.coalesce(AnalysisJob.heartbeat_at, AnalysisJob.started_at) < cutoff
+                ).update({'status': AnalysisJob.QUEUED}, synchronize_session=False)
+                db.session.commit()
+                if stale:
+                    print(f"Re-queued {stale} stale running jobs")
+
+                query = db.session.query(AnalysisJob.id).filter_by(status=AnalysisJob.QUEUED)
+                if orphaned_only:
+                    query = query.filter(AnalysisJob.created_at < cutoff)
+                job_ids = [job_id for (job_id,) in query.order_by(AnalysisJob.created_at).limit(self.max_pending)]
+        except Exception as e:
+            print(f"Job recovery error: {e}")
+            return
+
+        for job_id in job_ids:
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                break
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                with self.app.app_context():
+                    self._run(job_id)
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        # Claim the job atomically so only one worker (in any process) runs it
+        now = datetime.utcnow()
+        claimed = AnalysisJob.query.filter_by(id=job_id, status=AnalysisJob.QUEUED).update(
+            {'status': AnalysisJob.RUNNING, 'started_at': now, 'heartbeat_at': now},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        if not claimed:
+            return
+
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            self._execute(job_id)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _execute(self, job_id):
+        job = db.session.get(AnalysisJob, job_id)
+        if job.created_at and job.started_at:
+            STAGE_SECONDS.observe((job.started_at - job.created_at).total_seconds(), stage='job_queue_wait')
+
+        try:
+            with stage('job_run'):
+                self.handler(job)
+            job.status = AnalysisJob.COMPLETED
+        except Exception as e:
+            print(f"Analysis job {job_id} failed: {e}")
+            db.session.rollback()
+            job = db.session.get(AnalysisJob, job_id)
+            job.status = AnalysisJob.FAILED
+            job.error = str(e)
+
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
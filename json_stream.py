@@ -0,0 +1,83 @@
+import json
+from typing import List, Tuple, Any
+
+class SectionStreamParser:
+    """Incrementally scan streamed model output and emit top-level JSON members as they close"""
+    
+    def __init__(self):
+        self.buffer = ''
+        self.emitted = set()
+        self._pos = 0
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add a chunk of text and return newly completed (key, value) pairs"""
+        self.buffer += chunk
+        sections = []
+        buffer = self.buffer
+        i = self._pos
+        
+        while i < len(buffer) and not self._done:
+            char = buffer[i]
+            
+            if not self._started:
+                # Skip markdown fences or any preamble before the object
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._key is None:
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                i += 1
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer, i, sections)
+                    self._done = True
+            elif char == ':' and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif char == ',' and self._depth == 1:
+                self._emit(buffer, i, sections)
+            
+            i += 1
+        
+        self._pos = i
+        return sections
+    
+    def _emit(self, buffer, end, sections):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(buffer[self._value_start:end])
+            except ValueError:
+                value = None
+            else:
+                sections.append((self._key, value))
+                self.emitted.add(self._key)
+        
+        self._key_start = None
+        self._key = None
+        self._value_start = None
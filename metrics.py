@@ -0,0 +1,219 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+from flask import g, has_app_context, request
+
+# Seconds; spans fast cache lookups up to slow model calls with retries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self, base_labels):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(base_labels + key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+    
+    def observe(self, value, **labels):
+        key = _label_key(self.labels, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def render(self, base_labels):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        
+        for key, values in series:
+            labels = base_labels + key
+            cumulative = 0
+            # Counts are stored per bucket and made cumulative only when rendered
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {values[-1]}")
+        return lines
+
+class StatsCollector:
+    """Exports the numbers in an existing stats() dict as metrics when scraped"""
+    
+    def __init__(self, prefix, help_text, collect: Callable[[], Optional[Dict[str, Any]]], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.help = help_text
+        self.collect = collect
+        self.counters = set(counters)
+    
+    def render(self, base_labels):
+        try:
+            stats = self.collect()
+        except Exception as e:
+            print(f"Metrics collector {self.prefix} failed: {e}")
+            return []
+        
+        lines = []
+        for key, value in _flatten(stats or {}):
+            name = f"{self.prefix}_{key}"
+            kind = 'counter' if key in self.counters else 'gauge'
+            if kind == 'counter':
+                name += '_total'
+            lines.append(f"# HELP {name} {self.help}: {key.replace('_', ' ')}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_format_labels(base_labels)} {_format_value(value)}")
+        return lines
+
+class Metrics:
+    """In-process metric registry rendered in the Prometheus text format
+    
+    Each gunicorn worker keeps its own values and labels them with its pid, so a
+    scrape that reaches any one worker still yields series that only go up;
+    sum over pid in queries for totals.
+    """
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def counter(self, name, help_text, labels=()):
+        return self._register(name, lambda: Counter(name, help_text, labels))
+    
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(name, lambda: Histogram(name, help_text, labels, buckets))
+    
+    def register_stats(self, prefix, help_text, collect, counters=()):
+        return self._register(prefix, lambda: StatsCollector(prefix, help_text, collect, counters))
+    
+    def render(self) -> str:
+        base_labels = (('pid', str(os.getpid())),)
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(base_labels))
+        return '\n'.join(lines) + '\n'
+    
+    def _register(self, name, factory):
+        # Modules may be imported more than once (scripts, reloader); reuse the existing metric
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+registry = Metrics()
+
+STAGE_SECONDS = registry.histogram(
+    'resume_stage_seconds',
+    "Time spent in each stage of handling a resume",
+    labels=('stage',)
+)
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds',
+    "HTTP request latency by endpoint",
+    labels=('method', 'endpoint', 'status')
+)
+
+@contextmanager
+def stage(name):
+    """Time a block as one stage: recorded in the histogram and in this request's Server-Timing"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        
+        if has_app_context():
+            timings = g.setdefault('stage_timings', {})
+            total, count = timings.get(name, (0.0, 0))
+            timings[name] = (total + elapsed, count + 1)
+
+def init_app(app):
+    """Time every request and attach the stage breakdown as a Server-Timing header"""
+    
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.stage_timings = {}
+    
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint, status=str(response.status_code))
+        
+        # Streamed bodies are still being generated; only the time to first byte is known
+        entries = [
+            f"{name};dur={total * 1000:.1f}" + (f';desc="{count}x"' if count > 1 else '')
+            for name, (total, count) in g.pop('stage_timings', {}).items()
+        ]
+        entries.append(f"app;dur={elapsed * 1000:.1f}")
+        response.headers['Server-Timing'] = ', '.join(entries)
+        return response
+
+def _label_key(names, labels) -> Tuple[Tuple[str, str], ...]:
+    return tuple((name, str(labels.get(name, ''))) for name in names)
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        name + '="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(int(value))
+
+def _flatten(stats, prefix=''):
+    """(name, number) pairs from a nested stats dict, skipping non-numeric values"""
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{name}_")
+        elif isinstance(value, (int, float)):
+            yield name, value
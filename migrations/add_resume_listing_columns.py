@@ -0,0 +1,46 @@
+"""
+Add the is_analyzed flag and the listing index to an existing resumes table,
+which db.create_all() leaves untouched:
+
+    python migrations/add_resume_listing_columns.py
+
+migrations/init_db.py now does the same in revision 0002; running this
+first is harmless.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text
+from app import app
+from models import db, Resume
+
+def migrate():
+    """Add and backfill is_analyzed, then create the (user_id, uploaded_at, id) index"""
+    with app.app_context():
+        inspector = inspect(db.engine)
+        columns = {column['name'] for column in inspector.get_columns('resumes')}
+        indexes = {index['name'] for index in inspector.get_indexes('resumes')}
+        
+        with db.engine.begin() as connection:
+            if 'is_analyzed' not in columns:
+                connection.execute(text(
+                    "ALTER TABLE resumes ADD COLUMN is_analyzed BOOLEAN NOT NULL DEFAULT FALSE"
+                ))
+                print("Added resumes.is_analyzed")
+            
+            updated = connection.execute(text(
+                "UPDATE resumes SET is_analyzed = TRUE WHERE analysis IS NOT NULL AND NOT is_analyzed"
+            )).rowcount
+            print(f"Marked {updated} resumes as analyzed")
+        
+        if 'ix_resumes_user_uploaded' not in indexes:
+            for index in Resume.__table__.indexes:
+                if index.name == 'ix_resumes_user_uploaded':
+                    index.create(db.engine)
+            print("Created ix_resumes_user_uploaded")
+
+if __name__ == '__main__':
+    migrate()
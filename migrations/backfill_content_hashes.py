@@ -0,0 +1,46 @@
+"""
+Hash and extract the text of resumes uploaded before resumes.content_hash
+existed (run migrations/init_db.py first, which adds the column):
+
+    python migrations/backfill_content_hashes.py
+
+Each file is downloaded and parsed once, exactly as its first analysis would
+otherwise do, so later analyses and rankings read the stored text.
+migrations/deduplicate_blobs.py can then merge identical files.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, get_resume_text
+from models import db, Resume
+
+def backfill_content_hashes():
+    """Store the hash and text of every resume that has none"""
+    with app.app_context():
+        resume_ids = [
+            resume_id for (resume_id,) in
+            db.session.query(Resume.id).filter(Resume.content_hash.is_(None)).order_by(Resume.id)
+        ]
+        
+        failed = 0
+        for done, resume_id in enumerate(resume_ids, 1):
+            resume = db.session.get(Resume, resume_id)
+            try:
+                # Commits the hash, the parsed text and the search document
+                get_resume_text(resume)
+            except Exception as e:
+                db.session.rollback()
+                failed += 1
+                print(f"Skipped resume {resume_id}: {e}")
+            
+            if done % 100 == 0:
+                print(f"Hashed {done} of {len(resume_ids)} resumes...")
+            db.session.expunge_all()
+        
+        print(f"Hashed {len(resume_ids) - failed} resumes, {failed} failed")
+
+if __name__ == '__main__':
+    backfill_content_hashes()
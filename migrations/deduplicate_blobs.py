@@ -0,0 +1,76 @@
+"""
+Share one stored blob between resumes uploaded before de-duplication that have
+identical content (run migrations/init_db.py first to create stored_blobs):
+
+    python migrations/deduplicate_blobs.py                    # repoint and delete the copies
+    python migrations/deduplicate_blobs.py --keep-duplicates  # repoint only
+
+Resumes whose text was never extracted have no content hash yet and keep
+their own blob until it is.
+"""
+import sys
+import os
+import argparse
+from itertools import groupby
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, discard_blob, blob_client
+from models import db, Resume, StoredBlob
+
+def deduplicate_blobs(keep_duplicates=False):
+    """Register one blob per content hash and point every resume with that hash at it"""
+    with app.app_context():
+        registered = db.session.query(StoredBlob.blob_path)
+        rows = (
+            db.session.query(Resume.id, Resume.content_hash, Resume.blob_path, Resume.blob_url)
+            .filter(Resume.content_hash.isnot(None), ~Resume.blob_path.in_(registered))
+            .order_by(Resume.content_hash, Resume.uploaded_at, Resume.id)
+            .all()
+        )
+        
+        duplicates = []
+        groups = 0
+        for content_hash, group in groupby(rows, key=lambda row: row.content_hash):
+            group = list(group)
+            groups += 1
+            
+            stored = db.session.get(StoredBlob, content_hash)
+            if stored is None:
+                # The oldest upload keeps its blob
+                keeper = group[0]
+                properties = blob_client.get_properties(keeper.blob_path)
+                stored = StoredBlob(
+                    content_hash=content_hash,
+                    blob_path=keeper.blob_path,
+                    blob_url=keeper.blob_url,
+                    size=properties['size'] if properties else None,
+                    ref_count=0
+                )
+                db.session.add(stored)
+            
+            stored.ref_count += len(group)
+            for row in group:
+                if row.blob_path != stored.blob_path:
+                    Resume.query.filter_by(id=row.id).update(
+                        {Resume.blob_path: stored.blob_path, Resume.blob_url: stored.blob_url},
+                        synchronize_session=False
+                    )
+                    duplicates.append(row.blob_path)
+            db.session.commit()
+        
+        print(f"Registered {groups} distinct files for {len(rows)} resumes, {len(duplicates)} duplicate blobs")
+        
+        if keep_duplicates:
+            return
+        
+        # Only after the resumes point elsewhere; a failed delete just leaves an orphan
+        for blob_path in duplicates:
+            discard_blob(blob_path)
+        print(f"Deleted {len(duplicates)} duplicate blobs")
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--keep-duplicates', action='store_true', help="repoint resumes but leave the copies in storage")
+    deduplicate_blobs(arg_parser.parse_args().keep_duplicates)
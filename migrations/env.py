@@ -0,0 +1,55 @@
+"""Alembic environment: migrates the database the app is configured for"""
+import sys
+import os
+from logging.config import fileConfig
+
+from alembic import context
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import db
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+def run_migrations_offline():
+    """Write the SQL to stdout (alembic upgrade head --sql) instead of running it"""
+    url = app.config['SQLALCHEMY_DATABASE_URI']
+    context.configure(
+        url=url,
+        target_metadata=db.metadata,
+        literal_binds=True,
+        render_as_batch=url.startswith('sqlite'),
+        compare_type=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with app.app_context():
+        # A caller such as init_db.py may pass its own connection
+        connection = config.attributes.get('connection')
+        if connection is not None:
+            return _run_with(connection)
+        
+        with db.engine.connect() as connection:
+            _run_with(connection)
+
+def _run_with(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=db.metadata,
+        # SQLite cannot alter most table definitions; batch mode copies the table instead
+        render_as_batch=connection.dialect.name == 'sqlite',
+        compare_type=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
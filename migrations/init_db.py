@@ -1,19 +1,41 @@
+"""
+Create the database or upgrade it to the latest migration in migrations/versions:
+
+    python migrations/init_db.py
+
+Databases built by db.create_all() before migrations existed are stamped at
+the baseline revision, the original users and resumes tables, and then
+upgraded; the revisions after it only add what such a database is missing.
+"""
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from app import app
 from models import db
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini')
+BASELINE_REVISION = '0001'
+
 def init_database():
-    """Initialize database with tables"""
+    """Apply every pending migration"""
+    config = Config(ALEMBIC_INI)
+    
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        tables = set(inspect(db.engine).get_table_names())
+        
+        if tables and 'alembic_version' not in tables:
+            command.stamp(config, BASELINE_REVISION)
+            print(f"Stamped the existing schema at revision {BASELINE_REVISION}")
+        
+        command.upgrade(config, 'head')
         print("Database initialized successfully!")
         print(f"Database location: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
 if __name__ == '__main__':
-    init_database()
\ No newline at end of file
+    init_database()
@@ -0,0 +1,46 @@
+"""
+Copy analyses stored as JSON in resumes.analysis into the normalized analysis
+tables (run migrations/init_db.py first to create them):
+
+    python migrations/normalize_analyses.py
+"""
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, analysis_store
+from models import db, Resume, ResumeAnalysis
+
+BATCH_SIZE = 200
+
+def normalize_analyses():
+    """Store every JSON-only analysis in the normalized tables"""
+    with app.app_context():
+        normalized = db.session.query(ResumeAnalysis.resume_id)
+        resume_ids = [
+            resume_id for (resume_id,) in
+            db.session.query(Resume.id)
+            .filter(Resume.analysis.isnot(None), ~Resume.id.in_(normalized))
+            .order_by(Resume.id)
+        ]
+        
+        for start in range(0, len(resume_ids), BATCH_SIZE):
+            batch = (
+                Resume.query
+                .options(db.undefer(Resume.analysis))
+                .filter(Resume.id.in_(resume_ids[start:start + BATCH_SIZE]))
+                .all()
+            )
+            for resume in batch:
+                analysis_store.save(resume, json.loads(resume.analysis))
+                resume.is_analyzed = True
+            db.session.commit()
+            print(f"Normalized {min(start + BATCH_SIZE, len(resume_ids))} of {len(resume_ids)} analyses...")
+        
+        print(f"Normalized {len(resume_ids)} analyses")
+
+if __name__ == '__main__':
+    normalize_analyses()
@@ -0,0 +1,47 @@
+"""Baseline: the users and resumes tables the app started with
+
+Databases built by db.create_all() before migrations were introduced are
+stamped at this revision by migrations/init_db.py; the next revision brings
+them up to date from whatever state they are in.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 22:41:31.623969
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('picture', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    
+    op.create_table(
+        'resumes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('blob_path', sa.String(length=500), nullable=False),
+        sa.Column('blob_url', sa.String(length=500), nullable=True),
+        sa.Column('analysis', sa.Text(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('analyzed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade():
+    op.drop_table('resumes')
+    op.drop_table('users')
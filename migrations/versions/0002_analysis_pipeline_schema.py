@@ -0,0 +1,218 @@
+"""Columns and tables of the analysis pipeline
+
+Adds resumes.content_hash and resumes.is_analyzed, and the job, cache,
+parsed text, search, normalized analysis and stored blob tables. Earlier
+deployments created some of these with db.create_all() as the features
+shipped, or ran add_resume_listing_columns.py, so everything that already
+exists is kept and only what is missing is added.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:12:40.518204
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+NEW_TABLES = ('analysis_jobs', 'analysis_cache', 'parsed_documents', 'search_documents', 'skills',
+              'resume_analyses', 'analysis_skills', 'experience_entries', 'education_entries',
+              'job_matches', 'stored_blobs')
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    
+    def create_table(name, *elements, **kwargs):
+        """Create a table, or add the columns an older create_all() did not give it"""
+        if name not in tables:
+            op.create_table(name, *elements, **kwargs)
+            return
+        existing = {column['name'] for column in inspector.get_columns(name)}
+        for element in elements:
+            if isinstance(element, sa.Column) and element.name not in existing:
+                op.add_column(name, element)
+    
+    def create_index(name, table, columns, **kwargs):
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, **kwargs)
+    
+    resume_columns = {column['name'] for column in inspector.get_columns('resumes')}
+    if 'content_hash' not in resume_columns:
+        op.add_column('resumes', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    if 'is_analyzed' not in resume_columns:
+        op.add_column('resumes', sa.Column('is_analyzed', sa.Boolean(), server_default=sa.false(), nullable=False))
+        resumes = sa.table('resumes', sa.column('analysis', sa.Text()), sa.column('is_analyzed', sa.Boolean()))
+        op.execute(resumes.update().where(resumes.c.analysis.isnot(None)).values(is_analyzed=True))
+    create_index('ix_resumes_content_hash', 'resumes', ['content_hash'])
+    create_index('ix_resumes_user_uploaded', 'resumes', ['user_id', 'uploaded_at', 'id'])
+    
+    create_table(
+        'analysis_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        # The default only fills rows of jobs queued before batches existed
+        sa.Column('kind', sa.String(length=20), server_default='single', nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('job_description', sa.Text(), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    if 'analysis_jobs' in tables:
+        resume_id = next(column for column in inspector.get_columns('analysis_jobs') if column['name'] == 'resume_id')
+        if not resume_id['nullable']:
+            # Batch jobs have no single resume
+            with op.batch_alter_table('analysis_jobs') as batch_op:
+                batch_op.alter_column('resume_id', existing_type=sa.Integer(), nullable=True)
+    
+    create_table(
+        'analysis_cache',
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('model_name', sa.String(length=100), nullable=True),
+        sa.Column('analysis', sa.Text(), nullable=False),
+        sa.Column('latency', sa.Float(), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('cache_key')
+    )
+    
+    create_table(
+        'parsed_documents',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('parsed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    
+    create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('length', sa.Integer(), nullable=False),
+        sa.Column('terms', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    create_index('ix_search_documents_resume_id', 'search_documents', ['resume_id'])
+    create_index('ix_search_documents_user_id', 'search_documents', ['user_id'])
+    
+    create_table(
+        'skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('normalized', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('normalized')
+    )
+    
+    create_table(
+        'resume_analyses',
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('overall_score', sa.Integer(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=True),
+        sa.Column('phone', sa.String(length=100), nullable=True),
+        sa.Column('location', sa.String(length=255), nullable=True),
+        sa.Column('certifications', sa.Text(), nullable=True),
+        sa.Column('strengths', sa.Text(), nullable=True),
+        sa.Column('areas_for_improvement', sa.Text(), nullable=True),
+        sa.Column('suggestions', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(length=20), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resumes.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('resume_id')
+    )
+    create_index('ix_resume_analyses_user_score', 'resume_analyses', ['user_id', 'overall_score', 'resume_id'])
+    
+    create_table(
+        'analysis_skills',
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['resume_id'], ['resume_analyses.resume_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id']),
+        sa.PrimaryKeyConstraint('resume_id', 'skill_id')
+    )
+    create_index('ix_analysis_skills_skill', 'analysis_skills', ['skill_id', 'resume_id'])
+    
+    create_table(
+        'experience_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('company', sa.String(length=255), nullable=True),
+        sa.Column('duration', sa.String(length=100), nullable=True),
+        sa.Column('responsibilities', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resume_analyses.resume_id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_experience_entries_resume_id', 'experience_entries', ['resume_id'])
+    create_index('ix_experience_entries_title', 'experience_entries', ['title'])
+    create_index('ix_experience_entries_company', 'experience_entries', ['company'])
+    
+    create_table(
+        'education_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('degree', sa.String(length=255), nullable=True),
+        sa.Column('institution', sa.String(length=255), nullable=True),
+        sa.Column('year', sa.String(length=50), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resume_analyses.resume_id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_education_entries_resume_id', 'education_entries', ['resume_id'])
+    
+    create_table(
+        'job_matches',
+        sa.Column('resume_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('experience_match', sa.Text(), nullable=True),
+        sa.Column('matching_skills', sa.Text(), nullable=True),
+        sa.Column('missing_skills', sa.Text(), nullable=True),
+        sa.Column('recommendations', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['resume_id'], ['resume_analyses.resume_id']),
+        sa.PrimaryKeyConstraint('resume_id')
+    )
+    create_index('ix_job_matches_score', 'job_matches', ['score'])
+    
+    create_table(
+        'stored_blobs',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('blob_path', sa.String(length=500), nullable=False),
+        sa.Column('blob_url', sa.String(length=500), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash'),
+        sa.UniqueConstraint('blob_path')
+    )
+
+def downgrade():
+    # Dropping a table drops its indexes; children before the tables they reference
+    for table in reversed(NEW_TABLES):
+        op.drop_table(table)
+    
+    op.drop_index('ix_resumes_user_uploaded', table_name='resumes')
+    op.drop_index('ix_resumes_content_hash', table_name='resumes')
+    with op.batch_alter_table('resumes') as batch_op:
+        batch_op.drop_column('is_analyzed')
+        batch_op.drop_column('content_hash')
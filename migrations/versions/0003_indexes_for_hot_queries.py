@@ -0,0 +1,44 @@
+"""Indexes for the hot queries
+
+Reusing a user's earlier analysis of the same file, finding the resume of a
+confirmed direct upload, deleting a resume's jobs and re-queueing pending jobs
+at startup each scanned a whole table before.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 22:42:12.362714
+"""
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_resumes_user_content', 'resumes', ['user_id', 'content_hash', 'analyzed_at']),
+    ('ix_resumes_blob_path', 'resumes', ['blob_path']),
+    ('ix_analysis_jobs_resume_id', 'analysis_jobs', ['resume_id']),
+    ('ix_analysis_jobs_status_created', 'analysis_jobs', ['status', 'created_at']),
+)
+
+def upgrade():
+    context = op.get_context()
+    concurrently = context.dialect.name == 'postgresql'
+    inspector = sa.inspect(op.get_bind())
+    # Databases whose tables were last built by create_all() may have some already
+    existing = {index['name'] for table in {table for _, table, _ in INDEXES}
+                for index in inspector.get_indexes(table)}
+    
+    # Postgres can build them without blocking writes, but not inside a transaction
+    with context.autocommit_block() if concurrently else nullcontext():
+        for name, table, columns in INDEXES:
+            if name not in existing:
+                op.create_index(name, table, columns, postgresql_concurrently=concurrently)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,24 @@
+"""Prompt token counts of each stored analysis
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:05:17.204913
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('prompt_original_tokens', 'prompt_compacted_tokens', 'prompt_chunks', 'prompt_largest_call_tokens')
+
+def upgrade():
+    for name in COLUMNS:
+        op.add_column('resume_analyses', sa.Column(name, sa.Integer(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('resume_analyses') as batch_op:
+        for name in reversed(COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,38 @@
+"""Never reuse search_documents ids on SQLite
+
+Each worker skips a change whose id it has already applied to a resume.
+SQLite gave the id of a deleted last row to the next insert, so a resume
+re-indexed or deleted right after its previous change kept a stale entry in
+every other worker. AUTOINCREMENT needs the table rebuilt; other databases
+already draw ids from a sequence.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:22:09.731046
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def _autoincrement(bind):
+    sql = bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'search_documents'"
+    )).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite' or _autoincrement(bind):
+        return
+    # Copies the rows; the sequence starts after the highest id copied
+    with op.batch_alter_table('search_documents', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+
+def downgrade():
+    # Reusable ids were the bug; nothing to undo
+    pass
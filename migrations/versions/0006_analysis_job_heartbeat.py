@@ -0,0 +1,23 @@
+"""Heartbeat of running analysis jobs
+
+Workers refresh it while they run a job, so a job whose process died can be
+told from one that is merely long.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:03:48.276514
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('analysis_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('analysis_jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -1,8 +1,26 @@
+import json
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from datetime import datetime
 
 db = SQLAlchemy()
 
+@event.listens_for(Engine, 'connect')
+def configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers in every worker carry on while one of them writes
+    
+    synchronous=NORMAL is safe in WAL mode: a crash of the app loses nothing,
+    a power failure at most the last few commits.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -20,14 +38,249 @@ class User(db.Model):
 class Resume(db.Model):
     __tablename__ = 'resumes'
     
+    __table_args__ = (
+        # Serves the keyset-paginated listing of a user's resumes, newest first
+        db.Index('ix_resumes_user_uploaded', 'user_id', 'uploaded_at', 'id'),
+        # A user's earlier uploads of the same file, whose analysis is reused
+        db.Index('ix_resumes_user_content', 'user_id', 'content_hash', 'analyzed_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
-    blob_path = db.Column(db.String(500), nullable=False)
+    blob_path = db.Column(db.String(500), nullable=False, index=True)  # Shared by identical uploads
     blob_url = db.Column(db.String(500))
-    analysis = db.Column(db.Text)  # JSON string
+    analysis = db.deferred(db.Column(db.Text))  # JSON string; loaded only when read
+    is_analyzed = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     analyzed_at = db.Column(db.DateTime)
+    content_hash = db.Column(db.String(64), index=True)  # sha256 of the uploaded file
+    
+    analysis_record = db.relationship(
+        'ResumeAnalysis',
+        backref='resume',
+        uselist=False,
+        lazy=True,
+        cascade='all, delete-orphan'
+    )
+    
+    parsed_document = db.relationship(
+        'ParsedDocument',
+        primaryjoin='foreign(Resume.content_hash) == ParsedDocument.content_hash',
+        viewonly=True,
+        lazy=True
+    )
+    
+    def __repr__(self):
+        return f'<Resume {self.filename}>'
+
+class ParsedDocument(db.Model):
+    __tablename__ = 'parsed_documents'
+    
+    content_hash = db.Column(db.String(64), primary_key=True)  # sha256 of the original file
+    text = db.Column(db.Text, nullable=False)
+    parsed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ParsedDocument {self.content_hash[:12]}>'
+
+class StoredBlob(db.Model):
+    """One stored copy of each distinct file, shared by every resume with that content"""
+    __tablename__ = 'stored_blobs'
+    
+    content_hash = db.Column(db.String(64), primary_key=True)  # sha256 of the file
+    blob_path = db.Column(db.String(500), nullable=False, unique=True)
+    blob_url = db.Column(db.String(500))
+    size = db.Column(db.BigInteger)
+    ref_count = db.Column(db.Integer, nullable=False, default=1)  # Resumes pointing at the blob
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<StoredBlob {self.content_hash[:12]} x{self.ref_count}>'
+
+class AnalysisJob(db.Model):
+    __tablename__ = 'analysis_jobs'
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    
+    SINGLE = 'single'
+    BATCH = 'batch'
+    EXTRACT = 'extract'  # Text extraction of a directly uploaded resume
+    
+    # Each worker's sweep re-queues orphaned jobs oldest first
+    __table_args__ = (
+        db.Index('ix_analysis_jobs_status_created', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False, default=SINGLE)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), index=True)  # Null for batch jobs
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    job_description = db.Column(db.Text)
+    payload = db.Column(db.Text)  # JSON string, e.g. resume ids of a batch
+    result = db.Column(db.Text)  # JSON string, per-resume status of a batch
+    status = db.Column(db.String(20), nullable=False, default=QUEUED)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # Refreshed while a worker runs the job
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'resume_id': self.resume_id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        
+        if self.kind == self.BATCH:
+            data['total'] = len(json.loads(self.payload)['resume_ids']) if self.payload else 0
+            data['results'] = json.loads(self.result) if self.result else None
+        
+        return data
+    
+    def __repr__(self):
+        return f'<AnalysisJob {self.id} {self.status}>'
+
+class AnalysisCacheEntry(db.Model):
+    __tablename__ = 'analysis_cache'
+    
+    cache_key = db.Column(db.String(64), primary_key=True)  # sha256 of analysis inputs
+    model_name = db.Column(db.String(100))
+    analysis = db.Column(db.Text, nullable=False)  # JSON string
+    latency = db.Column(db.Float)  # Seconds the original LLM call took
+    hit_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AnalysisCacheEntry {self.cache_key[:12]}>'
+
+class SearchDocument(db.Model):
+    __tablename__ = 'search_documents'
+    # Without AUTOINCREMENT SQLite hands the id of a deleted last row to the next insert
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    # Ids double as a change sequence that lets every worker apply new index updates,
+    # so they must never be reused
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, nullable=False, index=True)  # No foreign key: deletions are kept as tombstones
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    length = db.Column(db.Integer, nullable=False, default=0)
+    terms = db.Column(db.Text)  # JSON {term: count}; null once the resume is deleted
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SearchDocument {self.resume_id}>'
+
+# Skills named in analyses; a resume's skills are rows in analysis_skills
+analysis_skills = db.Table(
+    'analysis_skills',
+    db.Column('resume_id', db.Integer, db.ForeignKey('resume_analyses.resume_id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True),
+    db.Index('ix_analysis_skills_skill', 'skill_id', 'resume_id')
+)
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)  # Spelling first seen, for display
+    normalized = db.Column(db.String(255), unique=True, nullable=False)  # Lower-cased lookup key
+    
+    def __repr__(self):
+        return f'<Skill {self.name}>'
+
+class ResumeAnalysis(db.Model):
+    """The latest analysis of a resume, one column or row per field so it can be queried"""
+    __tablename__ = 'resume_analyses'
+    __table_args__ = (
+        db.Index('ix_resume_analyses_user_score', 'user_id', 'overall_score', 'resume_id'),
+    )
+    
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Copied from the resume for filtering
+    overall_score = db.Column(db.Integer, nullable=False, default=0)
+    summary = db.Column(db.Text)
+    name = db.Column(db.String(255))
+    email = db.Column(db.String(255))
+    phone = db.Column(db.String(100))
+    location = db.Column(db.String(255))
+    certifications = db.Column(db.Text)  # JSON list of strings
+    strengths = db.Column(db.Text)  # JSON list of strings
+    areas_for_improvement = db.Column(db.Text)  # JSON list of strings
+    suggestions = db.Column(db.Text)  # JSON list of strings
+    source = db.Column(db.String(20))  # 'local' when produced by the extractor fallback
+    error = db.Column(db.Text)
+    # Estimated prompt size before and after compaction; chunk counts only for map-reduce analyses
+    prompt_original_tokens = db.Column(db.Integer)
+    prompt_compacted_tokens = db.Column(db.Integer)
+    prompt_chunks = db.Column(db.Integer)
+    prompt_largest_call_tokens = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    skills = db.relationship('Skill', secondary=analysis_skills, lazy=True)
+    experience = db.relationship(
+        'ExperienceEntry',
+        order_by='ExperienceEntry.position',
+        lazy=True,
+        cascade='all, delete-orphan'
+    )
+    education = db.relationship(
+        'EducationEntry',
+        order_by='EducationEntry.position',
+        lazy=True,
+        cascade='all, delete-orphan'
+    )
+    job_match = db.relationship('JobMatch', uselist=False, lazy=True, cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<ResumeAnalysis {self.resume_id} {self.overall_score}>'
+
+class ExperienceEntry(db.Model):
+    __tablename__ = 'experience_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume_analyses.resume_id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # Order within the resume
+    title = db.Column(db.String(255), index=True)
+    company = db.Column(db.String(255), index=True)
+    duration = db.Column(db.String(100))
+    responsibilities = db.Column(db.Text)  # JSON list of strings
+    
+    def __repr__(self):
+        return f'<ExperienceEntry {self.title} at {self.company}>'
+
+class EducationEntry(db.Model):
+    __tablename__ = 'education_entries'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume_analyses.resume_id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    degree = db.Column(db.String(255))
+    institution = db.Column(db.String(255))
+    year = db.Column(db.String(50))
+    details = db.Column(db.Text)
+    
+    def __repr__(self):
+        return f'<EducationEntry {self.degree}>'
+
+class JobMatch(db.Model):
+    __tablename__ = 'job_matches'
+    
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume_analyses.resume_id'), primary_key=True)
+    score = db.Column(db.Integer, nullable=False, default=0, index=True)
+    experience_match = db.Column(db.Text)
+    matching_skills = db.Column(db.Text)  # JSON list of strings
+    missing_skills = db.Column(db.Text)  # JSON list of strings
+    recommendations = db.Column(db.Text)  # JSON list of strings
     
     def __repr__(self):
-        return f'<Resume {self.filename}>'
\ No newline at end of file
+        return f'<JobMatch {self.resume_id} {self.score}>'
@@ -1,9 +1,37 @@
+import io
 import os
-import fitz  # PyMuPDF
-from docx import Document
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import re
 
+# Characters kept besides letters, digits and whitespace
+DISALLOWED_CHARS_RE = re.compile(r'[^\w\s.,;:()\-@#+]+')
+
 class ResumeParser:
+    """Extract plain text from PDF and DOCX resumes
+    
+    Large PDFs are extracted in parallel page ranges by a process pool. Only the
+    first max_pages pages are read and the text is cut to max_chars. PyMuPDF and
+    python-docx are imported on first use, or up front by preload().
+    """
+    
+    def __init__(self, max_pages=50, max_chars=200000, parallel_min_pages=16, workers=None):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parallel_min_pages = parallel_min_pages
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+    
+    def preload(self):
+        """Import the parsing libraries; they start no threads, so this is safe before forking"""
+        import fitz  # PyMuPDF
+        import docx
+    
     def parse(self, file_path):
         """Parse resume and extract text"""
         ext = os.path.splitext(file_path)[1].lower()
@@ -15,16 +43,54 @@ class ResumeParser:
         else:
             raise ValueError(f"Unsupported file format: {ext}")
     
-    def _parse_pdf(self, file_path):
+    def parse_bytes(self, data, ext):
+        """Parse resume from in-memory file content (bytes, bytearray or memoryview)"""
+        ext = ext.lower() if ext.startswith('.') else f".{ext.lower()}"
+        
+        if ext == '.pdf':
+            return self._parse_pdf(stream=_as_buffer(data))
+        elif ext == '.docx':
+            return self._parse_docx(io.BytesIO(_as_buffer(data)))
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+    
+    def parse_stream(self, buffer, ext=None):
+        """Parse resume from a binary file-like object"""
+        if not ext:
+            name = getattr(buffer, 'name', None)
+            ext = (os.path.splitext(name)[1] if isinstance(name, str) else '') or _sniff_ext(buffer)
+        
+        ext = ext.lower() if ext.startswith('.') else f".{ext.lower()}"
+        
+        if ext == '.pdf':
+            # PyMuPDF opens a file by path and shares the buffer of a BytesIO (or
+            # of bytes); it copies anything else, so other streams are read once
+            buffer = _unspooled(buffer)
+            path = _file_path(buffer)
+            if path:
+                return self._parse_pdf(path)
+            return self._parse_pdf(stream=buffer if isinstance(buffer, io.BytesIO) else buffer.read())
+        elif ext == '.docx':
+            return self._parse_docx(buffer)
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+    
+    def _parse_pdf(self, file_path=None, stream=None):
         """Extract text from PDF using PyMuPDF"""
+        import fitz  # PyMuPDF
+        
         try:
-            text = ""
-            with fitz.open(file_path) as doc:
-                for page in doc:
-                    text += page.get_text()
+            doc = fitz.open(file_path) if stream is None else fitz.open(stream=stream, filetype='pdf')
+            with doc:
+                page_count = min(doc.page_count, self.max_pages)
+                
+                if self.workers > 1 and page_count >= self.parallel_min_pages:
+                    pages = self._extract_parallel(file_path, stream, page_count)
+                else:
+                    pages = _page_texts(doc, 0, page_count)
             
-            # Clean and normalize text
-            text = self._clean_text(text)
+            # Join once; repeated string concatenation can go quadratic
+            text = self._clean_text(''.join(pages))
             
             if not text.strip():
                 raise ValueError("PDF appears to be empty or unreadable")
@@ -33,20 +99,54 @@ class ResumeParser:
         except Exception as e:
             raise Exception(f"Failed to parse PDF: {str(e)}")
     
-    def _parse_docx(self, file_path):
-        """Extract text from DOCX"""
+    def _extract_parallel(self, file_path, stream, page_count):
+        """Extract contiguous page ranges in worker processes, in page order"""
+        if stream is not None:
+            source = stream.getvalue() if isinstance(stream, io.BytesIO) else stream
+        else:
+            source = file_path
+        
+        step = -(-page_count // self.workers)
+        ranges = [(source, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        
+        try:
+            return [text for chunk in self._get_pool().map(_extract_page_range, ranges) for text in chunk]
+        except BrokenProcessPool:
+            # A crashed worker (e.g. killed for memory) breaks the pool; start over serially
+            with self._pool_lock:
+                self._pool = None
+            with _open_pdf(source) as doc:
+                return _page_texts(doc, 0, page_count)
+    
+    def _get_pool(self):
+        """Start the process pool on first use, once per process"""
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # Spawned rather than forked: the app process runs threads, and forking
+                # with their locks held can deadlock the children
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+    
+    def _parse_docx(self, source):
+        """Extract text from DOCX (path or file-like object)"""
+        from docx import Document
+        
         try:
-            doc = Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            doc = Document(source)
+            parts = [paragraph.text for paragraph in doc.paragraphs]
             
             # Also extract text from tables
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        text += "\n" + cell.text
+                        parts.append(cell.text)
             
             # Clean and normalize text
-            text = self._clean_text(text)
+            text = self._clean_text("\n".join(parts))
             
             if not text.strip():
                 raise ValueError("DOCX appears to be empty")
@@ -56,14 +156,65 @@ class ResumeParser:
             raise Exception(f"Failed to parse DOCX: {str(e)}")
     
     def _clean_text(self, text):
-        """Clean and normalize extracted text"""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        """Collapse whitespace and drop special characters other than basic punctuation
         
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.,;:()\-@#+]', '', text)
+        Splitting and joining collapses whitespace runs in C, leaving one regex
+        pass; the output matches collapsing whitespace with one regex and then
+        removing the disallowed characters with another.
+        """
+        text = DISALLOWED_CHARS_RE.sub('', ' '.join(text.split())).strip()
         
-        # Normalize line breaks
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars].rsplit(' ', 1)[0]
         
-        return text.strip()
\ No newline at end of file
+        return text
+
+def _open_pdf(source):
+    import fitz  # PyMuPDF
+    return fitz.open(stream=source, filetype='pdf') if isinstance(source, (bytes, bytearray)) else fitz.open(source)
+
+def _page_texts(doc, start, stop):
+    return [doc[number].get_text() for number in range(start, stop)]
+
+def _extract_page_range(args):
+    """Process pool task: the text of pages [start, stop) of a PDF path or bytes"""
+    source, start, stop = args
+    with _open_pdf(source) as doc:
+        return _page_texts(doc, start, stop)
+
+def _as_buffer(data):
+    """Return bytes-like content PyMuPDF accepts, copying only when unavoidable"""
+    if isinstance(data, memoryview):
+        # A view over a whole bytes object can hand back the original buffer
+        if isinstance(data.obj, (bytes, bytearray)) and data.nbytes == len(data.obj):
+            return data.obj
+        return data.tobytes()
+    return data
+
+def _file_path(buffer):
+    """Path of a file object positioned at its start, or None"""
+    name = getattr(buffer, 'name', None)
+    try:
+        if isinstance(name, str) and os.path.isfile(name) and buffer.tell() == 0:
+            return name
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _unspooled(buffer):
+    """The BytesIO or temporary file behind a SpooledTemporaryFile, as werkzeug spools uploads"""
+    if isinstance(buffer, tempfile.SpooledTemporaryFile):
+        return buffer._file
+    return buffer
+
+def _sniff_ext(buffer):
+    """Guess the file type from its magic bytes"""
+    position = buffer.tell()
+    magic = buffer.read(4)
+    buffer.seek(position)
+    
+    if magic.startswith(b'%PDF'):
+        return '.pdf'
+    if magic.startswith(b'PK'):
+        return '.docx'
+    return ''
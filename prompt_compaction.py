@@ -0,0 +1,159 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from extractor import ResumeExtractor
+
+# Gemini averages roughly four characters of English text per token; close enough
+# for budgeting without a tokenizer round trip
+CHARS_PER_TOKEN = 4
+
+# Sections kept first when a resume is over budget; anything unlisted comes last
+SECTION_PRIORITY = [
+    'experience', 'skills', 'summary', 'education', 'certifications', 'projects',
+    'awards', 'languages', 'publications', 'interests', 'references'
+]
+
+HEADER_CHARS = 500
+MIN_PARTIAL_CHARS = 200
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.;])\s+')
+NORMALIZE_RE = re.compile(r'[^a-z0-9]+')
+ORPHAN_PUNCTUATION_RE = re.compile(r'(?<=\s)[.;,](?=\s|$)')
+BOILERPLATE_RE = re.compile(
+    r'\b(?:(?:references )?(?:are )?available (?:up)?on request\.?'
+    r'|page \d+ of \d+'
+    r'|curriculum vitae'
+    r'|this (?:resume|cv) was (?:last )?updated [\w ,]+'
+    r'|i hereby declare that[^.]*\.?'
+    r'|all information (?:provided )?(?:above )?is true[^.]*\.?)',
+    re.IGNORECASE
+)
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+class PromptCompactor:
+    """Shrink resume and job description text to a token budget before prompting"""
+    
+    def __init__(self, resume_budget=6000, job_budget=1500, extractor: Optional[ResumeExtractor] = None):
+        self.resume_budget = resume_budget
+        self.job_budget = job_budget
+        self.extractor = extractor or ResumeExtractor()
+    
+    @property
+    def signature(self) -> str:
+        """Identifies the settings, so cached analyses of differently compacted prompts do not mix"""
+        return f"c{self.resume_budget}-{self.job_budget}"
+    
+    def compact(self, resume_text: str, job_description: str = "") -> Tuple[str, str]:
+        return (
+            self.compact_resume(resume_text),
+            self.compact_text(job_description, self.job_budget) if job_description else job_description
+        )
+    
+    def compact_resume(self, text: str) -> str:
+        """Drop boilerplate and repeats, then keep the most useful sections within the budget"""
+        text = self._deduplicate(text)
+        limit = self.resume_budget * CHARS_PER_TOKEN
+        
+        if len(text) <= limit:
+            return text
+        
+        sections = self.extractor.split_sections(text)
+        start = sections.pop('_start')
+        
+        if not sections:
+            return _truncate(text, limit)
+        
+        header = _truncate(text[:start].strip(), HEADER_CHARS) if start else ''
+        remaining = limit - len(header)
+        kept = {}
+        
+        for name in sorted(sections, key=_priority):
+            content = sections[name]
+            if not content:
+                continue
+            overhead = len(name) + 3  # "NAME: " plus the joining space
+            if len(content) + overhead <= remaining:
+                kept[name] = content
+                remaining -= len(content) + overhead
+            elif remaining - overhead >= MIN_PARTIAL_CHARS:
+                kept[name] = _truncate(content, remaining - overhead)
+                remaining = 0
+        
+        # Reassemble in the original order so the model still sees a resume
+        parts = [header] if header else []
+        parts.extend(f"{name.upper()}: {kept[name]}" for name in sections if name in kept)
+        return ' '.join(parts)
+    
+    def compact_text(self, text: str, budget: int) -> str:
+        return _truncate(self._deduplicate(text), budget * CHARS_PER_TOKEN)
+    
+    def _deduplicate(self, text: str) -> str:
+        text = ORPHAN_PUNCTUATION_RE.sub('', BOILERPLATE_RE.sub(' ', text))
+        seen = set()
+        sentences = []
+        
+        for sentence in SENTENCE_SPLIT_RE.split(text):
+            key = NORMALIZE_RE.sub(' ', sentence.lower()).strip()
+            # Short fragments such as skill names legitimately repeat
+            if len(key.split()) >= 4:
+                if key in seen:
+                    continue
+                seen.add(key)
+            sentences.append(sentence)
+        
+        return re.sub(r'\s+', ' ', ' '.join(sentences)).strip()
+
+def chunk_sections(text: str, chunk_tokens: int, extractor: Optional[ResumeExtractor] = None) -> List[str]:
+    """Split resume text into chunks of about chunk_tokens that break between sections where possible"""
+    limit = chunk_tokens * CHARS_PER_TOKEN
+    sections = (extractor or ResumeExtractor()).split_sections(text)
+    start = sections.pop('_start')
+    if not sections:
+        start = len(text)
+    
+    parts = [('', text[:start].strip())] + [(name.upper(), content) for name, content in sections.items()]
+    pieces = []
+    
+    for label, content in parts:
+        prefix = f"{label}: " if label else ''
+        # Oversized sections continue in the next chunk under the same heading
+        while len(prefix) + len(content) > limit:
+            head = _truncate(content, limit - len(prefix))
+            pieces.append(prefix + head)
+            content = content[len(head):].strip()
+            prefix = f"{label} (continued): " if label else ''
+        if content:
+            pieces.append(prefix + content)
+    
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(piece) + 1 <= limit:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    
+    # Cut at the last sentence end inside the limit, or failing that at a word boundary
+    cut = text[:limit]
+    boundary = max(cut.rfind('. '), cut.rfind('; '))
+    if boundary < limit // 2:
+        boundary = cut.rfind(' ')
+    return cut[:boundary + 1 if boundary > 0 else limit].strip()
+
+def _priority(section: str) -> int:
+    return SECTION_PRIORITY.index(section) if section in SECTION_PRIORITY else len(SECTION_PRIORITY)
+
+def compaction_stats(original_prompt: str, compacted_prompt: str) -> Dict[str, Any]:
+    return compaction_counts(estimate_tokens(original_prompt), estimate_tokens(compacted_prompt))
+
+def compaction_counts(original: int, compacted: int) -> Dict[str, Any]:
+    return {
+        'original_tokens': original,
+        'compacted_tokens': compacted,
+        'saved_ratio': round(1 - compacted / original, 3) if original else 0.0
+    }
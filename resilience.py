@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+from typing import Dict, Any
+
+class CircuitOpenError(Exception):
+    """Raised when calls are rejected because the circuit is open"""
+    retryable = False
+
+class RateLimitExceeded(Exception):
+    """Raised when no token became available within the wait limit"""
+    retryable = False
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+    
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=20.0, jitter=True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+    
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """Seconds to wait before retry number attempt + 1"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        
+        # Never retry sooner than the server asked us to
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        
+        return delay
+
+class CircuitBreaker:
+    """Fail fast while the upstream keeps failing, probing again after a cool-down"""
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, name='gemini'):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'rejected': 0, 'failures': 0, 'successes': 0}
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+    
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may proceed"""
+        with self._lock:
+            state = self._current_state()
+            
+            if state == self.CLOSED:
+                return
+            
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                # Let a single probe through to test the upstream
+                self._probe_in_flight = True
+                return
+            
+            self._stats['rejected'] += 1
+            retry_in = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+        
+        raise CircuitOpenError(f"Circuit '{self.name}' is open; retry in {retry_in:.0f}s")
+    
+    def record_success(self):
+        with self._lock:
+            self._stats['successes'] += 1
+            self._failures = 0
+            self._probe_in_flight = False
+            self._state = self.CLOSED
+    
+    def record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+            self._failures += 1
+            probe_failed = self._probe_in_flight
+            self._probe_in_flight = False
+            
+            if probe_failed or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats['opened'] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['state'] = self._current_state()
+            stats['consecutive_failures'] = self._failures
+        return stats
+    
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by all threads of a process"""
+    
+    def __init__(self, rate_per_minute=60, burst=10, max_wait=30.0):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.max_wait = max_wait
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'throttled': 0, 'rejected': 0, 'waited_seconds': 0.0}
+    
+    def acquire(self):
+        """Take a token, waiting up to max_wait seconds for one"""
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._stats['acquired'] += 1
+                    return
+                
+                wait = (1 - self._tokens) / self.rate
+                
+                if now + wait > deadline:
+                    self._stats['rejected'] += 1
+                    raise RateLimitExceeded("Gemini rate limit reached, please try again later")
+                
+                if not waited:
+                    self._stats['throttled'] += 1
+                    waited = True
+                self._stats['waited_seconds'] += wait
+            
+            time.sleep(wait)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tokens'] = round(self._tokens, 2)
+        stats['waited_seconds'] = round(stats['waited_seconds'], 3)
+        return stats
@@ -0,0 +1,70 @@
+"""
+Compare per-call requests.post against the pooled ProxyTransport.
+
+Runs both transports against the local fake proxy and prints the mean
+latency per call, sequentially and with concurrent callers:
+
+    python scripts/bench_proxy_transport.py --calls 500 --concurrency 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_client import ProxyTransport
+from fake_gemini_proxy import start_server
+
+PROMPT = "Analyze the following resume. " + "Experienced engineer with Python and SQL. " * 200
+
+def call_unpooled(base_url):
+    # What GeminiClient._call_proxy did before the pooled transport
+    response = requests.post(
+        f"{base_url}/analyze",
+        json={"prompt": PROMPT, "model": "gemini-2.0-flash"},
+        headers={'Content-Type': 'application/json'},
+        timeout=60
+    )
+    response.raise_for_status()
+    return response.json()
+
+def run(label, fn, calls, concurrency):
+    started = time.perf_counter()
+    if concurrency == 1:
+        for _ in range(calls):
+            fn()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: fn(), range(calls)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {calls / elapsed:9.1f} calls/s  {elapsed / calls * 1000:7.3f} ms/call")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--calls', type=int, default=500)
+    arg_parser.add_argument('--concurrency', type=int, default=8)
+    args = arg_parser.parse_args()
+    
+    server = start_server()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    
+    pooled = ProxyTransport(base_url, pool_size=args.concurrency)
+    pooled_gzip = ProxyTransport(base_url, pool_size=args.concurrency, gzip_requests=True)
+    payload = {"prompt": PROMPT, "model": "gemini-2.0-flash"}
+    
+    print(f"prompt size: {len(json.dumps(payload))} bytes")
+    for concurrency in (1, args.concurrency):
+        print(f"-- concurrency {concurrency}")
+        run("requests.post per call", lambda: call_unpooled(base_url), args.calls, concurrency)
+        run("pooled session", lambda: pooled.post_json('/analyze', payload), args.calls, concurrency)
+        run("pooled session + gzip", lambda: pooled_gzip.post_json('/analyze', payload), args.calls, concurrency)
+    
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Index resumes whose text was stored before the search index existed, then
+write a fresh snapshot so workers start from it:
+
+    python scripts/build_search_index.py
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, search_index
+from models import db, Resume, ParsedDocument, SearchDocument
+
+BATCH_SIZE = 500
+
+def build_search_index():
+    """Add every parsed, not yet indexed resume to the index"""
+    with app.app_context():
+        indexed = db.session.query(SearchDocument.resume_id)
+        resume_ids = [
+            resume_id for (resume_id,) in
+            db.session.query(Resume.id)
+            .join(ParsedDocument, ParsedDocument.content_hash == Resume.content_hash)
+            .filter(~Resume.id.in_(indexed))
+            .order_by(Resume.id)
+        ]
+        
+        for start in range(0, len(resume_ids), BATCH_SIZE):
+            batch = (
+                db.session.query(Resume.id, Resume.user_id, ParsedDocument.text)
+                .join(ParsedDocument, ParsedDocument.content_hash == Resume.content_hash)
+                .filter(Resume.id.in_(resume_ids[start:start + BATCH_SIZE]))
+                .all()
+            )
+            for resume_id, user_id, text in batch:
+                search_index.add_document(resume_id, user_id, text)
+            db.session.commit()
+            print(f"Indexed {min(start + BATCH_SIZE, len(resume_ids))} of {len(resume_ids)} resumes...")
+        
+        search_index.sync(force=True)
+        search_index.save()
+        print(f"Indexed {len(resume_ids)} resumes; snapshot written to {search_index.snapshot_path}")
+        print(search_index.stats())
+
+if __name__ == '__main__':
+    build_search_index()
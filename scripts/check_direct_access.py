@@ -0,0 +1,103 @@
+"""
+Check direct-to-storage uploads and SAS download redirects against a running
+app, end to end. Intended for Azurite, the local Azure Storage emulator:
+
+    docker run -p 10000:10000 mcr.microsoft.com/azure-storage/azurite azurite-blob --blobHost 0.0.0.0
+    BLOB_STORAGE_BACKEND=azure BLOB_DIRECT_ACCESS=True DEV_LOGIN_ENABLED=True \\
+        AZURE_STORAGE_CONNECTION_STRING="DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UFeIkbIKEv6T0GSoPdmRwXv+yRyDSn5Ak7tlY+Q==;BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;" \\
+        python app.py
+    python scripts/check_direct_access.py --base-url http://127.0.0.1:5000
+
+Uploads a resume through a write SAS URL, confirms it, waits for its text to
+be extracted and downloads it again through the read SAS redirect, checking
+that the bytes match and that each SAS URL grants only what it should.
+Exits 1 if any check fails.
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from corpus import make_pdf
+
+class Checker:
+    def __init__(self):
+        self.failures = 0
+    
+    def check(self, name, ok, detail=''):
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f': {detail}' if detail and not ok else ''}")
+        if not ok:
+            self.failures += 1
+        return ok
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    arg_parser.add_argument('--pages', type=int, default=3)
+    arg_parser.add_argument('--timeout', type=float, default=60, help="seconds to wait for text extraction")
+    args = arg_parser.parse_args()
+    
+    base_url = args.base_url.rstrip('/')
+    app = requests.Session()
+    checker = Checker()
+    content = make_pdf(args.pages, seed=int(time.time()))
+    
+    response = app.post(f"{base_url}/dev/login", json={'email': 'direct-access-check@example.com'})
+    if not checker.check('dev login', response.status_code == 200, response.text):
+        return 1
+    
+    response = app.post(f"{base_url}/upload/direct", json={'filename': 'direct check.pdf', 'size': len(content)})
+    if not checker.check('upload URL issued', response.status_code == 200, response.text):
+        return 1
+    ticket = response.json()
+    
+    # Plain requests, not the app session: storage must accept the SAS alone
+    response = requests.request(ticket['method'], ticket['upload_url'], headers=ticket['headers'], data=content)
+    checker.check('file uploaded to storage', response.status_code == 201, f"{response.status_code} {response.text[:200]}")
+    
+    response = requests.get(ticket['upload_url'])
+    checker.check('upload URL cannot read', response.status_code == 403, str(response.status_code))
+    
+    response = app.post(f"{base_url}{ticket['confirm_url']}", json={'upload_token': ticket['upload_token']})
+    if not checker.check('upload confirmed', response.status_code == 201, response.text):
+        return 1
+    confirmed = response.json()
+    resume_id = confirmed['resume_id']
+    
+    response = app.post(f"{base_url}{ticket['confirm_url']}", json={'upload_token': ticket['upload_token']})
+    checker.check('second confirm rejected', response.status_code == 409, str(response.status_code))
+    
+    status = None
+    deadline = time.time() + args.timeout
+    while time.time() < deadline:
+        status = app.get(f"{base_url}{confirmed['status_url']}").json()['status']
+        if status in ('completed', 'failed'):
+            break
+        time.sleep(0.5)
+    checker.check('text extracted', status == 'completed', str(status))
+    
+    response = app.get(f"{base_url}/files/{resume_id}/download", allow_redirects=False)
+    if checker.check('download redirects to storage', response.status_code == 302, str(response.status_code)):
+        download_url = response.headers['Location']
+        response = requests.get(download_url)
+        checker.check('downloaded bytes match', response.status_code == 200 and response.content == content,
+                      f"{response.status_code}, {len(response.content)} bytes")
+        checker.check('served as an attachment', 'attachment' in response.headers.get('Content-Disposition', ''))
+        
+        response = requests.put(download_url, headers={'x-ms-blob-type': 'BlockBlob'}, data=b'overwrite')
+        checker.check('download URL cannot write', response.status_code == 403, str(response.status_code))
+    
+    response = app.post(f"{base_url}/upload/direct", json={'filename': 'huge.pdf', 'size': 10 ** 10})
+    checker.check('oversized upload refused', response.status_code == 413, str(response.status_code))
+    
+    app.delete(f"{base_url}/files/{resume_id}")
+    
+    print(f"\n{checker.failures} check(s) failed" if checker.failures else "\nAll checks passed")
+    return 1 if checker.failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
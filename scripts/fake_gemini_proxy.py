@@ -0,0 +1,162 @@
+"""
+Local stand-in for the Gemini proxy /analyze contract.
+
+Returns a canned analysis for every prompt so the app can be exercised
+without a Google API key. Latency can follow a log-normal distribution
+around a median, and a fraction of calls can fail with an upstream error
+status. Run standalone:
+
+    python scripts/fake_gemini_proxy.py --port 8081
+    python scripts/fake_gemini_proxy.py --latency 1.5 --latency-sigma 0.5 --failure-rate 0.05
+
+and point the app at it with GEMINI_PROXY_URL=http://127.0.0.1:8081
+"""
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ANALYSIS = {
+    "personal_info": {
+        "name": "Jane Doe",
+        "email": "jane.doe@example.com",
+        "phone": "+1 555 0100",
+        "location": "Seattle, WA"
+    },
+    "summary": "Backend engineer with eight years of experience building data-heavy web services.",
+    "skills": ["Python", "Flask", "SQL", "Azure", "Docker"],
+    "education": [
+        {
+            "degree": "B.Sc. Computer Science",
+            "institution": "State University",
+            "year": "2016",
+            "details": ""
+        }
+    ],
+    "experience": [
+        {
+            "title": "Senior Software Engineer",
+            "company": "Example Corp",
+            "duration": "2019 - Present",
+            "responsibilities": ["Built APIs", "Led migrations"]
+        }
+    ],
+    "certifications": [],
+    "suggestions": ["Quantify achievements", "Add a projects section", "Tighten the summary"],
+    "overall_score": 78,
+    "strengths": ["Backend depth", "Cloud experience"],
+    "areas_for_improvement": ["Frontend exposure"]
+}
+
+class FakeProxyHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls on kept-alive sockets
+    disable_nagle_algorithm = True
+    latency = 0.0  # Median seconds before responding
+    latency_sigma = 0.0  # Log-normal spread around the median; 0 is a fixed delay
+    failure_rate = 0.0
+    failure_status = 503
+    stream_delay = 0.0
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        
+        if self.path != '/analyze':
+            return self._send(404, {'success': False, 'error': 'Not found'})
+        
+        payload = json.loads(body)
+        if not payload.get('prompt'):
+            return self._send(400, {'success': False, 'error': 'Missing prompt'})
+        
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        
+        if self.failure_rate and random.random() < self.failure_rate:
+            headers = {'Retry-After': '1'} if self.failure_status == 429 else {}
+            return self._send(self.failure_status, {'success': False, 'error': 'Simulated upstream failure'}, headers)
+        
+        if payload.get('stream'):
+            return self._send_stream(json.dumps(SAMPLE_ANALYSIS, indent=2))
+        
+        self._send(200, {'success': True, 'response': json.dumps(SAMPLE_ANALYSIS)})
+    
+    def _send_stream(self, text, chunk_size=64):
+        # Chunked plain-text body, like a proxy relaying streamed generation
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start:start + chunk_size].encode('utf-8')
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            if self.stream_delay:
+                time.sleep(self.stream_delay)
+        
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def _delay(self):
+        if self.latency and self.latency_sigma:
+            return random.lognormvariate(math.log(self.latency), self.latency_sigma)
+        return self.latency
+    
+    def _send(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, stream_delay=0.0,
+                 latency_sigma=0.0, failure_rate=0.0, failure_status=503):
+    """Start the fake proxy in a background thread and return the server"""
+    handler = type('Handler', (FakeProxyHandler,), {
+        'latency': latency,
+        'latency_sigma': latency_sigma,
+        'failure_rate': failure_rate,
+        'failure_status': failure_status,
+        'stream_delay': stream_delay
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Fake Gemini proxy')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8081)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='Median seconds to wait before responding')
+    arg_parser.add_argument('--latency-sigma', type=float, default=0.0, help='Log-normal sigma of the latency (0 = fixed)')
+    arg_parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of calls that fail')
+    arg_parser.add_argument('--failure-status', type=int, default=503, help='HTTP status of failed calls')
+    arg_parser.add_argument('--stream-delay', type=float, default=0.0, help='Seconds between streamed chunks')
+    args = arg_parser.parse_args()
+    
+    server = start_server(
+        args.host, args.port, args.latency, args.stream_delay,
+        latency_sigma=args.latency_sigma,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status
+    )
+    print(f"Fake Gemini proxy listening on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
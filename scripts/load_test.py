@@ -0,0 +1,244 @@
+"""
+End-to-end load test of upload -> analyze -> poll -> view, fully offline.
+
+By default it starts the whole stack itself: the fake Gemini proxy, with a
+latency distribution and failure rate, and the app under gunicorn with the
+same gunicorn.conf.py as the Dockerfile. The app uses local blob storage, a
+throwaway SQLite database and /dev/login instead of OAuth. Then N simulated
+users run the flow for the given duration:
+
+    python scripts/load_test.py --users 20 --duration 60 --proxy-latency 1.5 --failure-rate 0.02
+
+To drive an already running app instead (started with DEV_LOGIN_ENABLED=True):
+
+    python scripts/load_test.py --base-url http://127.0.0.1:5000 --users 20
+
+Reports requests per second and p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+
+from corpus import make_pdf
+
+# Same as the CMD in the Dockerfile; --bind on the command line wins over the config
+GUNICORN_ARGS = ['-c', 'gunicorn.conf.py', 'app:app']
+JOB_DESCRIPTION = "Backend engineer with Python, Flask, SQL and Azure experience."
+
+class Recorder:
+    """Thread-safe latency and status log per endpoint"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self.started = time.perf_counter()
+    
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self._latencies[endpoint].append(seconds)
+            if not ok:
+                self._errors[endpoint] += 1
+    
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        total = sum(len(latencies) for latencies in self._latencies.values())
+        print(f"\n{total} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s")
+        print(f"{'endpoint':<24} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        
+        for endpoint in sorted(self._latencies):
+            latencies = sorted(self._latencies[endpoint])
+            print(f"{endpoint:<24} {len(latencies):>7} {self._errors[endpoint]:>7} {len(latencies) / elapsed:>8.2f} "
+                  f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+                  f"{percentile(latencies, 99) * 1000:>9.1f} {latencies[-1] * 1000:>9.1f}")
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+class SimulatedUser(threading.Thread):
+    """Signs in, then uploads, analyzes and views resumes until the deadline"""
+    
+    def __init__(self, number, base_url, recorder, deadline, pages, poll_interval):
+        super().__init__(name=f"user-{number}", daemon=True)
+        self.number = number
+        self.base_url = base_url
+        self.recorder = recorder
+        self.deadline = deadline
+        self.pages = pages
+        self.poll_interval = poll_interval
+        self.session = requests.Session()
+        self.iteration = 0
+    
+    def request(self, endpoint, method, path, **kwargs):
+        """Timed request; endpoint is the label it is reported under"""
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=180, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(endpoint, time.perf_counter() - started, False)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - started, response.status_code < 400)
+        return response
+    
+    def run(self):
+        response = self.request('POST /dev/login', 'POST', '/dev/login', json={'email': f"load-user-{self.number}@example.com"})
+        if response is None or response.status_code != 200:
+            return
+        
+        while time.time() < self.deadline:
+            self.iteration += 1
+            self.run_flow()
+    
+    def run_flow(self):
+        # A distinct document each time, so the parse and analysis caches do not hide the work
+        seed = self.number * 100000 + self.iteration
+        files = {'file': (f"resume_{seed}.pdf", make_pdf(self.pages, seed=seed), 'application/pdf')}
+        
+        response = self.request('POST /upload', 'POST', '/upload', files=files)
+        if response is None or response.status_code != 201:
+            return
+        resume_id = response.json()['resume_id']
+        
+        started = time.perf_counter()
+        response = self.request('POST /analyze/<id>', 'POST', f"/analyze/{resume_id}", json={'job_description': JOB_DESCRIPTION})
+        if response is None or response.status_code != 202:
+            return
+        status_url = response.json()['status_url']
+        
+        while time.time() < self.deadline + 120:
+            time.sleep(self.poll_interval)
+            response = self.request('GET /jobs/<id>', 'GET', status_url)
+            if response is None or response.status_code != 200:
+                return
+            status = response.json()['status']
+            if status in ('completed', 'failed'):
+                # Time from submission until the result was seen, including queueing
+                self.recorder.record('analysis (end to end)', time.perf_counter() - started, status == 'completed')
+                break
+        
+        self.request('GET /analysis/<id>', 'GET', f"/analysis/{resume_id}")
+        self.request('GET /files', 'GET', '/files')
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def start_stack(args, work_dir):
+    """Start the fake proxy and the app under gunicorn; return (base_url, processes)"""
+    proxy_port, app_port = free_port(), free_port()
+    
+    proxy = subprocess.Popen([
+        sys.executable, os.path.join(ROOT_DIR, 'scripts', 'fake_gemini_proxy.py'),
+        '--port', str(proxy_port),
+        '--latency', str(args.proxy_latency),
+        '--latency-sigma', str(args.proxy_sigma),
+        '--failure-rate', str(args.failure_rate)
+    ], stdout=subprocess.DEVNULL)
+    
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(work_dir, 'load_test.db')}",
+        BLOB_STORAGE_BACKEND='local',
+        LOCAL_BLOB_DIR=os.path.join(work_dir, 'blobs'),
+        SEARCH_INDEX_PATH=os.path.join(work_dir, 'search_index.pickle'),
+        GEMINI_PROXY_URL=f"http://127.0.0.1:{proxy_port}",
+        DEV_LOGIN_ENABLED='True',
+        FLASK_SECRET_KEY=os.urandom(16).hex()
+    )
+    
+    # Same start-up as the container: create the schema, then serve with gunicorn
+    subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'migrations', 'init_db.py')], cwd=ROOT_DIR, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    app = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f"127.0.0.1:{app_port}"] + GUNICORN_ARGS,
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(work_dir, 'gunicorn.log'), 'w')
+    )
+    
+    base_url = f"http://127.0.0.1:{app_port}"
+    wait_for(base_url)
+    return base_url, [app, proxy]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--base-url', help="drive this running app instead of starting one")
+    arg_parser.add_argument('--users', type=int, default=10)
+    arg_parser.add_argument('--duration', type=float, default=60, help="seconds to start new flows for")
+    arg_parser.add_argument('--ramp-up', type=float, default=5, help="seconds over which users start")
+    arg_parser.add_argument('--pages', type=int, default=2, help="pages per uploaded resume")
+    arg_parser.add_argument('--poll-interval', type=float, default=0.5)
+    arg_parser.add_argument('--proxy-latency', type=float, default=1.0, help="median fake Gemini latency in seconds")
+    arg_parser.add_argument('--proxy-sigma', type=float, default=0.5, help="log-normal sigma of the fake latency")
+    arg_parser.add_argument('--failure-rate', type=float, default=0.02, help="fraction of fake Gemini calls that fail")
+    arg_parser.add_argument('--keep', action='store_true', help="keep the work directory (database, blobs, logs)")
+    args = arg_parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix='resume-load-test-')
+    processes = []
+    
+    try:
+        if args.base_url:
+            base_url = args.base_url.rstrip('/')
+        else:
+            base_url, processes = start_stack(args, work_dir)
+            print(f"App under gunicorn at {base_url}; work directory {work_dir}")
+        
+        recorder = Recorder()
+        deadline = time.time() + args.duration
+        users = [
+            SimulatedUser(number, base_url, recorder, deadline, args.pages, args.poll_interval)
+            for number in range(args.users)
+        ]
+        
+        for user in users:
+            user.start()
+            time.sleep(args.ramp_up / max(args.users, 1))
+        
+        for user in users:
+            user.join()
+        
+        recorder.report()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if args.keep:
+            print(f"Kept {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
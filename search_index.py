@@ -0,0 +1,350 @@
+import heapq
+import json
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import func
+from models import db, SearchDocument
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him
+his how i if in into is it its itself just me more most my no nor not now of off on once only or other our
+ours out over own same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with
+would you your yours etc per via using used use including include includes
+""".split())
+
+# Postgres may commit sequence values out of order; re-reading a window of recent
+# changes on every sync picks up rows that became visible late
+SYNC_OVERLAP = 1000
+
+SNAPSHOT_VERSION = 1
+MAX_TF = 65535
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case terms of the text without stopwords"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS and len(token) < 40]
+
+class BM25Index:
+    """BM25 inverted index over resume text.
+    
+    Postings are compact arrays of internal document numbers and term counts. Every
+    change is written to the search_documents table, which each worker replays to stay
+    current, and the whole index is snapshotted to disk so workers load it instead of
+    re-indexing on start.
+    """
+    
+    def __init__(self, snapshot_path=None, k1=1.2, b=0.75, max_query_terms=32, postings_budget=200000,
+                 sync_interval=2.0, snapshot_every=500):
+        self.snapshot_path = snapshot_path
+        self.k1 = k1
+        self.b = b
+        self.max_query_terms = max_query_terms
+        self.postings_budget = postings_budget
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._synced_at = 0.0
+        self._saving = False
+        self._reset()
+    
+    def __len__(self):
+        return self._live_count
+    
+    def add_document(self, resume_id: int, user_id: int, text: str):
+        """Index a resume's text and record the change; the caller commits"""
+        terms = Counter(tokenize(text))
+        change = self._record_change(resume_id, user_id, terms)
+        
+        with self._lock:
+            # Before the first sync the change is simply picked up from the database
+            if self._loaded:
+                self._apply(resume_id, user_id, terms)
+                self._versions[resume_id] = change.id
+    
+    def remove_document(self, resume_id: int, user_id: int):
+        """Drop a resume from the index and record the change; the caller commits"""
+        change = self._record_change(resume_id, user_id, None)
+        
+        with self._lock:
+            if self._loaded:
+                self._apply(resume_id, user_id, None)
+                self._versions[resume_id] = change.id
+    
+    def search(self, query: str, user_id: Optional[int] = None, top_k: int = 20) -> List[Tuple[int, float]]:
+        """Return (resume_id, score) pairs of the best matching resumes, best first"""
+        self.sync()
+        query_terms = Counter(tokenize(query))
+        
+        with self._lock:
+            count = self._live_count
+            if not count or not query_terms:
+                return []
+            
+            k1, b = self.k1, self.b
+            # BM25 length normalization: k1 * (1 - b + b * length / average_length)
+            base_norm = k1 * (1 - b)
+            length_norm = k1 * b * count / self._total_length
+            
+            weighted = []
+            for term, query_count in query_terms.items():
+                postings = self._postings.get(term)
+                if postings:
+                    df = len(postings[0])
+                    idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                    weighted.append((idf * query_count * (k1 + 1), postings[0], postings[1]))
+            
+            # Long job descriptions are cut down to their most discriminative terms
+            weighted.sort(key=lambda item: item[0], reverse=True)
+            del weighted[self.max_query_terms:]
+            
+            candidates = self._by_user.get(user_id, set()) if user_id is not None else None
+            walk_cost = sum(len(ids) for _, ids, _ in weighted)
+            
+            if candidates is not None and len(candidates) * len(weighted) * 4 < walk_cost:
+                # Few candidates: look each one up rather than walking long posting lists
+                scores = {docno: 0.0 for docno in candidates}
+                scores = self._rescore(scores, weighted, base_norm, length_norm)
+            else:
+                scores = self._walk(weighted, user_id, base_norm, length_norm, top_k)
+            
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [(self._doc_resume[docno], score) for docno, score in best if score > 0]
+    
+    def sync(self, force=False):
+        """Load the index once, then apply changes made by other workers"""
+        now = time.monotonic()
+        if not force and self._loaded and now - self._synced_at < self.sync_interval:
+            return
+        
+        with self._lock:
+            if not self._loaded:
+                self._load_snapshot()
+            
+            applied = 0
+            query = SearchDocument.query.order_by(SearchDocument.id)
+            if self._last_change_id:
+                query = query.filter(SearchDocument.id > self._last_change_id - SYNC_OVERLAP)
+            
+            for change in query.yield_per(1000):
+                if self._versions.get(change.resume_id) != change.id:
+                    terms = json.loads(change.terms) if change.terms is not None else None
+                    self._apply(change.resume_id, change.user_id, terms)
+                    self._versions[change.resume_id] = change.id
+                    applied += 1
+                self._last_change_id = max(self._last_change_id, change.id)
+            
+            self._loaded = True
+            self._synced_at = now
+            self._changes_since_snapshot += applied
+            
+            if self._dead_count > max(1000, len(self._doc_resume) // 4):
+                self._compact()
+            
+            if self.snapshot_path and self._changes_since_snapshot >= self.snapshot_every and not self._saving:
+                self._saving = True
+                threading.Thread(target=self.save, daemon=True).start()
+    
+    def save(self, path=None):
+        """Write a snapshot of the index; readers replay newer changes from the database"""
+        path = path or self.snapshot_path
+        
+        try:
+            with self._lock:
+                self._compact()
+                state = {
+                    'version': SNAPSHOT_VERSION,
+                    'last_change_id': self._last_change_id,
+                    'versions': self._versions,
+                    'doc_resume': self._doc_resume,
+                    'doc_user': self._doc_user,
+                    'doc_length': self._doc_length,
+                    'postings': self._postings
+                }
+                payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+                self._changes_since_snapshot = 0
+            
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Search index snapshot failed: {e}")
+        finally:
+            self._saving = False
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'documents': self._live_count,
+                'deleted_pending_compaction': self._dead_count,
+                'terms': len(self._postings),
+                'postings': sum(len(ids) for ids, _ in self._postings.values()),
+                'average_length': round(self._total_length / self._live_count, 1) if self._live_count else 0,
+                'last_change_id': self._last_change_id,
+                'loaded': self._loaded
+            }
+    
+    def _walk(self, weighted, user_id, base_norm, length_norm, top_k):
+        """Term-at-a-time scoring, falling back to rescoring a shortlist past the postings budget"""
+        live, lengths, owners = self._live, self._doc_length, self._doc_user
+        scores = {}
+        get_score = scores.get
+        walked = 0
+        
+        for position, (weight, ids, tfs) in enumerate(weighted):
+            if walked and walked + len(ids) > self.postings_budget:
+                # The remaining terms are the least discriminative; apply them only to
+                # the best partial matches instead of walking their long posting lists
+                shortlist = heapq.nlargest(max(top_k * 20, 500), scores.items(), key=lambda item: item[1])
+                return self._rescore(dict(shortlist), weighted[position:], base_norm, length_norm)
+            
+            walked += len(ids)
+            for docno, tf in zip(ids, tfs):
+                if live[docno] and (user_id is None or owners[docno] == user_id):
+                    scores[docno] = get_score(docno, 0.0) + weight * tf / (tf + base_norm + length_norm * lengths[docno])
+        
+        return scores
+    
+    def _rescore(self, scores, weighted, base_norm, length_norm):
+        lengths = self._doc_length
+        
+        for docno in scores:
+            norm = base_norm + length_norm * lengths[docno]
+            score = scores[docno]
+            for weight, ids, tfs in weighted:
+                # Document numbers are appended in increasing order, so postings are sorted
+                index = bisect_left(ids, docno)
+                if index < len(ids) and ids[index] == docno:
+                    tf = tfs[index]
+                    score += weight * tf / (tf + norm)
+            scores[docno] = score
+        
+        return scores
+    
+    def _record_change(self, resume_id, user_id, terms):
+        # One row per resume holds its latest state; a null terms column marks a deletion
+        SearchDocument.query.filter_by(resume_id=resume_id).delete()
+        change = SearchDocument(
+            resume_id=resume_id,
+            user_id=user_id,
+            length=sum(terms.values()) if terms else 0,
+            terms=json.dumps(terms) if terms is not None else None
+        )
+        db.session.add(change)
+        db.session.flush()
+        return change
+    
+    def _apply(self, resume_id, user_id, terms):
+        docno = self._docno.pop(resume_id, None)
+        if docno is not None:
+            # Postings of replaced documents stay behind until the next compaction
+            self._live[docno] = 0
+            self._live_count -= 1
+            self._dead_count += 1
+            self._total_length -= self._doc_length[docno]
+            self._by_user[self._doc_user[docno]].discard(docno)
+        
+        if terms is None:
+            return
+        
+        docno = len(self._doc_resume)
+        length = sum(terms.values())
+        self._doc_resume.append(resume_id)
+        self._doc_user.append(user_id)
+        self._doc_length.append(length)
+        self._live.append(1)
+        self._docno[resume_id] = docno
+        self._by_user.setdefault(user_id, set()).add(docno)
+        self._live_count += 1
+        self._total_length += length
+        
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array('I'), array('H'))
+            postings[0].append(docno)
+            postings[1].append(min(tf, MAX_TF))
+    
+    def _compact(self):
+        """Renumber live documents and drop postings of deleted or replaced ones"""
+        if not self._dead_count:
+            return
+        
+        live = self._live
+        renumber = array('l', [-1]) * len(self._doc_resume)
+        doc_resume, doc_user, doc_length = array('I'), array('I'), array('I')
+        
+        for docno in range(len(live)):
+            if live[docno]:
+                renumber[docno] = len(doc_resume)
+                doc_resume.append(self._doc_resume[docno])
+                doc_user.append(self._doc_user[docno])
+                doc_length.append(self._doc_length[docno])
+        
+        postings = {}
+        for term, (ids, tfs) in self._postings.items():
+            new_ids, new_tfs = array('I'), array('H')
+            for docno, tf in zip(ids, tfs):
+                if live[docno]:
+                    new_ids.append(renumber[docno])
+                    new_tfs.append(tf)
+            if new_ids:
+                postings[term] = (new_ids, new_tfs)
+        
+        self._set_documents(doc_resume, doc_user, doc_length, postings)
+    
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                state = pickle.load(f)
+            
+            if state.get('version') != SNAPSHOT_VERSION:
+                return
+            
+            # A snapshot ahead of the database belongs to some other database
+            latest = db.session.query(func.max(SearchDocument.id)).scalar() or 0
+            if state['last_change_id'] > latest:
+                return
+            
+            self._set_documents(state['doc_resume'], state['doc_user'], state['doc_length'], state['postings'])
+            self._versions = state['versions']
+            self._last_change_id = state['last_change_id']
+        except Exception as e:
+            print(f"Search index snapshot could not be loaded, rebuilding from the database: {e}")
+            self._reset()
+    
+    def _set_documents(self, doc_resume, doc_user, doc_length, postings):
+        self._doc_resume = doc_resume
+        self._doc_user = doc_user
+        self._doc_length = doc_length
+        self._postings = postings
+        self._live = bytearray(b'\x01') * len(doc_resume)
+        self._docno = {resume_id: docno for docno, resume_id in enumerate(doc_resume)}
+        self._by_user = {}
+        for docno, user_id in enumerate(doc_user):
+            self._by_user.setdefault(user_id, set()).add(docno)
+        self._live_count = len(doc_resume)
+        self._dead_count = 0
+        self._total_length = sum(doc_length)
+    
+    def _reset(self):
+        self._set_documents(array('I'), array('I'), array('I'), {})
+        self._versions = {}  # resume_id -> id of the change last applied
+        self._last_change_id = 0
+        self._changes_since_snapshot = 0